@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+Compare pure python and libyaml loaders on data/HL-31*.yaml
+
+python benchmarks/bench_loaders.py [--repeat N]
+"""
+
+import os
+import glob
+import time
+import argparse
+
+import yaml
+
+from python_magnetgeo import loaders
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--datadir", default=os.path.join(os.path.dirname(__file__), "..", "data")
+)
+parser.add_argument("--repeat", type=int, default=20)
+args = parser.parse_args()
+
+# skip mesh data files (MeshData is not a geometry object)
+files = [
+    filename
+    for filename in sorted(glob.glob(os.path.join(args.datadir, "HL-31*.yaml")))
+    if "meshdata" not in filename
+]
+sources = {}
+for filename in files:
+    with open(filename, "r") as f:
+        sources[filename] = f.read()
+
+
+def bench(Loader) -> float:
+    start = time.perf_counter()
+    for i in range(args.repeat):
+        for source in sources.values():
+            yaml.load(source, Loader=Loader)
+    return (time.perf_counter() - start) / args.repeat
+
+
+print(f"{len(files)} files, libyaml={loaders.with_libyaml}")
+t_python = bench(loaders.get_loader(libyaml=False))
+print(f"{'FullLoader':>12}: {t_python*1.e3:8.2f} ms")
+if loaders.with_libyaml:
+    t_c = bench(loaders.get_loader())
+    print(f"{'CFullLoader':>12}: {t_c*1.e3:8.2f} ms (x{t_python/t_c:.1f})")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+Time HTSinsert.fromcfg for 10 to 10,000 double pancakes
+
+similar: "n" identical double pancakes
+different: one entry per double pancake (a few distinct definitions)
+
+python benchmarks/bench_suprastructure.py [--repeat N]
+"""
+
+import io
+import os
+import json
+import time
+import argparse
+import tempfile
+import contextlib
+
+from python_magnetgeo.SupraStructure import HTSinsert
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--repeat", type=int, default=5)
+parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+args = parser.parse_args()
+
+
+def pancake(i: int) -> dict:
+    return {
+        "r0": 10 + i % 3,
+        "mandrin": 9,
+        "ntapes": 40 + i % 5,
+        "tape": {"w": 0.15, "h": 6, "e": 0.05},
+    }
+
+
+def struct(n: int, similar: bool) -> dict:
+    data = {
+        "pancake": pancake(0),
+        "isolation": {"r0": 10, "w": [8.2], "h": [0.3]},
+    }
+    if similar:
+        data["dblpancakes"] = {"n": n, "isolation": {"r0": 9.5, "w": [9], "h": [0.5]}}
+    else:
+        data["dblpancakes"] = {f"dp{i}": {"pancake": pancake(i)} for i in range(n)}
+        data["isolations"] = {
+            f"dp{i}": {"isolation": {"r0": 9.5, "w": [9], "h": [0.5]}} for i in range(n)
+        }
+    return data
+
+
+def bench(filename: str) -> float:
+    start = time.perf_counter()
+    for i in range(args.repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            HTSinsert.fromcfg(filename)
+    return (time.perf_counter() - start) / args.repeat
+
+
+with tempfile.TemporaryDirectory() as tmpdir:
+    print(f"{'n':>8} {'similar':>12} {'different':>12} {'per dp':>10}")
+    for n in args.sizes:
+        times = []
+        for similar in (True, False):
+            filename = os.path.join(tmpdir, f"struct_{n}_{similar}.json")
+            with open(filename, "w") as f:
+                json.dump(struct(n, similar), f)
+            times.append(bench(filename))
+        print(
+            f"{n:>8} {times[0]*1.e3:9.2f} ms {times[1]*1.e3:9.2f} ms"
+            f" {times[1]/n*1.e6:7.2f} us"
+        )
@@ -56,32 +56,32 @@ def template_gmsh(struct: SupraStructure, name: str, detail: str) -> None:
         "z1": struct.getZ0() + struct.getH() / 2.0,
         "r1": struct.getR1(),
         "n_dp": struct.getN(),
-        "e_dp": str(struct.getWDblPancake()).replace("[", "{").replace("]", "}"),
-        "h_dp": str(struct.getHDblPancake()).replace("[", "{").replace("]", "}"),
-        "h_dp_isolation": str(struct.getH_Isolation())
+        "e_dp": str(struct.getWDblPancake().tolist()).replace("[", "{").replace("]", "}"),
+        "h_dp": str(struct.getHDblPancake().tolist()).replace("[", "{").replace("]", "}"),
+        "h_dp_isolation": str(struct.getH_Isolation().tolist())
         .replace("[", "{")
         .replace("]", "}"),
-        "r_dp": str(struct.getR0_Isolation()).replace("[", "{").replace("]", "}"),
-        "e_p": str(struct.getWPancake()).replace("[", "{").replace("]", "}"),
-        "e_dp_isolation": str(struct.getW_Isolation())
+        "r_dp": str(struct.getR0_Isolation().tolist()).replace("[", "{").replace("]", "}"),
+        "e_p": str(struct.getWPancake().tolist()).replace("[", "{").replace("]", "}"),
+        "e_dp_isolation": str(struct.getW_Isolation().tolist())
         .replace("[", "{")
         .replace("]", "}"),
-        "mandrin": str(struct.getMandrinPancake())
+        "mandrin": str(struct.getMandrinPancake().tolist())
         .replace("[", "{")
         .replace("]", "}"),
-        "h_tape": str(struct.getHtapes()).replace("[", "{").replace("]", "}"),
-        "h_isolation": str(struct.getHPancake_Isolation())
+        "h_tape": str(struct.getHtapes().tolist()).replace("[", "{").replace("]", "}"),
+        "h_isolation": str(struct.getHPancake_Isolation().tolist())
         .replace("[", "{")
         .replace("]", "}"),
-        "r_": str(struct.getR0Pancake_Isolation())
+        "r_": str(struct.getR0Pancake_Isolation().tolist())
         .replace("[", "{")
         .replace("]", "}"),
-        "e_isolation": str(struct.getWPancake_Isolation())
+        "e_isolation": str(struct.getWPancake_Isolation().tolist())
         .replace("[", "{")
         .replace("]", "}"),
-        "n_t": str(struct.getNtapes()).replace("[", "{").replace("]", "}"),
-        "e_t": str(struct.getWtapes_Isolation()).replace("[", "{").replace("]", "}"),
-        "w_t": str(struct.getWtapes_SC()).replace("[", "{").replace("]", "}"),
+        "n_t": str(struct.getNtapes().tolist()).replace("[", "{").replace("]", "}"),
+        "e_t": str(struct.getWtapes_Isolation().tolist()).replace("[", "{").replace("]", "}"),
+        "w_t": str(struct.getWtapes_SC().tolist()).replace("[", "{").replace("]", "}"),
         "emin": min(struct.getWtapes_Isolation()),
         "xmin": xmin,
         "rmin": rmin,
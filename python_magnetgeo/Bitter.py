@@ -8,16 +8,20 @@ Provides definition for Bitter:
 * Model Axi: definition of helical cut (provided from MagnetTools)
 * Model 3D: actual 3D CAD
 """
+from typing import Optional
 
+import os
 import json
 import yaml
 
+from . import loaders
+from .fingerprint import Fingerprint
 from .ModelAxi import ModelAxi
 from .coolingslit import CoolingSlit
 from .tierod import Tierod
 
 
-class Bitter(yaml.YAMLObject):
+class Bitter(yaml.YAMLObject, Fingerprint):
     """
     name :
     r :
@@ -126,7 +130,7 @@ class Bitter(yaml.YAMLObject):
             Nslits = len(self.coolingslits)
 
         if is2D:
-            nsection = len(self.modelaxi.turns)
+            nsection = self.modelaxi.get_Nsections()
             if self.z[0] < -self.modelaxi.h and abs(self.z[0] + self.modelaxi.h) >= tol:
                 for i in range(Nslits + 1):
                     solid_names.append(f"{prefix}B0_Slit{i}")
@@ -182,7 +186,7 @@ class Bitter(yaml.YAMLObject):
         data = None
         try:
             with open(f"{self.name}.yaml", "r") as istream:
-                data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+                data = yaml.load(stream=istream, Loader=loaders.get_loader())
         except:
             raise Exception(f"Failed to load Bitter data {self.name}.yaml")
 
@@ -254,8 +258,22 @@ class Bitter(yaml.YAMLObject):
             collide = True
         return collide
 
-    def get_params(self, workingDir: str = ".") -> tuple:
+    def get_params(self, workingDir: str = ".", debug: bool = False):
+        """
+        get hydraulic params per channel (see hydraulics.HydraulicParams),
+        unpacks as (nslits, Dh, Sh, Zh, filling_factor)
+
+        result is only computed once for a given geometry
+        """
+        from . import hydraulics
+
+        return hydraulics.params.memoize(
+            self, lambda: self._compute_params(debug), workingDir
+        )
+
+    def _compute_params(self, debug: bool = False):
         from math import pi
+        from .hydraulics import HydraulicParams
 
         tol = 1.0e-10
 
@@ -280,28 +298,39 @@ class Bitter(yaml.YAMLObject):
         Sh += [pi * (self.outerbore - self.r[1]) * (self.outerbore + self.r[1])]
 
         Zh = [self.z[0]]
-        z = -self.modelaxi.h
-        if abs(self.z[0] - z) >= tol:
-            Zh.append(z)
-        for n, p in zip(self.modelaxi.turns, self.modelaxi.pitch):
-            z += n * p
-            Zh.append(z)
-        if abs(self.z[1] - z) >= tol:
+        zb = self.modelaxi.z_boundaries().tolist()
+        if abs(self.z[0] - zb[0]) >= tol:
+            Zh.append(zb[0])
+        Zh += zb[1:]
+        if abs(self.z[1] - zb[-1]) >= tol:
             Zh.append(self.z[1])
-        print(f"Zh={Zh}")
 
         filling_factor.append(1)
-        print(f"filling_factor={filling_factor}")
-
-        # return (nslits, Dh, Sh, Zh)
-        return (nslits, Dh, Sh, Zh, filling_factor)
+        if debug:
+            print(f"Zh={Zh}")
+            print(f"filling_factor={filling_factor}")
+
+        return HydraulicParams(
+            Dh,
+            Sh,
+            [Zh] * len(Dh),
+            filling_factor,
+            legacy=("nslits", "Dh", "Sh", "Zh", "filling_factor"),
+            nslits=nslits,
+        )
 
-    def create_cut(self, format: str):
+    def create_cut(self, format: str, directory: Optional[str] = None) -> str:
         """
-        create cut files
+        create cut files in directory (default: current directory)
+
+        returns the name of the cut file
         """
-        from cut_utils import create_cut
-        create_cut(self, format, self.name)
+        from .cut_utils import create_cut
+
+        name = self.name
+        if directory is not None:
+            name = os.path.join(directory, name)
+        return create_cut(self, format, name)
 
 
 def Bitter_constructor(loader, node):
@@ -326,4 +355,5 @@ def Bitter_constructor(loader, node):
     return Bitter(name, r, z, odd, modelaxi, coolingslits, tierod, innerbore, outerbore)
 
 
-yaml.add_constructor("!Bitter", Bitter_constructor)
+loaders.add_constructor("!Bitter", Bitter_constructor)
+loaders.add_yaml_object(Bitter)
@@ -2,12 +2,17 @@
 # encoding: UTF-8
 
 """defines Bitter Insert structure"""
+from typing import Optional
 
 import json
 import yaml
 
+from . import loaders
+from .fingerprint import Fingerprint
+from . import registry
 
-class Bitters(yaml.YAMLObject):
+
+class Bitters(registry.Assembly, yaml.YAMLObject, Fingerprint):
     """
     name :
     magnets :
@@ -38,34 +43,35 @@ class Bitters(yaml.YAMLObject):
         )
 
     def get_channels(
-        self, mname: str, hideIsolant: bool = True, debug: bool = False
+        self,
+        mname: str,
+        hideIsolant: bool = True,
+        debug: bool = False,
+        max_workers: Optional[int] = None,
     ) -> dict:
         """
         get Channels def as dict
+
+        max_workers: number of threads used to load magnets
         """
         print(f"Bitters/get_channels:")
+        registry.prefetch(self, max_workers=max_workers)
         Channels = {}
 
         if isinstance(self.magnets, str):
-            YAMLFile = f"{self.magnets}.yaml"
-            with open(YAMLFile, "r") as f:
-                Object = yaml.load(f, Loader=yaml.FullLoader)
+            Object = registry.get_part(self, self.magnets)
 
             Channels[self.name] = Object.get_channels(self.name, hideIsolant, debug)
         elif isinstance(self.magnets, list):
             for magnet in self.magnets:
-                YAMLFile = f"{magnet}.yaml"
-                with open(YAMLFile, "r") as f:
-                    Object = yaml.load(f, Loader=yaml.FullLoader)
+                Object = registry.get_part(self, magnet)
 
                 Channels[magnet] = Object.get_channels(magnet, hideIsolant, debug)
 
         elif isinstance(self.magnets, dict):
             for key in self.magnets:
                 magnet = self.magnets[key]
-                YAMLFile = f"{magnet}.yaml"
-                with open(YAMLFile, "r") as f:
-                    Object = yaml.load(f, Loader=yaml.FullLoader)
+                Object = registry.get_part(self, magnet)
 
                 Channels[magnet] = Object.get_channels(key, hideIsolant, debug)
 
@@ -87,23 +93,26 @@ class Bitters(yaml.YAMLObject):
         return {}
 
     def get_names(
-        self, mname: str, is2D: bool = False, verbose: bool = False
+        self,
+        mname: str,
+        is2D: bool = False,
+        verbose: bool = False,
+        max_workers: Optional[int] = None,
     ) -> list[str]:
         """
         return names for Markers
+
+        max_workers: number of threads used to load magnets
         """
         solid_names = []
+        registry.prefetch(self, max_workers=max_workers)
         if isinstance(self.magnets, str):
-            YAMLFile = f"{self.magnets}.yaml"
-            with open(YAMLFile, "r") as f:
-                Object = yaml.load(f, Loader=yaml.FullLoader)
+            Object = registry.get_part(self, self.magnets)
 
             solid_names += Object.get_names(self.name, is2D, verbose)
         elif isinstance(self.magnets, list):
             for magnet in self.magnets:
-                YAMLFile = f"{magnet}.yaml"
-                with open(YAMLFile, "r") as f:
-                    Object = yaml.load(f, Loader=yaml.FullLoader)
+                Object = registry.get_part(self, magnet)
 
                 solid_names += Object.get_names(
                     magnet, is2D, verbose
@@ -111,9 +120,7 @@ class Bitters(yaml.YAMLObject):
         elif isinstance(self.magnets, dict):
             for key in self.magnets:
                 magnet = self.magnets[key]
-                YAMLFile = f"{magnet}.yaml"
-                with open(YAMLFile, "r") as f:
-                    Object = yaml.load(f, Loader=yaml.FullLoader)
+                Object = registry.get_part(self, magnet)
 
                 solid_names += Object.get_names(self.name, is2D, verbose)
         else:
@@ -125,6 +132,32 @@ class Bitters(yaml.YAMLObject):
             print(f"Bitters/get_names: solid_names {len(solid_names)}")
         return solid_names
 
+    def generate_cuts(
+        self,
+        format: str = "SALOME",
+        workers: Optional[int] = None,
+        directory: Optional[str] = None,
+        workingDir: Optional[str] = None,
+    ) -> dict:
+        """
+        create cut files for all bitters
+
+        workers: number of processes used
+        directory: where cut files are written
+        workingDir: where parts are loaded from
+
+        returns the manifest of cut files (see cut_utils.generate_cuts)
+        """
+        from .cut_utils import generate_cuts
+
+        return generate_cuts(self, format, workers, directory, workingDir)
+
+    def resolve(self, directory: Optional[str] = None):
+        """
+        return a copy of Bitters with magnets loaded once for all
+        """
+        return registry.resolve(self, directory)
+
     def dump(self):
         """dump to a yaml file name.yaml"""
         try:
@@ -138,7 +171,7 @@ class Bitters(yaml.YAMLObject):
         data = None
         try:
             with open(f"{self.name}.yaml", "r") as istream:
-                data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+                data = yaml.load(stream=istream, Loader=loaders.get_loader())
         except:
             raise Exception(f"Failed to load Insert data {self.name}.yaml")
 
@@ -179,24 +212,24 @@ class Bitters(yaml.YAMLObject):
     #
     ###################################################################
 
-    def boundingBox(self) -> tuple:
+    def boundingBox(self, max_workers: Optional[int] = None) -> tuple:
         """
         return Bounding as r[], z[]
 
         so far exclude Leads
+        max_workers: number of threads used to load magnets
         """
+        registry.prefetch(self, max_workers=max_workers)
 
         rb = [0, 0]
         zb = [0, 0]
 
         for i, mname in enumerate(self.magnets):
-            bitter = None
-            with open(f"{mname}.yaml", "r") as f:
-                bitter = yaml.load(f, Loader=yaml.FullLoader)
+            bitter = registry.get_part(self, mname)
 
             if i == 0:
-                rb = bitter.r
-                zb = bitter.z
+                rb = list(bitter.r)
+                zb = list(bitter.z)
 
             rb[0] = min(rb[0], bitter.r[0])
             zb[0] = min(zb[0], bitter.z[0])
@@ -244,4 +277,5 @@ def Bitters_constructor(loader, node):
     return Bitters(name, magnets, innerbore, outerbore)
 
 
-yaml.add_constructor("!Bitters", Bitters_constructor)
+loaders.add_constructor("!Bitters", Bitters_constructor)
+loaders.add_yaml_object(Bitters)
@@ -8,8 +8,10 @@ Provides Inner and OuterCurrentLead class
 import json
 import yaml
 
+from . import loaders
+from .fingerprint import Fingerprint
 
-class InnerCurrentLead(yaml.YAMLObject):
+class InnerCurrentLead(yaml.YAMLObject, Fingerprint):
     """
     name :
     r : [R0, R1]
@@ -62,7 +64,7 @@ class InnerCurrentLead(yaml.YAMLObject):
         data = None
         try:
             istream = open(self._name + ".yaml", "r")
-            data = yaml.load(istream, Loader=yaml.FullLoader)
+            data = yaml.load(istream, Loader=loaders.get_loader())
             istream.close()
         except:
             raise Exception("Failed to load InnerCurrentLead data %s.yaml" % self._name)
@@ -124,7 +126,7 @@ def InnerCurrentLead_constructor(loader, node):
     return InnerCurrentLead(name, r, h, holes, support, fillet)
 
 
-class OuterCurrentLead(yaml.YAMLObject):
+class OuterCurrentLead(yaml.YAMLObject, Fingerprint):
     """
     name :
 
@@ -175,7 +177,7 @@ class OuterCurrentLead(yaml.YAMLObject):
         data = None
         try:
             istream = open(self.name + ".yaml", "r")
-            data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+            data = yaml.load(stream=istream, Loader=loaders.get_loader())
             istream.close()
         except:
             raise Exception("Failed to load OuterCurrentLead data %s.yaml" % self.name)
@@ -233,5 +235,7 @@ def OuterCurrentLead_constructor(loader, node):
     return OuterCurrentLead(name, r, h, bar, support)
 
 
-yaml.add_constructor("!InnerCurrentLead", InnerCurrentLead_constructor)
-yaml.add_constructor("!OuterCurrentLead", OuterCurrentLead_constructor)
+loaders.add_constructor("!InnerCurrentLead", InnerCurrentLead_constructor)
+loaders.add_constructor("!OuterCurrentLead", OuterCurrentLead_constructor)
+loaders.add_yaml_object(InnerCurrentLead)
+loaders.add_yaml_object(OuterCurrentLead)
@@ -10,16 +10,21 @@ Provides definition for Helix:
 * Shape: definition of Shape eventually added to the helical cut
 """
 
+from typing import Optional
+
+import os
 import math
 import json
 import yaml
 
+from . import loaders
+from .fingerprint import Fingerprint
 from .Shape import Shape
 from .ModelAxi import ModelAxi
 from .Model3D import Model3D
 
 
-class Helix(yaml.YAMLObject):
+class Helix(yaml.YAMLObject, Fingerprint):
     """
     name :
     r :
@@ -107,7 +112,7 @@ class Helix(yaml.YAMLObject):
                 print("helix:", self.name, htype, nturns)
 
         if is2D:
-            nsection = len(self.modelaxi.turns)
+            nsection = self.modelaxi.get_Nsections()
             solid_names.append(f"{prefix}Cu{0}")  # HP
             for j in range(nsection):
                 solid_names.append(f"{prefix}Cu{j+1}")
@@ -167,7 +172,7 @@ class Helix(yaml.YAMLObject):
         data = None
         try:
             with open(f"{self.name}.yaml", "r") as istream:
-                data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+                data = yaml.load(stream=istream, Loader=loaders.get_loader())
         except:
             raise Exception("Failed to load Helix data %s.yaml" % self.name)
 
@@ -223,22 +228,33 @@ class Helix(yaml.YAMLObject):
         """
         return self.modelaxi.get_Nturns()
 
-    def generate_cut(self, format: str = 'SALOME'):
+    def generate_cut(
+        self, format: str = "SALOME", directory: Optional[str] = None
+    ) -> str:
         """
-        create cut files
+        create cut files in directory (default: current directory)
+
+        shapes are only added to the cut in salome format (the lncmi format
+        has no Shape_id column): in lncmi format the plain cut is written
+
+        returns the name of the cut file
         """
         from .cut_utils import create_cut
 
-        if self.model3d.with_shapes:
-            create_cut(self, "LNCMI", self.name)
-            angles = " ".join(f"{t:4.2f}" for t in self.shape.angle if t != 0)
-            cmd = f'add_shape --angle="{angles}" --shape_angular_length={self.shape.length} --shape={self.shape.name} --format={format} --position="{self.shape.position}"'
-            print(f"create_cut: with_shapes not implemented - shall run {cmd}")
+        name = self.name
+        if directory is not None:
+            name = os.path.join(directory, name)
 
-            import subprocess
-            subprocess.run(cmd, shell=True, check=True)
-        else:
-            create_cut(self, format, self.name)
+        with_shapes = self.model3d.with_shapes
+        if with_shapes and format.lower() == "lncmi":
+            import warnings
+
+            warnings.warn(
+                f"Helix({self.name}).generate_cut: no shapes in {format} format"
+            )
+            with_shapes = False
+
+        return create_cut(self, format, name, with_shapes=with_shapes)
 
     def boundingBox(self) -> tuple:
         """
@@ -304,4 +320,5 @@ def Helix_constructor(loader, node):
     return Helix(name, r, z, cutwidth, odd, dble, modelaxi, model3d, shape)
 
 
-yaml.add_constructor("!Helix", Helix_constructor)
+loaders.add_constructor("!Helix", Helix_constructor)
+loaders.add_yaml_object(Helix)
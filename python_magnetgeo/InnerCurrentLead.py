@@ -8,8 +8,10 @@ Provides Inner and OuterCurrentLead class
 import json
 import yaml
 
+from . import loaders
+from .fingerprint import Fingerprint
 
-class InnerCurrentLead(yaml.YAMLObject):
+class InnerCurrentLead(yaml.YAMLObject, Fingerprint):
     """
     name :
     r : [R0, R1]
@@ -70,7 +72,7 @@ class InnerCurrentLead(yaml.YAMLObject):
         data = None
         try:
             with open(f"{self.name}.yaml", "r") as istream:
-                data = yaml.load(istream, Loader=yaml.FullLoader)
+                data = yaml.load(istream, Loader=loaders.get_loader())
         except:
             raise Exception(f"Failed to load InnerCurrentLead data {self.name}.yaml")
 
@@ -129,7 +131,8 @@ def InnerCurrentLead_constructor(loader, node):
     return InnerCurrentLead(name, r, h, holes, support, fillet)
 
 
-yaml.add_constructor("!InnerCurrentLead", InnerCurrentLead_constructor)
+loaders.add_constructor("!InnerCurrentLead", InnerCurrentLead_constructor)
+loaders.add_yaml_object(InnerCurrentLead)
 
 #
 # To operate from command line
@@ -157,7 +160,7 @@ if __name__ == "__main__":
     else:
         lead = None
         with open(args.name, "r") as f:
-            lead = yaml.load(f, Loader=yaml.FullLoader)
+            lead = yaml.load(f, Loader=loaders.get_loader())
         print("lead=", lead)
 
     if args.tojson:
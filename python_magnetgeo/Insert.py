@@ -2,28 +2,113 @@
 # encoding: UTF-8
 
 """defines Insert structure"""
+from typing import Optional
 
 import math
-import datetime
 import json
 import yaml
+
+import numpy as np
+
+from . import loaders
+from .fingerprint import Fingerprint
 from . import InnerCurrentLead
+from . import registry
+from .ModelAxi import ModelAxi
+
+
+def unique_indices(data, tol: float = 1.e-6, groups=None) -> np.ndarray:
+    """
+    return the indices of data to keep once duplicates are removed
+
+    data[j] is a duplicate if some earlier data[i] (i < j, kept or not)
+    satisfies |data[i] - data[j]| <= tol, as in the former pairwise filter.
+    groups (same length as data) restricts duplicates to values of same group.
+    indices are returned in increasing order.
+
+    values are sorted so that the values close to data[j] form a window
+    [lo, hi) of the sorted values: data[j] is kept if it has the smallest
+    index of its window (range minimum from a sparse table, O(n log n))
+    """
+    data = np.asarray(data, dtype=float)
+    n = data.size
+    if n == 0:
+        return np.zeros(0, dtype=int)
+
+    if groups is None:
+        groups = np.zeros(n)
+    groups = np.asarray(groups, dtype=float)
+    order = np.lexsort((data, groups))
+    (g, d) = (groups[order], data[order])
+
+    # complex numbers are ordered by real (group) then imaginary (value) part
+    keys = np.empty(n, dtype=complex)
+    keys.real = g
+    keys.imag = d
+    bounds = np.empty(n, dtype=complex)
+    bounds.real = g
+    bounds.imag = d - tol
+    lo = np.searchsorted(keys, bounds, side="left")
+    bounds.imag = d + tol
+    hi = np.searchsorted(keys, bounds, side="right")
+
+    # fix bounds rounding so that windows match |data[i] - data[j]| <= tol
+    def close(p):
+        p = np.clip(p, 0, n - 1)
+        return (g[p] == g) & (np.abs(d[p] - d) <= tol)
+
+    while True:
+        grow_lo = (lo > 0) & close(lo - 1)
+        shrink_lo = ~close(lo)
+        grow_hi = (hi < n) & close(hi)
+        shrink_hi = ~close(hi - 1)
+        if not (grow_lo | shrink_lo | grow_hi | shrink_hi).any():
+            break
+        lo += shrink_lo.astype(int) - grow_lo.astype(int)
+        hi += grow_hi.astype(int) - shrink_hi.astype(int)
+
+    # sparse table: table[k, p] = min(order[p : p + 2**k])
+    table = [order]
+    while 2 ** len(table) <= n:
+        (prev, k) = (table[-1], 2 ** (len(table) - 1))
+        table.append(np.concatenate((np.minimum(prev[:-k], prev[k:]), prev[-k:])))
+    table = np.array(table)
+
+    level = np.frexp(hi - lo)[1] - 1
+    first = np.minimum(table[level, lo], table[level, hi - 2**level])
+    return np.sort(order[first == order])
 
 
 def filter(data: list[float], tol: float = 1.e-6) -> list[float]:
-    result = []
-    ndata = len(data)
-    for i in range(ndata):
-        result += [
-            j for j in range(i, ndata) if i != j and abs(data[i] - data[j]) <= tol
-        ]
-    # print(f"duplicate index: {result}")
+    """
+    remove duplicates from data: |data[i] - data[j]| <= tol means data[i] == data[j]
+
+    returns a list (or an array if data is an array) in data order
+    """
+    index = unique_indices(data, tol)
+    if isinstance(data, np.ndarray):
+        return data[index]
+    return [data[i] for i in index]
+
+
+def filter_batch(datas: list[list[float]], tol: float = 1.e-6) -> list[list[float]]:
+    """
+    apply filter to each list of datas in one pass
+    """
+    sizes = [len(data) for data in datas]
+    values = np.concatenate([np.asarray(data, dtype=float) for data in datas] + [[]])
+    groups = np.repeat(np.arange(len(datas)), sizes)
+    index = unique_indices(values, tol, groups)
 
-    # remove result from data
-    return [data[i] for i in range(ndata) if not i in result]
+    offsets = np.cumsum([0] + sizes)
+    bounds = np.searchsorted(index, offsets)
+    return [
+        [data[j - offsets[i]] for j in index[bounds[i] : bounds[i + 1]]]
+        for i, data in enumerate(datas)
+    ]
 
 
-class Insert(yaml.YAMLObject):
+class Insert(registry.Assembly, yaml.YAMLObject, Fingerprint):
     """
     name :
     Helices :
@@ -133,10 +218,8 @@ class Insert(yaml.YAMLObject):
         NChannels = NHelices + 1  # To be updated if there is any htype==HR in Insert
         NIsolants = []  # To be computed depend on htype and dble
         for i, helix in enumerate(self.Helices):
-            hHelix = None
             Ninsulators = 0
-            with open(f"{helix}.yaml", "r") as f:
-                hHelix = yaml.load(f, Loader=yaml.FullLoader)
+            hHelix = registry.get_part(self, helix)
 
             if is2D:
                 h_solid_names = hHelix.get_names(f"{prefix}H{i+1}", is2D, verbose)
@@ -153,8 +236,7 @@ class Insert(yaml.YAMLObject):
         if not is2D:
             if self.CurrentLeads is not None:
                 for i, Lead in enumerate(self.CurrentLeads):
-                    with open(Lead + ".yaml", "r") as f:
-                        clLead = yaml.load(f, Loader=yaml.FullLoader)
+                    clLead = registry.get_part(self, Lead)
                     prefix = "o"
                     if isinstance(clLead, InnerCurrentLead.InnerCurrentLead):
                         prefix = "i"
@@ -171,6 +253,32 @@ class Insert(yaml.YAMLObject):
 
         return len(self.Helices)
 
+    def generate_cuts(
+        self,
+        format: str = "SALOME",
+        workers: Optional[int] = None,
+        directory: Optional[str] = None,
+        workingDir: Optional[str] = None,
+    ) -> dict:
+        """
+        create cut files for all helices
+
+        workers: number of processes used
+        directory: where cut files are written
+        workingDir: where parts are loaded from
+
+        returns the manifest of cut files (see cut_utils.generate_cuts)
+        """
+        from .cut_utils import generate_cuts
+
+        return generate_cuts(self, format, workers, directory, workingDir)
+
+    def resolve(self, directory: Optional[str] = None):
+        """
+        return a copy of Insert with Helices, Rings and CurrentLeads loaded once for all
+        """
+        return registry.resolve(self, directory)
+
     def __repr__(self):
         """representation"""
         return (
@@ -201,7 +309,7 @@ class Insert(yaml.YAMLObject):
         data = None
         try:
             with open(f"{self.name}.yaml", "r") as istream:
-                data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+                data = yaml.load(stream=istream, Loader=loaders.get_loader())
         except:
             raise Exception("Failed to load Insert data %s" % (self.name + ".yaml"))
 
@@ -258,13 +366,11 @@ class Insert(yaml.YAMLObject):
         zb = [0, 0]
 
         for i, name in enumerate(self.Helices):
-            Helix = None
-            with open(name + ".yaml", "r") as f:
-                Helix = yaml.load(f, Loader=yaml.FullLoader)
+            Helix = registry.get_part(self, name)
 
             if i == 0:
-                rb = Helix.r
-                zb = Helix.z
+                rb = list(Helix.r)
+                zb = list(Helix.z)
 
             rb[0] = min(rb[0], Helix.r[0])
             zb[0] = min(zb[0], Helix.z[0])
@@ -273,9 +379,7 @@ class Insert(yaml.YAMLObject):
 
         ring_dz_max = 0
         for i, name in enumerate(self.Rings):
-            Ring = None
-            with open(name + ".yaml", "r") as f:
-                Ring = yaml.load(f, Loader=yaml.FullLoader)
+            Ring = registry.get_part(self, name)
 
             ring_dz_max = abs(Ring.z[-1] - Ring.z[0])
 
@@ -303,629 +407,52 @@ class Insert(yaml.YAMLObject):
             collide = True
         return collide
 
-    def Create_AxiGeo(self, AirData):
+    def Create_AxiGeo(self, AirData, directory: Optional[str] = None):
         """
-        create Axisymetrical Geo Model for gmsh
+        create Axisymetrical Geo Model for gmsh (see geo_axi)
 
         return
         H_ids, R_ids, BC_ids, Air_ids, BC_Air_ids
+        BC_ids and BC_Air_ids map physical line names to line ids
+
+        see Create_AxiModel to build the model with the gmsh python API
         """
-        import getpass
-
-        UserName = getpass.getuser()
-
-        geofilename = self.name + "_axi.geo"
-        geofile = open(geofilename, "w")
-
-        # Preambule
-        geofile.write(f"//{self.name}\n")
-        geofile.write("// AxiSymetrical Geometry Model\n")
-        geofile.write(f"//{UserName}\n")
-        geofile.write(f"//{datetime.datetime.now().strftime('%y-%m-%d %Hh%M')}\n")
-        geofile.write("\n")
-
-        # Mesh Preambule
-        geofile.write("// Mesh Preambule\n")
-        geofile.write("Mesh.Algorithm=3;\n")
-        geofile.write("Mesh.RecombinationAlgorithm=0; // Deactivate Blossom support\n")
-        geofile.write(
-            "Mesh.RemeshAlgorithm=1; //(0=no split, 1=automatic, 2=automatic only with metis)\n"
-        )
-        geofile.write("Mesh.RemeshParametrization=0; //\n\n")
-
-        # Define Parameters
-        geofile.write("//Geometric Parameters\n")
-        onelab_r0 = 'DefineConstant[ r0_H%d = {%g, Name "Geom/H%d/Rint"} ];\n'  # should add a min and a max
-        onelab_r1 = 'DefineConstant[ r1_H%d = {%g, Name "Geom/H%d/Rext"} ];\n'
-        onelab_z0 = 'DefineConstant[ z0_H%d = {%g, Name "Geom/H%d/Zinf"} ];\n'  #  should add a min and a max
-        onelab_z1 = 'DefineConstant[ z1_H%d = {%g, Name "Geom/H%d/Zsup"} ];\n'
-        onelab_lc = 'DefineConstant[ lc_H%d = {%g, Name "Geom/H%d/lc"} ];\n'
-        onelab_z_R = 'DefineConstant[ dz_R%d = {%g, Name "Geom/R%d/dz"} ];\n'
-        onelab_lc_R = 'DefineConstant[ lc_R%d = {%g, Name "Geom/R%d/lc"} ];\n'
-
-        # Define Geometry
-        onelab_point = "Point(%d)= {%s,%g, 0.0, lc_H%d};\n"
-        onelab_pointx = "Point(%d)= {%s,%s, 0.0, lc_H%d};\n"
-        onelab_point_gen = "Point(%d)= {%s,%s, 0.0, %s};\n"
-        onelab_line = "Line(%d)= {%d, %d};\n"
-        onelab_circle = "Circle(%d)= {%d, %d, %d};\n"
-        onelab_lineloop = "Line Loop(%d)= {%d, %d, %d, %d};\n"
-        onelab_lineloop_R = "Line Loop(%d)= {%d, %d, %d, %d, %d, %d, %d, %d};\n"
-        onelab_planesurf = "Plane Surface(%d)= {%d};\n"
-        onelab_phys_surf = "Physical Surface(%d) = {%d};\n"
-
-        H_ids = []  # gsmh ids for Helix
-        Rint_ids = []
-        Rext_ids = []
-        BP_ids = []
-        HP_ids = []
-        dH_ids = []
-
-        point = 1
-        line = 1
-        lineloop = 1
-        planesurf = 1
+        from .geo_axi import create_geo
 
-        for i, name in enumerate(self.Helices):
-            H = []
-            Rint = []
-            Rext = []
-            BP = []
-            HP = []
-            dH = []
-
-            Helix = None
-            with open(name + ".yaml", "r") as f:
-                Helix = yaml.load(f, Loader=yaml.FullLoader)
-            geofile.write(f"// H{i+1} : {Helix.name}\n")
-            geofile.write(onelab_r0 % (i + 1, Helix.r[0], i + 1))
-            geofile.write(onelab_r1 % (i + 1, Helix.r[1], i + 1))
-            geofile.write(onelab_z0 % (i + 1, Helix.z[0], i + 1))
-            geofile.write(onelab_z1 % (i + 1, Helix.z[1], i + 1))
-            geofile.write(onelab_lc % (i + 1, (Helix.r[1] - Helix.r[0]) / 5.0, i + 1))
-
-            axi = Helix.modelaxi  # h, turns, pitch
-
-            geofile.write(onelab_pointx % (point, f"r0_H{i+1}", f"z0_H{i+1}", i + 1))
-            geofile.write(
-                onelab_pointx % (point + 1, f"r1_H{i+1}", f"z0_H{i+1}", i + 1)
-            )
-            geofile.write(onelab_point % (point + 2, f"r1_H{i+1}", -axi.h, i + 1))
-            geofile.write(onelab_point % (point + 3, f"r0_H{i+1}", -axi.h, i + 1))
-
-            geofile.write(onelab_line % (line, point, point + 1))
-            geofile.write(onelab_line % (line + 1, point + 1, point + 2))
-            geofile.write(onelab_line % (line + 2, point + 2, point + 3))
-            geofile.write(onelab_line % (line + 3, point + 3, point))
-            BP_ids.append(line)
-            Rint.append(line + 3)
-            Rext.append(line + 1)
-            dH.append([line + 3, line, line + 1])
-
-            geofile.write(
-                onelab_lineloop % (lineloop, line, line + 1, line + 2, line + 3)
-            )
-            geofile.write(onelab_planesurf % (planesurf, lineloop))
-            geofile.write(onelab_phys_surf % (planesurf, planesurf))
-            H.append(planesurf)
-            dH.append(lineloop)
-
-            point += 4
-            line += 4
-            lineloop += 1
-            planesurf += 1
-
-            z = Helix.z[0]
-            dz = 2 * axi.h / float(len(axi.pitch))
-            z = -axi.h
-            for n, p in enumerate(axi.pitch):
-                geofile.write(onelab_point % (point, "r0_H%d" % (i + 1), z, i + 1))
-                geofile.write(onelab_point % (point + 1, "r1_H%d" % (i + 1), z, i + 1))
-                geofile.write(
-                    onelab_point % (point + 2, "r1_H%d" % (i + 1), z + dz, i + 1)
-                )
-                geofile.write(
-                    onelab_point % (point + 3, "r0_H%d" % (i + 1), z + dz, i + 1)
-                )
-
-                geofile.write(onelab_line % (line, point, point + 1))
-                geofile.write(onelab_line % (line + 1, point + 1, point + 2))
-                geofile.write(onelab_line % (line + 2, point + 2, point + 3))
-                geofile.write(onelab_line % (line + 3, point + 3, point))
-                Rint.append(line + 3)
-                Rext.append(line + 1)
-
-                geofile.write(
-                    onelab_lineloop % (lineloop, line, line + 1, line + 2, line + 3)
-                )
-                geofile.write(onelab_planesurf % (planesurf, lineloop))
-                geofile.write(onelab_phys_surf % (planesurf, planesurf))
-                H.append(planesurf)
-                dH.append(lineloop)
-
-                point += 4
-                line += 4
-                lineloop += 1
-                planesurf += 1
-
-                z += dz
-
-            geofile.write(onelab_point % (point, "r0_H%d" % (i + 1), axi.h, i + 1))
-            geofile.write(onelab_point % (point + 1, "r1_H%d" % (i + 1), axi.h, i + 1))
-            geofile.write(
-                onelab_pointx
-                % (point + 2, "r1_H%d" % (i + 1), "z1_H%d" % (i + 1), i + 1)
-            )
-            geofile.write(
-                onelab_pointx
-                % (point + 3, "r0_H%d" % (i + 1), "z1_H%d" % (i + 1), i + 1)
-            )
+        return create_geo(self, AirData, directory)
 
-            geofile.write(onelab_line % (line, point, point + 1))
-            geofile.write(onelab_line % (line + 1, point + 1, point + 2))
-            geofile.write(onelab_line % (line + 2, point + 2, point + 3))
-            geofile.write(onelab_line % (line + 3, point + 3, point))
+    def Create_AxiModel(self, AirData=None, directory: Optional[str] = None) -> tuple:
+        """
+        create Axisymetrical Model with the gmsh python API (see gmsh_axi)
 
-            geofile.write(
-                onelab_lineloop % (lineloop, line, line + 1, line + 2, line + 3)
-            )
-            geofile.write(onelab_planesurf % (planesurf, lineloop))
-            geofile.write(onelab_phys_surf % (planesurf, planesurf))
-            H.append(planesurf)
-            Rint.append(line + 3)
-            Rext.append(line + 1)
-
-            # dH.append(Rext)
-            # dH.append([line+1,line+2, line+3])
-            # for id in reversed(Rint):
-            #     dH.append([id])
-            dH.append(lineloop)
-
-            H_ids.append(H)
-            HP_ids.append(line + 2)
-            Rint_ids.append(Rint)
-            Rext_ids.append(Rext)
-
-            dH_ids.append(
-                dH
-            )  #### append(reduce(operator.add, dH)) #other way to flatten dH : list(itertools.chain(*dH))
-            geofile.write("\n")
-
-            point += 4
-            line += 4
-            lineloop += 1
-            planesurf += 1
-
-        # Add Rings
-        Ring_ids = []
-        HP_Ring_ids = []
-        BP_Ring_ids = []
-        dR_ids = []
-
-        H0 = 0
-        H1 = 1
-        for i, name in enumerate(self.Rings):
-            R = []
-            Rint = []
-            Rext = []
-            BP = []
-            HP = []
-
-            Ring = None
-            with open(name + ".yaml", "r") as f:
-                Ring = yaml.load(f, Loader=yaml.FullLoader)
-            geofile.write(
-                "// R%d [%d, H%d] : %s\n" % (i + 1, H0 + 1, H1 + 1, Ring.name)
-            )
-            geofile.write(onelab_z_R % (i + 1, (Ring.z[1] - Ring.z[0]), i + 1))
-            geofile.write(onelab_lc_R % (i + 1, (Ring.r[3] - Ring.r[0]) / 5.0, i + 1))
-
-            if Ring.BPside:
-                geofile.write(
-                    onelab_pointx
-                    % (point, "r0_H%d" % (H0 + 1), "z1_H%d" % (H0 + 1), i + 1)
-                )
-                geofile.write(
-                    onelab_pointx
-                    % (point + 1, "r1_H%d" % (H0 + 1), "z1_H%d" % (H0 + 1), i + 1)
-                )
-                geofile.write(
-                    onelab_pointx
-                    % (point + 2, "r0_H%d" % (H1 + 1), "z1_H%d" % (H1 + 1), i + 1)
-                )
-                geofile.write(
-                    onelab_pointx
-                    % (point + 3, "r1_H%d" % (H1 + 1), "z1_H%d" % (H1 + 1), i + 1)
-                )
-
-                geofile.write(
-                    onelab_pointx
-                    % (
-                        point + 4,
-                        "r1_H%d" % (H1 + 1),
-                        "z1_H%d+dz_R%d" % (H1 + 1, i + 1),
-                        i + 1,
-                    )
-                )
-                geofile.write(
-                    onelab_pointx
-                    % (
-                        point + 5,
-                        "r0_H%d" % (H1 + 1),
-                        "z1_H%d+dz_R%d" % (H1 + 1, i + 1),
-                        i + 1,
-                    )
-                )
-                geofile.write(
-                    onelab_pointx
-                    % (
-                        point + 6,
-                        "r1_H%d" % (H0 + 1),
-                        "z1_H%d+dz_R%d" % (H0 + 1, i + 1),
-                        i + 1,
-                    )
-                )
-                geofile.write(
-                    onelab_pointx
-                    % (
-                        point + 7,
-                        "r0_H%d" % (H0 + 1),
-                        "z1_H%d+dz_R%d" % (H0 + 1, i + 1),
-                        i + 1,
-                    )
-                )
-            else:
-                geofile.write(
-                    onelab_pointx
-                    % (
-                        point,
-                        "r0_H%d" % (H0 + 1),
-                        "z0_H%d-dz_R%d" % (H0 + 1, i + 1),
-                        i + 1,
-                    )
-                )
-                geofile.write(
-                    onelab_pointx
-                    % (
-                        point + 1,
-                        "r1_H%d" % (H0 + 1),
-                        "z0_H%d-dz_R%d" % (H0 + 1, i + 1),
-                        i + 1,
-                    )
-                )
-                geofile.write(
-                    onelab_pointx
-                    % (
-                        point + 2,
-                        "r0_H%d" % (H1 + 1),
-                        "z0_H%d-dz_R%d" % (H1 + 1, i + 1),
-                        i + 1,
-                    )
-                )
-                geofile.write(
-                    onelab_pointx
-                    % (
-                        point + 3,
-                        "r1_H%d" % (H1 + 1),
-                        "z0_H%d-dz_R%d" % (H1 + 1, i + 1),
-                        i + 1,
-                    )
-                )
-
-                geofile.write(
-                    onelab_pointx
-                    % (point + 4, "r1_H%d" % (H1 + 1), "z0_H%d" % (H1 + 1), i + 1)
-                )
-                geofile.write(
-                    onelab_pointx
-                    % (point + 5, "r0_H%d" % (H1 + 1), "z0_H%d" % (H1 + 1), i + 1)
-                )
-                geofile.write(
-                    onelab_pointx
-                    % (point + 6, "r1_H%d" % (H0 + 1), "z0_H%d" % (H0 + 1), i + 1)
-                )
-                geofile.write(
-                    onelab_pointx
-                    % (point + 7, "r0_H%d" % (H0 + 1), "z0_H%d" % (H0 + 1), i + 1)
-                )
-
-            geofile.write(onelab_line % (line, point, point + 1))
-            geofile.write(onelab_line % (line + 1, point + 1, point + 2))
-            geofile.write(onelab_line % (line + 2, point + 2, point + 3))
-            geofile.write(onelab_line % (line + 3, point + 3, point + 4))
-            geofile.write(onelab_line % (line + 4, point + 4, point + 5))
-            geofile.write(onelab_line % (line + 5, point + 5, point + 6))
-            geofile.write(onelab_line % (line + 6, point + 6, point + 7))
-            geofile.write(onelab_line % (line + 7, point + 7, point))
-
-            if Ring.BPside:
-                HP_Ring_ids.append([line + 4, line + 5, line + 6])
-            else:
-                BP_Ring_ids.append([line + 4, line + 5, line + 6])
-
-            geofile.write(
-                onelab_lineloop_R
-                % (
-                    lineloop,
-                    line,
-                    line + 1,
-                    line + 2,
-                    line + 3,
-                    line + 4,
-                    line + 5,
-                    line + 6,
-                    line + 7,
-                )
-            )
-            geofile.write(onelab_planesurf % (planesurf, lineloop))
-            geofile.write(onelab_phys_surf % (planesurf, planesurf))
-            Ring_ids.append(planesurf)
-
-            Rint_ids[H0].append(line + 7)
-            Rext_ids[H1].append(line + 3)
-            dR_ids.append(lineloop)
-
-            H0 = H1
-            H1 += 1
-
-            point += 8
-            line += 8
-            lineloop += 1
-            planesurf += 1
-
-        # create physical lines
-        for i, r_ids in enumerate(Rint_ids):
-            geofile.write('Physical Line("H%dChannel0") = {' % (i + 1))
-            for id in r_ids:
-                geofile.write("%d" % id)
-                if id != r_ids[-1]:
-                    geofile.write(",")
-            geofile.write("};\n")
-
-        for i, r_ids in enumerate(Rext_ids):
-            geofile.write('Physical Line("H%dChannel1") = {' % (i + 1))
-            for id in r_ids:
-                geofile.write("%d" % id)
-                if id != r_ids[-1]:
-                    geofile.write(",")
-            geofile.write("};\n")
-
-        geofile.write('Physical Line("HP_H%d") = ' % (0))
-        geofile.write("{%d};\n" % HP_ids[0])
-
-        if len(self.Helices) % 2 == 0:
-            geofile.write('Physical Line("HP_H%d") = ' % (len(self.Helices)))
-            geofile.write("{%d};\n" % HP_ids[-1])
-        else:
-            geofile.write('Physical Line("BP_H%d") = ' % (len(self.Helices)))
-            geofile.write("{%d};\n" % BP_ids[-1])
-
-        for i, _ids in enumerate(HP_Ring_ids):
-            geofile.write('Physical Line("HP_R%d") =  {' % (i + 1))
-            for id in _ids:
-                geofile.write("%d" % id)
-                if id != _ids[-1]:
-                    geofile.write(",")
-            geofile.write("};\n")
-
-        for i, _ids in enumerate(BP_Ring_ids):
-            geofile.write('Physical Line("BP_R%d") =  {' % (i + 1))
-            for id in _ids:
-                geofile.write("%d" % id)
-                if id != _ids[-1]:
-                    geofile.write(",")
-            geofile.write("};\n")
-
-        # BC_ids should contains "H%dChannel%d", "HP_R%d" and "BP_R%d"
-        BC_ids = []
-
-        # Air
-        Air_ids = []
-        BC_Air_ids = []
-        if AirData:
-            Axis_ids = []
-            Infty_ids = []
-
-            geofile.write("// Define Air\n")
-            onelab_r_air = 'DefineConstant[ r_Air = {%g, Name "Geom/Air/factor_R"} ];\n'
-            onelab_z_air = 'DefineConstant[ z_Air = {%g, Name "Geom/Air/factor_Z"} ];\n'  #  should add a min and a max
-            onelab_lc_air = 'DefineConstant[ lc_Air = {%g, Name "Geom/Air/lc"} ];\n'
-            geofile.write(onelab_r_air % (1.2))
-            geofile.write(onelab_z_air % (1.2))
-            geofile.write(onelab_lc_air % (2))
-
-            H0 = 0
-            Hn = len(self.Helices) - 1
-
-            geofile.write(onelab_pointx % (point, "0", f"z_Air * z0_H{H0+1}", H0 + 1))
-            geofile.write(
-                onelab_pointx
-                % (
-                    point + 1,
-                    f"r_Air * r1_H{Hn+1}",
-                    "z_Air * z0_H%d" % (H0 + 1),
-                    H0 + 1,
-                )
-            )
-            geofile.write(
-                onelab_pointx
-                % (
-                    point + 2,
-                    f"r_Air * r1_H{Hn+1}",
-                    "z_Air * z1_H%d" % (Hn + 1),
-                    Hn + 1,
-                )
-            )
-            geofile.write(
-                onelab_pointx % (point + 3, f"0", "z_Air * z1_H{Hn+1}", Hn + 1)
-            )
+        gmsh must be installed and initialized
 
-            geofile.write(onelab_line % (line, point, point + 1))
-            geofile.write(onelab_line % (line + 1, point + 1, point + 2))
-            geofile.write(onelab_line % (line + 2, point + 2, point + 3))
-            geofile.write(onelab_line % (line + 3, point + 3, point))
-            Axis_ids.append(line + 3)
+        return
+        H_ids, R_ids, BC_ids, Air_ids, BC_Air_ids (gmsh tags)
+        """
+        from .gmsh_axi import create_model
 
-            geofile.write(
-                onelab_lineloop % (lineloop, line, line + 1, line + 2, line + 3)
-            )
-            geofile.write("Plane Surface(%d)= {%d, " % (planesurf, lineloop))
-            for _ids in H_ids:
-                for _id in _ids:
-                    geofile.write(f"{-_id}")
-            for _id in dR_ids:
-                geofile.write(f"{-_id}")
-                if _id != dR_ids[-1]:
-                    geofile.write(",")
-            Air_ids.append(planesurf)
-
-            geofile.write("};\n")
-            # geofile.write(onelab_planesurf%(planesurf, lineloop))
-            geofile.write(onelab_phys_surf % (planesurf, planesurf))
-
-            dAir = lineloop
-            axis_HP = point
-            axis_BP = point + 3
-            Air_line = line
-
-            point += 4
-            line += 4
-            lineloop += 1
-            planesurf += 1
-
-            # Define Infty
-            geofile.write("// Define Infty\n")
-            onelab_rint_infty = (
-                'DefineConstant[ Val_Rint = {%g, Name "Geom/Infty/Val_Rint"} ];\n'
-            )
-            onelab_rext_infty = (
-                'DefineConstant[ Val_Rext = {%g, Name "Geom/Infty/Val_Rext"} ];\n'
-            )
-            onelab_lc_infty = (
-                'DefineConstant[ lc_infty = {%g, Name "Geom/Infty/lc_inft"} ];\n'
-            )
-            onelab_point_infty = "Point(%d)= {%s,%s, 0.0, %s};\n"
-            geofile.write(onelab_rint_infty % (4))
-            geofile.write(onelab_rext_infty % (5))
-            geofile.write(onelab_lc_infty % (100))
+        return create_model(self, AirData, directory)
 
-            center = point
-            geofile.write(onelab_point_gen % (center, "0", "0", "lc_Air"))
-            point += 1
+    def get_params(self, workingDir: str = "."):
+        """
+        get hydraulic params per channel (see hydraulics.HydraulicParams)
 
-            Hn = len(self.Helices)
+        unpacks as (NHelices, NRings, NChannels, Nsections, R1, R2, Dh, Sh, Zc)
 
-            geofile.write(
-                onelab_point_gen % (point, "0", f"-Val_Rint * r1_H{Hn}", "lc_infty")
-            )
-            geofile.write(
-                onelab_point_gen % (point + 1, f"Val_Rint * r1_H{Hn}", "0", "lc_infty")
-            )
-            geofile.write(
-                onelab_point_gen % (point + 2, "0", f"Val_Rint * r1_H{Hn}", "lc_infty")
-            )
+        result is only computed again when Insert or one of its parts changes
+        """
+        from . import hydraulics
 
-            geofile.write(onelab_circle % (line, point, center, point + 1))
-            geofile.write(onelab_circle % (line + 1, point + 1, center, point + 2))
-            geofile.write(onelab_line % (line + 2, point + 2, axis_BP))
-            geofile.write(onelab_line % (line + 3, axis_HP, point))
-            Axis_ids.append(line + 2)
-            Axis_ids.append(line + 3)
-
-            geofile.write("Line Loop(%d) = {" % lineloop)
-            geofile.write("%d, " % line)
-            geofile.write("%d, " % (line + 1))
-            geofile.write("%d, " % (line + 2))
-            geofile.write("%d, " % (-(Air_line + 2)))
-            geofile.write("%d, " % (-(Air_line + 1)))
-            geofile.write("%d, " % (-(Air_line)))
-            geofile.write("%d};\n " % (line + 3))
-
-            geofile.write(onelab_planesurf % (planesurf, lineloop))
-            geofile.write(onelab_phys_surf % (planesurf, planesurf))
-            Air_ids.append(planesurf)
-
-            axis_HP = point
-            axis_BP = point + 2
-            Air_line = line
-
-            point += 3
-            line += 4
-            lineloop += 1
-            planesurf += 1
-
-            geofile.write(
-                onelab_point_gen % (point, "0", "-Val_Rext * r1_H%d" % Hn, "lc_infty")
-            )
-            geofile.write(
-                onelab_point_gen
-                % (point + 1, "Val_Rext * r1_H%d" % Hn, "0", "lc_infty")
-            )
-            geofile.write(
-                onelab_point_gen
-                % (point + 2, "0", "Val_Rext * r1_H%d" % Hn, "lc_infty")
-            )
+        return hydraulics.params.memoize(
+            self, lambda: self._compute_params(workingDir), workingDir
+        )
 
-            geofile.write(onelab_circle % (line, point, center, point + 1))
-            geofile.write(onelab_circle % (line + 1, point + 1, center, point + 2))
-            geofile.write(onelab_line % (line + 2, point + 2, axis_BP))
-            geofile.write(onelab_line % (line + 3, axis_HP, point))
-            Axis_ids.append(line + 2)
-            Axis_ids.append(line + 3)
-            Infty_ids.append(line)
-            Infty_ids.append(line + 1)
-
-            geofile.write("Line Loop(%d) = {" % lineloop)
-            geofile.write("%d, " % line)
-            geofile.write("%d, " % (line + 1))
-            geofile.write("%d, " % (line + 2))
-            geofile.write("%d, " % (-(Air_line + 1)))
-            geofile.write("%d, " % (-(Air_line)))
-            geofile.write("%d};\n " % (line + 3))
-            geofile.write(onelab_planesurf % (planesurf, lineloop))
-            geofile.write(onelab_phys_surf % (planesurf, planesurf))
-            Air_ids.append(planesurf)
-
-            # Add Physical Lines
-            geofile.write('Physical Line("Axis") =  {')
-            for id in Axis_ids:
-                geofile.write("%d" % id)
-                if id != Axis_ids[-1]:
-                    geofile.write(",")
-            geofile.write("};\n")
-
-            geofile.write('Physical Line("Infty") =  {')
-            for id in Infty_ids:
-                geofile.write("%d" % id)
-                if id != Infty_ids[-1]:
-                    geofile.write(",")
-            geofile.write("};\n")
-
-            # BC_Airs_ids should contains "Axis" and "Infty"
-
-        # coherence
-        geofile.write("\nCoherence;\n")
-        geofile.close()
-
-        return (H_ids, Ring_ids, BC_ids, Air_ids, BC_Air_ids)
-
-    def get_params(self, workingDir: str = ".") -> tuple:
+    def _compute_params(self, workingDir: str = "."):
         """
-        get params
-
-        NHelices,
-        NRings,
-        NChannels,
-        Nsections
-
-        R1
-        R2
-        Z1
-        Z2
-        Dh,
-        Sh,
-        Zh
+        compute params
         """
+        from .hydraulics import HydraulicParams
 
         NHelices = len(self.Helices)
         NRings = len(self.Rings)
@@ -942,27 +469,18 @@ class Insert(yaml.YAMLObject):
 
         Zh = []
         for i, helix in enumerate(self.Helices):
-            hhelix = None
-            print(f"{workingDir}/{helix}.yaml")
-            with open(f"{workingDir}/{helix}.yaml", "r") as f:
-                hhelix = yaml.load(f, Loader=yaml.FullLoader)
-            n_sections = len(hhelix.modelaxi.turns)
+            hhelix = registry.get_part(self, helix, workingDir)
+            n_sections = hhelix.modelaxi.get_Nsections()
             Nsections.append(n_sections)
             Nturns_h.append(hhelix.modelaxi.turns)
 
             R1.append(hhelix.r[0])
             R2.append(hhelix.r[1])
 
-            z = -hhelix.modelaxi.h
             (turns, pitch) = hhelix.modelaxi.compact()
+            z = ModelAxi("", hhelix.modelaxi.h, turns, pitch).z_boundaries()
 
-            tZh = []
-            tZh.append(hhelix.z[0])
-            tZh.append(z)
-            for n, p in zip(turns, pitch):
-                z += n * p
-                tZh.append(z)
-            tZh.append(hhelix.z[1])
+            tZh = [hhelix.z[0]] + z.tolist() + [hhelix.z[1]]
             Zh.append(tZh)
             # print(f"Zh[{i}]: {Zh[-1]}")
 
@@ -977,9 +495,7 @@ class Insert(yaml.YAMLObject):
 
         Zr = []
         for i, ring in enumerate(self.Rings):
-            hring = None
-            with open(f"{workingDir}/{ring}.yaml", "r") as f:
-                hring = yaml.load(f, Loader=yaml.FullLoader)
+            hring = registry.get_part(self, ring, workingDir)
 
             dz = abs(hring.z[1] - hring.z[0])
             if i % 2 == 1:
@@ -992,7 +508,7 @@ class Insert(yaml.YAMLObject):
         # print(f"Zr: {Zr}")
 
         # get Z per Channel for Tw(z) estimate
-        Zc = []
+        nZhs = []
         Zi = []
         for i in range(NChannels - 1):
             nZh = Zh[i] + Zi
@@ -1008,8 +524,7 @@ class Insert(yaml.YAMLObject):
                 nZh.append(Zr[i - 2])
 
             nZh.sort()
-            Zc.append(filter(nZh))
-            # remove duplicates (requires to have a compare method with a tolerance: |z[i] - z[j]| <= tol means z[i] == z[j])
+            nZhs.append(nZh)
             Zi = Zh[i]
 
             # print(f"Zh[{i}]={Zh[i]}")
@@ -1018,8 +533,10 @@ class Insert(yaml.YAMLObject):
         # Add latest Channel: Zh[-1] + R[-1]
         nZh = Zh[-1] + [Zr[-1]]
         nZh.sort()
-        Zc.append(filter(nZh))
-        nZh = []
+        nZhs.append(nZh)
+
+        # remove duplicates (|z[i] - z[j]| <= tol means z[i] == z[j])
+        Zc = filter_batch(nZhs)
 
         Zmin = 0
         Zmax = 0
@@ -1032,7 +549,28 @@ class Insert(yaml.YAMLObject):
 
         Dh.append(2 * (Rext - Rint))
         Sh.append(math.pi * (Rext - Rint) * (Rext + Rint))
-        return (NHelices, NRings, NChannels, Nsections, R1, R2, Dh, Sh, Zc)
+        return HydraulicParams(
+            Dh,
+            Sh,
+            Zc,
+            legacy=(
+                "NHelices",
+                "NRings",
+                "NChannels",
+                "Nsections",
+                "R1",
+                "R2",
+                "Dh",
+                "Sh",
+                "Zc",
+            ),
+            NHelices=NHelices,
+            NRings=NRings,
+            NChannels=NChannels,
+            Nsections=Nsections,
+            R1=R1,
+            R2=R2,
+        )
 
 
 def Insert_constructor(loader, node):
@@ -1051,4 +589,5 @@ def Insert_constructor(loader, node):
     )
 
 
-yaml.add_constructor("!Insert", Insert_constructor)
+loaders.add_constructor("!Insert", Insert_constructor)
+loaders.add_yaml_object(Insert)
@@ -7,13 +7,15 @@ Provides definition for Site:
 """
 from typing import Union, Optional
 
-import os
-
 import json
 import yaml
 
+from . import loaders
+from .fingerprint import Fingerprint
+from . import registry
+
 
-class MSite(yaml.YAMLObject):
+class MSite(registry.Assembly, yaml.YAMLObject, Fingerprint):
     """
     name :
     magnets : dict holding magnet list ("insert", "Bitter", "Supra")
@@ -48,38 +50,39 @@ class MSite(yaml.YAMLObject):
         return f"name: {self.name}, magnets:{self.magnets}, screens: {self.screens}, z_offset={self.z_offset}, r_offset={self.r_offset}, paralax_offset={self.paralax}"
 
     def get_channels(
-        self, mname: str, hideIsolant: bool = True, debug: bool = False
+        self,
+        mname: str,
+        hideIsolant: bool = True,
+        debug: bool = False,
+        max_workers: Optional[int] = None,
     ) -> dict:
         """
         get Channels def as dict
+
+        max_workers: number of threads used to load magnets
         """
         print(f"MSite/get_channels:")
+        registry.prefetch(self, max_workers=max_workers)
 
         Channels = {}
         if isinstance(self.magnets, str):
-            YAMLFile = f"{self.magnets}.yaml"
-            with open(YAMLFile, "r") as f:
-                Object = yaml.load(f, Loader=yaml.FullLoader)
+            Object = registry.get_part(self, self.magnets)
 
             Channels[self.magnets] = Object.get_channels(self.name, hideIsolant, debug)
         elif isinstance(self.magnets, dict):
             for key in self.magnets:
                 magnet = self.magnets[key]
                 if isinstance(magnet, str):
-                    YAMLFile = f"{magnet}.yaml"
-                    with open(YAMLFile, "r") as f:
-                        Object = yaml.load(f, Loader=yaml.FullLoader)
-                        print(f"{magnet}: {Object}")
+                    Object = registry.get_part(self, magnet)
+                    print(f"{magnet}: {Object}")
 
                     Channels[key] = Object.get_channels(key, hideIsolant, debug)
 
                 elif isinstance(magnet, list):
                     for part in magnet:
                         if isinstance(part, str):
-                            YAMLFile = f"{part}.yaml"
-                            with open(YAMLFile, "r") as f:
-                                Object = yaml.load(f, Loader=yaml.FullLoader)
-                                print(f"{part}: {Object}")
+                            Object = registry.get_part(self, part)
+                            print(f"{part}: {Object}")
                         else:
                             raise RuntimeError(
                                 f"MSite(magnets[{key}][{part}]): unsupported type of magnets ({type(part)})"
@@ -111,40 +114,65 @@ class MSite(yaml.YAMLObject):
         """
         return {}
 
+    def generate_cuts(
+        self,
+        format: str = "SALOME",
+        workers: Optional[int] = None,
+        directory: Optional[str] = None,
+        workingDir: Optional[str] = None,
+    ) -> dict:
+        """
+        create cut files for all helices and bitters
+
+        workers: number of processes used
+        directory: where cut files are written
+        workingDir: where parts are loaded from
+
+        returns the manifest of cut files (see cut_utils.generate_cuts)
+        """
+        from .cut_utils import generate_cuts
+
+        return generate_cuts(self, format, workers, directory, workingDir)
+
+    def resolve(self, directory: Optional[str] = None):
+        """
+        return a copy of MSite with all magnets loaded once for all
+        """
+        return registry.resolve(self, directory)
+
     def get_names(
-        self, mname: str, is2D: bool = False, verbose: bool = False
+        self,
+        mname: str,
+        is2D: bool = False,
+        verbose: bool = False,
+        max_workers: Optional[int] = None,
     ) -> list[str]:
         """
         return names for Markers
+
+        max_workers: number of threads used to load magnets
         """
         solid_names = []
+        registry.prefetch(self, max_workers=max_workers)
 
         if isinstance(self.magnets, str):
-            YAMLFile = f"{self.magnets}.yaml"
-            with open(YAMLFile, "r") as f:
-                Object = yaml.load(f, Loader=yaml.FullLoader)
+            Object = registry.get_part(self, self.magnets)
 
             solid_names += Object.get_names(self.name, is2D, verbose)
         elif isinstance(self.magnets, dict):
             for key in self.magnets:
                 magnet = self.magnets[key]
                 if isinstance(magnet, str):
-                    mObject = None
-                    YAMLFile = f"{magnet}.yaml"
-                    with open(YAMLFile, "r") as f:
-                        mObject = yaml.load(f, Loader=yaml.FullLoader)
-                        # print(f"{magnet}: {mObject}")
+                    mObject = registry.get_part(self, magnet)
+                    # print(f"{magnet}: {mObject}")
 
                     solid_names += mObject.get_names(key, is2D, verbose)
 
                 elif isinstance(magnet, list):
                     for part in magnet:
                         if isinstance(part, str):
-                            mObject = None
-                            YAMLFile = f"{part}.yaml"
-                            with open(YAMLFile, "r") as f:
-                                mObject = yaml.load(f, Loader=yaml.FullLoader)
-                                # print(f"{part}: {mObject}")
+                            mObject = registry.get_part(self, part)
+                            # print(f"{part}: {mObject}")
 
                             solid_names += mObject.get_names(
                                 f"{key}_{mObject.name}", is2D, verbose
@@ -186,7 +214,7 @@ class MSite(yaml.YAMLObject):
         data = None
         try:
             with open(f"{self.name}.yaml", "r") as istream:
-                data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+                data = yaml.load(stream=istream, Loader=loaders.get_loader())
         except:
             raise Exception("Failed to load MSite data %s.yaml" % self.name)
 
@@ -227,8 +255,14 @@ class MSite(yaml.YAMLObject):
         with open(filename, "r") as istream:
             return json.loads(istream.read(), object_hook=deserialize.unserialize_object)
 
-    def boundingBox(self) -> tuple:
-        """"""
+    def boundingBox(self, max_workers: Optional[int] = None) -> tuple:
+        """
+        return Bounding as r[], z[]
+
+        max_workers: number of threads used to load magnets
+        """
+        registry.prefetch(self, max_workers=max_workers)
+
         zmin = None
         zmax = None
         rmin = None
@@ -248,40 +282,30 @@ class MSite(yaml.YAMLObject):
             return (rmin, rmax, zmin, zmax)
 
         if isinstance(self.magnets, str):
-            YAMLFile = os.path.join(f"{self.magnets}.yaml")
-            with open(YAMLFile, "r") as istream:
-                Object = yaml.load(istream, Loader=yaml.FullLoader)
-                (r, z) = Object.boundingBox()
-                (rmin, rmax, zmin, zmax) = cboundingBox(rmin, rmax, zmin, zmax, r, z)
+            Object = registry.get_part(self, self.magnets)
+            (r, z) = Object.boundingBox()
+            (rmin, rmax, zmin, zmax) = cboundingBox(rmin, rmax, zmin, zmax, r, z)
 
         elif isinstance(self.magnets, list):
             for mname in self.magnets:
-                YAMLFile = os.path.join(f"{mname}.yaml")
-                with open(YAMLFile, "r") as istream:
-                    Object = yaml.load(istream, Loader=yaml.FullLoader)
+                Object = registry.get_part(self, mname)
+                (r, z) = Object.boundingBox()
+                (rmin, rmax, zmin, zmax) = cboundingBox(rmin, rmax, zmin, zmax, r, z)
+        elif isinstance(self.magnets, dict):
+            for key in self.magnets:
+                if isinstance(self.magnets[key], str):
+                    Object = registry.get_part(self, self.magnets[key])
                     (r, z) = Object.boundingBox()
                     (rmin, rmax, zmin, zmax) = cboundingBox(
                         rmin, rmax, zmin, zmax, r, z
                     )
-        elif isinstance(self.magnets, dict):
-            for key in self.magnets:
-                if isinstance(self.magnets[key], str):
-                    YAMLFile = os.path.join(f"{self.magnets[key]}.yaml")
-                    with open(YAMLFile, "r") as istream:
-                        Object = yaml.load(istream, Loader=yaml.FullLoader)
+                elif isinstance(self.magnets[key], list):
+                    for mname in self.magnets[key]:
+                        Object = registry.get_part(self, mname)
                         (r, z) = Object.boundingBox()
                         (rmin, rmax, zmin, zmax) = cboundingBox(
                             rmin, rmax, zmin, zmax, r, z
                         )
-                elif isinstance(self.magnets[key], list):
-                    for mname in self.magnets[key]:
-                        YAMLFile = os.path.join(f"{mname}.yaml")
-                        with open(YAMLFile, "r") as istream:
-                            Object = yaml.load(istream, Loader=yaml.FullLoader)
-                            (r, z) = Object.boundingBox()
-                            (rmin, rmax, zmin, zmax) = cboundingBox(
-                                rmin, rmax, zmin, zmax, r, z
-                            )
                 else:
                     raise Exception(
                         f"magnets: unsupported type {type(self.magnets[key])}"
@@ -307,4 +331,5 @@ def MSite_constructor(loader, node):
     return MSite(name, magnets, screens, z_offset, r_offset, paralax)
 
 
-yaml.add_constructor("!MSite", MSite_constructor)
+loaders.add_constructor("!MSite", MSite_constructor)
+loaders.add_yaml_object(MSite)
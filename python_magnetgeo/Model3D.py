@@ -13,6 +13,8 @@ Provides definiton for Helix:
 import json
 import yaml
 
+from . import loaders
+from .fingerprint import Fingerprint
 # from Shape import *
 # from ModelAxi import *
 # from Model3D import *
@@ -21,7 +23,7 @@ from . import Shape
 from . import ModelAxi
 
 
-class Model3D(yaml.YAMLObject):
+class Model3D(yaml.YAMLObject, Fingerprint):
     """
     cad :
     with_shapes :
@@ -92,4 +94,5 @@ def Model3D_constructor(loader, node):
     return Model3D(cad, with_shapes, with_channels)
 
 
-yaml.add_constructor("!Model3D", Model3D_constructor)
+loaders.add_constructor("!Model3D", Model3D_constructor)
+loaders.add_yaml_object(Model3D)
@@ -13,13 +13,21 @@ Provides definiton for Helix:
 import json
 import yaml
 
+import numpy as np
 
-class ModelAxi(yaml.YAMLObject):
+from . import loaders
+from .fingerprint import Fingerprint
+
+class ModelAxi(yaml.YAMLObject, Fingerprint):
     """
     name :
     h :
     turns :
     pitch :
+
+    turns and pitch are stored as lists, arrays derived from them
+    (see get_turns, z_boundaries...) are cached as long as h, turns
+    and pitch keep the same values (assigned or changed in place)
     """
 
     yaml_tag = "ModelAxi"
@@ -39,6 +47,31 @@ class ModelAxi(yaml.YAMLObject):
         self.turns = turns
         self.pitch = pitch
 
+    def __getstate__(self):
+        """
+        return object state without cached arrays
+        """
+        state = super().__getstate__()
+        state.pop("_cache", None)
+        return state
+
+    def _cached(self, key: str, compute) -> np.ndarray:
+        """
+        return cached array key, compute it if needed
+
+        the cache is dropped when the values of h, turns or pitch have changed
+        """
+        values = (self.h, tuple(self.turns), tuple(self.pitch))
+        (cached, cache) = self.__dict__.get("_cache", (None, None))
+        if cached != values:
+            cache = {}
+            self.__dict__["_cache"] = (values, cache)
+        if key not in cache:
+            array = compute()
+            array.setflags(write=False)
+            cache[key] = array
+        return cache[key]
+
     def __repr__(self):
         """
         representation of object
@@ -82,59 +115,143 @@ class ModelAxi(yaml.YAMLObject):
             return json.loads(istream.read(), object_hook=deserialize.unserialize_object)
     
 
+    def get_Nsections(self) -> int:
+        """
+        returns the number of helical sections
+        """
+        return len(self.turns)
+
+    def get_turns(self) -> np.ndarray:
+        """
+        returns turns as an array
+        """
+        return self._cached("turns", lambda: np.asarray(self.turns, dtype=float))
+
+    def get_pitch(self) -> np.ndarray:
+        """
+        returns pitch as an array
+        """
+        return self._cached("pitch", lambda: np.asarray(self.pitch, dtype=float))
+
+    def section_lengths(self) -> np.ndarray:
+        """
+        returns the height of each section (turns * pitch)
+        """
+        return self._cached("lengths", lambda: self.get_turns() * self.get_pitch())
+
+    def cumulative_turns(self) -> np.ndarray:
+        """
+        returns the number of turns at each section boundary (from bottom)
+        """
+        return self._cached(
+            "cturns", lambda: np.cumsum(np.concatenate(([0.0], self.get_turns())))
+        )
+
+    def cumulative_lengths(self) -> np.ndarray:
+        """
+        returns the height at each section boundary (from bottom)
+        """
+        return self._cached(
+            "clengths",
+            lambda: np.cumsum(np.concatenate(([0.0], self.section_lengths()))),
+        )
+
+    def z_boundaries(self, top: bool = False) -> np.ndarray:
+        """
+        returns z of section boundaries from -h upward,
+        or from h downward if top is True (as the helical cut)
+
+        values match those obtained by adding sections one by one
+        """
+        if top:
+            return self._cached(
+                "ztop",
+                lambda: np.cumsum(np.concatenate(([self.h], -self.section_lengths()))),
+            )
+        return self._cached(
+            "zbottom",
+            lambda: np.cumsum(np.concatenate(([-self.h], self.section_lengths()))),
+        )
+
+    def theta_boundaries(self) -> np.ndarray:
+        """
+        returns the angle in rad at each section boundary (from bottom)
+        """
+        return self._cached(
+            "theta",
+            lambda: np.cumsum(np.concatenate(([0.0], self.get_turns() * (2 * np.pi)))),
+        )
+
     def get_Nturns(self) -> float:
         """
         returns the number of turn
         """
-        return sum(self.turns)
+        return float(self.cumulative_turns()[-1])
+
+    def compact_sections(self, tol: float = 1.0e-6) -> tuple:
+        """
+        merge consecutive sections whose pitch agrees within a relative tolerance
+
+        a run of sections is merged as long as pitches stay within tol of
+        the pitch of its first section, the merged pitch being the
+        turn-weighted mean so that the height of the run is preserved
+
+        returns (turns, pitch, index, error) where:
+        turns, pitch: compacted sections
+        index: array giving for each original section its compacted section
+        error: dict with max relative pitch change ("dpitch")
+        and max z shift of the original boundaries ("dz")
+        """
+        nsection = self.get_Nsections()
+        if nsection == 0:
+            return [], [], np.zeros(0, dtype=int), {"dpitch": 0.0, "dz": 0.0}
+
+        # single pass: start a new run when pitch leaves the tolerance band
+        starts = [0]
+        ref = self.pitch[0]
+        for i, p in enumerate(self.pitch):
+            if abs(p - ref) > tol * abs(ref):
+                starts.append(i)
+                ref = p
+
+        pitch = self.get_pitch()
+        new_turns = np.add.reduceat(self.get_turns(), starts)
+        new_pitch = np.add.reduceat(self.section_lengths(), starts) / new_turns
+        # keep sections that are not merged unchanged
+        single = np.diff(starts + [nsection]) == 1
+        new_pitch = np.where(single, pitch[starts], new_pitch)
+
+        index = np.zeros(nsection, dtype=int)
+        index[starts[1:]] = 1
+        index = np.cumsum(index)
+
+        # z of original boundaries in compacted sections
+        cturns = self.cumulative_turns()
+        zb = self.z_boundaries()
+        sections = np.append(index, index[-1])
+        start = np.asarray(starts)[sections]
+        z = zb[start] + (cturns - cturns[start]) * new_pitch[sections]
+
+        # sections of null pitch are only merged with sections of null pitch
+        dpitch = np.divide(
+            np.abs(new_pitch[index] - pitch),
+            np.abs(pitch),
+            out=np.zeros(nsection),
+            where=pitch != 0,
+        )
+        error = {
+            "dpitch": float(np.max(dpitch)),
+            "dz": float(np.max(np.abs(z - zb))),
+        }
+        return new_turns.tolist(), new_pitch.tolist(), index, error
 
     def compact(self, tol: float = 1.0e-6):
-        def indices(lst: list, item: float):
-            return [i for i, x in enumerate(lst) if abs(1 - item / x) <= tol]
-
-        List = self.pitch
-        duplicates = dict((x, indices(List, x)) for x in set(List) if List.count(x) > 1)
-        # print(f"duplicates: {duplicates}")
-
-        sum_index = {}
-        for key in duplicates:
-            index_fst = duplicates[key][0]
-            sum_index[index_fst] = [index_fst]
-            search_index = sum_index[index_fst]
-            search_elem = search_index[-1]
-            for index in duplicates[key]:
-                # print(f"index={index}, search_elem={search_elem}")
-                if index - search_elem == 1:
-                    search_index.append(index)
-                    search_elem = index
-                else:
-                    sum_index[index] = [index]
-                    search_index = sum_index[index]
-                    search_elem = search_index[-1]
-
-        # print(f"sum_index: {sum_index}")
-
-        remove_ids = []
-        for i in sum_index:
-            for item in sum_index[i]:
-                if item != i:
-                    remove_ids.append(item)
-
-        new_pitch = [p for i, p in enumerate(self.pitch) if not i in remove_ids]
-        # print(f"pitch={self.pitch}")
-        # print(f"new_pitch={new_pitch}")
-
-        new_turns = (
-            self.turns
-        )  # use deepcopy: import copy and copy.deepcopy(self.axi.turns)
-        for i in sum_index:
-            for item in sum_index[i]:
-                new_turns[i] += self.turns[item]
-        new_turns = [p for i, p in enumerate(self.turns) if not i in remove_ids]
-        # print(f"turns={self.turns}")
-        # print(f"new_turns={new_turns}")
-
-        return new_turns, new_pitch
+        """
+        returns turns and pitch with consecutive sections of same pitch merged
+        (see compact_sections)
+        """
+        (turns, pitch, index, error) = self.compact_sections(tol)
+        return turns, pitch
 
 
 def ModelAxi_constructor(loader, node):
@@ -149,4 +266,5 @@ def ModelAxi_constructor(loader, node):
     return ModelAxi(name, h, turns, pitch)
 
 
-yaml.add_constructor("!ModelAxi", ModelAxi_constructor)
+loaders.add_constructor("!ModelAxi", ModelAxi_constructor)
+loaders.add_yaml_object(ModelAxi)
@@ -9,8 +9,10 @@ import os
 import json
 import yaml
 
+from . import loaders
+from .fingerprint import Fingerprint
 
-class OuterCurrentLead(yaml.YAMLObject):
+class OuterCurrentLead(yaml.YAMLObject, Fingerprint):
     """
     name :
 
@@ -68,7 +70,7 @@ class OuterCurrentLead(yaml.YAMLObject):
         data = None
         try:
             with open(f"{self.name}.yaml", "r") as istream:
-                data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+                data = yaml.load(stream=istream, Loader=loaders.get_loader())
         except:
             raise Exception(f"Failed to load OuterCurrentLead data {self.name}.yaml")
 
@@ -125,6 +127,7 @@ def OuterCurrentLead_constructor(loader, node):
     return OuterCurrentLead(name, r, h, bar, support)
 
 
-yaml.add_constructor("!OuterCurrentLead", OuterCurrentLead_constructor)
+loaders.add_constructor("!OuterCurrentLead", OuterCurrentLead_constructor)
+loaders.add_yaml_object(OuterCurrentLead)
 
 
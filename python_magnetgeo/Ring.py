@@ -8,10 +8,12 @@ Provides definition for Ring:
 
 import json
 import yaml
-from . import deserialize
 
+from . import loaders
+from .fingerprint import Fingerprint
 
-class Ring(yaml.YAMLObject):
+
+class Ring(yaml.YAMLObject, Fingerprint):
     """
     name :
     r :
@@ -79,7 +81,7 @@ class Ring(yaml.YAMLObject):
         data = None
         try:
             with open(f"{self.name}.yaml", "r") as istream:
-                data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+                data = yaml.load(stream=istream, Loader=loaders.get_loader())
         except:
             raise Exception(f"Failed to load Ring data {self.name}.yaml")
 
@@ -137,4 +139,5 @@ def Ring_constructor(loader, node):
     return Ring(name, r, z, n, angle, BPside, fillets)
 
 
-yaml.add_constructor("!Ring", Ring_constructor)
+loaders.add_constructor("!Ring", Ring_constructor)
+loaders.add_yaml_object(Ring)
@@ -10,8 +10,10 @@ Provides definition for Screen:
 import json
 import yaml
 
+from . import loaders
+from .fingerprint import Fingerprint
 
-class Screen(yaml.YAMLObject):
+class Screen(yaml.YAMLObject, Fingerprint):
     """
     name :
     r :
@@ -88,7 +90,7 @@ class Screen(yaml.YAMLObject):
         data = None
         try:
             with open(f"{self.name}.yaml", "r") as istream:
-                data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+                data = yaml.load(stream=istream, Loader=loaders.get_loader())
         except:
             raise Exception(f"Failed to load Screen data {self.name}.yaml")
 
@@ -161,4 +163,5 @@ def Screen_constructor(loader, node):
     return Screen(name, r, z)
 
 
-yaml.add_constructor("!Screen", Screen_constructor)
+loaders.add_constructor("!Screen", Screen_constructor)
+loaders.add_yaml_object(Screen)
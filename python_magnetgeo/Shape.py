@@ -13,12 +13,16 @@ Provides definiton for Helix:
 import json
 import yaml
 
+import numpy as np
+
+from . import loaders
+from .fingerprint import Fingerprint
 # from Shape import *
 # from ModelAxi import *
 # from Model3D import *
 
 
-class Shape(yaml.YAMLObject):
+class Shape(yaml.YAMLObject, Fingerprint):
     """
     name :
     profile : name of the cut profile to be added
@@ -91,6 +95,61 @@ class Shape(yaml.YAMLObject):
         with open(filename, "r") as istream:
             return json.loads(istream.read(), object_hook=deserialize.unserialize_object)
 
+    def get_placements(self, nturns: float) -> tuple:
+        """
+        returns the placement of shapes along a helical cut of nturns turns
+
+        on each selected turn (onturns: turn numbers from 1, 0 for all turns)
+        shapes are placed every angle degrees starting from 0,
+        shapes overflowing the cut are dropped
+
+        returns (start, end, ids): start and end angles in rad from the top
+        of the cut, ids the index of the shape length (from 1),
+        negative for shapes below the cut
+
+        ids are written as is in the Shape_id column of salome cuts
+        (see cut_utils.salome_content)
+        """
+        angles = np.atleast_1d(np.asarray(self.angle, dtype=float))
+        angles = angles[angles != 0]
+        lengths = np.atleast_1d(np.asarray(self.length, dtype=float))
+        if angles.size == 0 or nturns <= 0:
+            empty = np.zeros(0)
+            return empty, empty, np.zeros(0, dtype=int)
+
+        # positions of shapes within a turn
+        nmax = int(np.ceil(360 / angles.min()))
+        phi = np.concatenate(([0.0], np.cumsum(np.resize(angles, nmax))))
+        phi = phi[phi < 360]
+        kind = np.arange(phi.size) % lengths.size
+
+        onturns = np.atleast_1d(np.asarray(self.onturns, dtype=int))
+        if np.any(onturns == 0):
+            onturns = np.arange(1, int(np.ceil(nturns)) + 1)
+        onturns = np.unique(onturns)
+
+        start = np.radians((onturns[:, None] - 1) * 360 + phi).ravel()
+        end = start + np.radians(np.tile(lengths[kind], onturns.size))
+        ids = np.tile(kind + 1, onturns.size)
+
+        keep = end <= 2 * np.pi * nturns * (1 + 1.0e-12)
+        (start, end, ids) = (start[keep], end[keep], ids[keep])
+        if np.any(start[1:] < end[:-1]):
+            raise RuntimeError(
+                f"Shape({self.name}): shapes overlap (length={self.length}, angle={self.angle})"
+            )
+
+        position = self.position.upper()
+        if position == "BELLOW":
+            ids = -ids
+        elif position == "ALTERNATE":
+            ids[1::2] *= -1
+        elif position != "ABOVE":
+            raise RuntimeError(
+                f"Shape({self.name}): unsupported position {self.position} (expect ABOVE|BELLOW|ALTERNATE)"
+            )
+        return start, end, ids
+
 
 def Shape_constructor(loader, node):
     """
@@ -106,4 +165,5 @@ def Shape_constructor(loader, node):
     return Shape(name, profile, length, angle, onturns, position)
 
 
-yaml.add_constructor("!Shape", Shape_constructor)
+loaders.add_constructor("!Shape", Shape_constructor)
+loaders.add_yaml_object(Shape)
@@ -10,8 +10,11 @@ Provides definiton for 2D Shape:
 import yaml
 import json
 
+from . import loaders
+from .fingerprint import Fingerprint
 
-class Shape2D(yaml.YAMLObject):
+
+class Shape2D(yaml.YAMLObject, Fingerprint):
     """
     name :
 
@@ -51,7 +54,7 @@ class Shape2D(yaml.YAMLObject):
         data = None
         try:
             with open(f"{name}.yaml", "r") as istream:
-                data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+                data = yaml.load(stream=istream, Loader=loaders.get_loader())
         except:
             raise Exception(f"Failed to load Shape2D data {name}.yaml")
 
@@ -92,7 +95,8 @@ def Shape_constructor(loader, node):
     return Shape2D(name, pts)
 
 
-yaml.add_constructor("!Shape2D", Shape_constructor)
+loaders.add_constructor("!Shape2D", Shape_constructor)
+loaders.add_yaml_object(Shape2D)
 
 
 def create_circle(r: float, n: int = 20) -> Shape2D:
@@ -10,13 +10,17 @@ Provides definition for Supra:
 """
 from typing import Optional
 
+import os
 import json
 import yaml
 
+from . import loaders
+from .fingerprint import Fingerprint
+from . import registry
 from .SupraStructure import HTSinsert
 
 
-class Supra(yaml.YAMLObject):
+class Supra(yaml.YAMLObject, Fingerprint):
     """
     name :
     r :
@@ -24,6 +28,9 @@ class Supra(yaml.YAMLObject):
     n :
     struct:
 
+    the HTSinsert defined in struct is shared with the other Supra
+    referencing the same file, it is read-only (see get_magnet_struct)
+
     TODO: to link with SuperEMFL geometry.py
     """
 
@@ -42,28 +49,65 @@ class Supra(yaml.YAMLObject):
         self.struct = struct
         self.detail = "None"  # ['None', 'dblpancake', 'pancake', 'tape']
 
+    def __setattr__(self, name, value):
+        if name in ("r", "z", "n", "struct"):
+            self.__dict__.pop("_checked", None)
+        super().__setattr__(name, value)
+
+    def __getstate__(self):
+        """
+        return object state without checked HTSinsert
+        """
+        state = super().__getstate__()
+        state.pop("_checked", None)
+        return state
+
     def get_magnet_struct(self, directory: Optional[str] = None) -> HTSinsert:
-        return HTSinsert.fromcfg(self.struct, directory)
+        """
+        return the HTSinsert defined in struct
+
+        struct is only parsed again when the file has changed (see registry.structs):
+        the HTSinsert is shared hence read-only, modify a copy (see HTSinsert.copy)
+        """
+        filename = self.struct
+        if directory is not None:
+            filename = os.path.join(directory, filename)
+        return registry.structs.get(
+            filename,
+            loader=lambda path: HTSinsert.fromcfg(self.struct, directory).freeze(),
+        )
+
+    def _checked_struct(self) -> HTSinsert:
+        """
+        return the HTSinsert defined in struct, dimensions being checked
+        only once per HTSinsert (see check_dimensions)
+        """
+        hts = self.get_magnet_struct()
+        if self.__dict__.get("_checked") is not hts:
+            self.check_dimensions(hts)
+            self.__dict__["_checked"] = hts
+        return hts
 
     def check_dimensions(self, magnet: HTSinsert):
         # TODO: if struct load r,z and n from struct data
         if self.struct:
+            # new lists (not in place changes) so that fingerprint is updated
             changed = False
-            if self.r[0] != magnet.getR0():
-                changed = True
-                self.r[0] = magnet.getR0()
-            if self.r[1] != magnet.getR1():
+            r = [magnet.getR0(), magnet.getR1()]
+            if self.r != r:
                 changed = True
-                self.r[1] = magnet.getR1()
-            if self.z[0] != magnet.getZ0() - magnet.getH() / 2.0:
+                self.r = r
+            z = [
+                magnet.getZ0() - magnet.getH() / 2.0,
+                magnet.getZ0() + magnet.getH() / 2.0,
+            ]
+            if self.z != z:
                 changed = True
-                self.z[0] = magnet.getZ0() - magnet.getH() / 2.0
-            if self.z[1] != magnet.getZ0() + magnet.getH() / 2.0:
+                self.z = z
+            ntapes = int(magnet.getNtapes().sum())
+            if self.n != ntapes:
                 changed = True
-                self.z[1] = magnet.getZ0() + magnet.getH() / 2.0
-            if self.n != sum(magnet.getNtapes()):
-                changed = True
-                self.n = sum(magnet.getNtapes())
+                self.n = ntapes
 
             if changed:
                 print(
@@ -102,9 +146,7 @@ class Supra(yaml.YAMLObject):
                 prefix = f"{mname}_"
             return [f"{prefix}{self.name}"]
         else:
-            hts = self.get_magnet_struct()
-            self.check_dimensions(hts)
-
+            hts = self._checked_struct()
             return hts.get_names(mname=mname, detail=self.detail, verbose=verbose)
 
     def __repr__(self):
@@ -138,7 +180,7 @@ class Supra(yaml.YAMLObject):
         data = None
         try:
             with open(f"{self.name}.yaml", "r") as istream:
-                data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+                data = yaml.load(stream=istream, Loader=loaders.get_loader())
         except:
             raise Exception(f"Failed to load Supra data {self.name}.yaml")
 
@@ -252,4 +294,5 @@ def Supra_constructor(loader, node):
     return Supra(name, r, z, n, struct)
 
 
-yaml.add_constructor("!Supra", Supra_constructor)
+loaders.add_constructor("!Supra", Supra_constructor)
+loaders.add_yaml_object(Supra)
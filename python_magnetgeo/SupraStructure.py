@@ -1,13 +1,33 @@
 """
 Define HTS insert geometry
 """
-from typing import Self, Optional
+from typing import Self, Optional, Iterator
+from collections.abc import Iterable
+
+import re
+
+import numpy as np
+
+from .fingerprint import Fingerprint
 
 
 def flatten(S: list) -> list:
-    from pandas.core.common import flatten as pd_flatten
+    """
+    return the items of the nested lists (or any iterables but strings) in S
 
-    return list(pd_flatten(S))
+    nested lists are walked with an explicit stack (no recursion limit)
+    """
+    items = []
+    stack = [iter(S)]
+    while stack:
+        for item in stack[-1]:
+            if isinstance(item, Iterable) and not isinstance(item, (str, bytes)):
+                stack.append(iter(item))
+                break
+            items.append(item)
+        else:
+            stack.pop()
+    return items
 
 
 class tape:
@@ -149,17 +169,20 @@ class pancake:
         if detail == "pancake":
             return name
         else:
-            _mandrin = f"{name}_Mandrin"
-            tape_ = self.tape
-            tape_ids = []
-            for i in range(self.n):
-                tape_id = tape_.get_names(f"{name}_t{i}", detail)
-                tape_ids.append(tape_id)
-
             if verbose:
-                print(f"pancake: mandrin (1), tapes ({len(tape_ids)})")
-            return flatten([[_mandrin], flatten(tape_ids)])
-        pass
+                print(f"pancake: mandrin (1), tapes ({self.n})")
+            return list(self.iter_names(name, detail))
+
+    def iter_names(self, name: str, detail: str) -> Iterator[str]:
+        """
+        yield the names of the pancake (see get_names)
+        """
+        if detail == "pancake":
+            yield name
+            return
+        yield f"{name}_Mandrin"
+        for i in range(self.n):
+            yield from self.tape.get_names(f"{name}_t{i}", detail)
 
     def getN(self) -> int:
         """
@@ -191,19 +214,11 @@ class pancake:
         """
         return self.n * (self.tape.w + self.tape.e) + self.r0
 
-    def getR(self) -> list[float]:
+    def getR(self) -> np.ndarray:
         """
-        get list of tapes inner radius
+        get tapes inner radius as an array (use tolist() for a list)
         """
-        r = []
-        ri = self.getR0()
-        dr = self.tape.w + self.tape.e
-        for i in range(self.n):
-            # print(f"r[{i}]={ri}, {ri+self.tape.w + self.tape.e/2.}")
-            r.append(ri)
-            ri += dr
-        # print(f"r[-1]: {r[0]}, {r[-1]}, {r[-1]+self.tape.w + self.tape.e/2.}, {self.n}, {self.getR1()}")
-        return r
+        return self.getR0() + (self.tape.w + self.tape.e) * np.arange(self.n)
 
     def getFillingFactor(self) -> float:
         """
@@ -303,6 +318,247 @@ class isolation:
         return len(self.w)
 
 
+class _columns(Fingerprint):
+    """
+    struct of arrays: one array per field (see fields), one value per row
+
+    arrays are exposed as read-only views (see column), they are views
+    on buffers grown geometrically so that appending rows is amortized O(1)
+
+    rows are only changed through _append, _set and _write: they drop
+    the memoized fingerprint of the stack, hence of the HTSinsert holding it
+
+    a frozen stack (see freeze) is read-only, its copies are not
+    """
+
+    fields: dict = {}
+
+    def __init__(self) -> None:
+        self._data = {
+            name: np.zeros(0, dtype=dtype) for name, dtype in self.fields.items()
+        }
+        self._n = 0
+        self.columns = dict(self._data)
+
+    def __getstate__(self):
+        """
+        return object state without buffers
+        """
+        state = super().__getstate__()
+        state.pop("_data", None)
+        state.pop("_frozen", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._data = {name: np.array(data) for name, data in self.columns.items()}
+        self.columns = {name: data[: self._n] for name, data in self._data.items()}
+
+    def __len__(self) -> int:
+        return self._n
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        return a read-only view of column name
+        """
+        view = self.columns[name].view()
+        view.setflags(write=False)
+        return view
+
+    def freeze(self) -> None:
+        """
+        make rows read-only
+        """
+        self.__dict__["_frozen"] = True
+        for data in list(self._data.values()) + list(self.columns.values()):
+            data.setflags(write=False)
+
+    def _check(self) -> None:
+        if self.__dict__.get("_frozen"):
+            raise RuntimeError(
+                f"{self.__class__.__name__}: read-only (shared), modify a copy"
+            )
+
+    def _changed(self) -> None:
+        self.__dict__.pop("_fingerprint", None)
+
+    def _append(self, rows: dict) -> None:
+        """
+        append rows given as a dict of sequences (one per field)
+        """
+        self._check()
+        values = {
+            name: np.asarray(rows[name], dtype=dtype)
+            for name, dtype in self.fields.items()
+        }
+        n = self._n + len(values[next(iter(self.fields))])
+        for name, data in self._data.items():
+            if n > data.size:
+                grown = np.zeros(max(n, 2 * data.size), dtype=data.dtype)
+                grown[: self._n] = data[: self._n]
+                data = self._data[name] = grown
+            data[self._n : n] = values[name]
+            self.columns[name] = data[:n]
+        self._n = n
+        self._changed()
+
+    def _set(self, i: int, row: dict) -> None:
+        self._check()
+        for name, value in row.items():
+            self.columns[name][i] = value
+        self._changed()
+
+    def _write(self, name: str, index, values) -> None:
+        """
+        write values in rows index of column name
+        """
+        self._check()
+        self.columns[name][index] = values
+        self._changed()
+
+
+class isolation_stack(_columns):
+    """
+    stack of isolations
+
+    r0: inner radius, w: width (widest layer), h: height (all layers)
+    indexing or iterating gives the isolation objects: they may be shared
+    between rows, do not modify them in place
+    """
+
+    fields = {"r0": float, "w": float, "h": float}
+
+    def __init__(self, items: list = ()) -> None:
+        super().__init__()
+        self.items = []
+        self.extend(items)
+
+    def extend(self, items: list) -> None:
+        items = list(items)
+        self._append(
+            {
+                "r0": [i.r0 for i in items],
+                "w": [max(i.w, default=0) for i in items],
+                "h": [sum(i.h) for i in items],
+            }
+        )
+        self.items += items
+
+    def append(self, item: isolation) -> None:
+        self.extend([item])
+
+    def __getitem__(self, i):
+        return self.items[i]
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __repr__(self) -> str:
+        return repr(self.items)
+
+
+class dblpancake_stack(_columns):
+    """
+    stack of double pancakes
+
+    z0: position, h: height of double pancakes
+    r0, r1, mandrin, ntapes: radii, mandrin and number of tapes of pancakes
+    tape_w, tape_h, tape_e: tape dimensions (see tape)
+    i_r0, i_w, i_h: isolation between pancakes (see isolation_stack)
+
+    pancake and isolation objects are kept as definitions (see pancakes,
+    dp_isolations): they may be shared between rows, do not modify them
+    in place (use dblpancake.setPancake, setIsolation)
+
+    indexing or iterating gives dblpancake views on rows
+    """
+
+    fields = {
+        "z0": float,
+        "h": float,
+        "r0": float,
+        "r1": float,
+        "mandrin": float,
+        "ntapes": int,
+        "tape_w": float,
+        "tape_h": float,
+        "tape_e": float,
+        "i_r0": float,
+        "i_w": float,
+        "i_h": float,
+    }
+
+    def __init__(self, dblpancakes: list = ()) -> None:
+        super().__init__()
+        self.pancakes = []
+        self.dp_isolations = []
+        dblpancakes = list(dblpancakes)
+        self.add(
+            [dp.z0 for dp in dblpancakes],
+            [dp.pancake for dp in dblpancakes],
+            [dp.isolation for dp in dblpancakes],
+        )
+
+    @staticmethod
+    def _rows(z0: list, pancakes: list, isolations: list) -> dict:
+        i = isolation_stack(isolations)
+        rows = {
+            "z0": z0,
+            "r0": [p.r0 for p in pancakes],
+            "mandrin": [p.mandrin for p in pancakes],
+            "ntapes": [p.n for p in pancakes],
+            "tape_w": [p.tape.w for p in pancakes],
+            "tape_h": [p.tape.h for p in pancakes],
+            "tape_e": [p.tape.e for p in pancakes],
+            "i_r0": i.columns["r0"],
+            "i_w": i.columns["w"],
+            "i_h": i.columns["h"],
+        }
+        rows = {
+            name: np.asarray(values, dtype=dblpancake_stack.fields[name])
+            for name, values in rows.items()
+        }
+        rows["r1"] = rows["ntapes"] * (rows["tape_w"] + rows["tape_e"]) + rows["r0"]
+        rows["h"] = 2.0 * rows["tape_h"] + rows["i_h"]
+        return rows
+
+    def add(self, z0: list, pancakes: list, isolations: list) -> None:
+        """
+        append double pancakes given by their positions, pancakes and isolations
+        """
+        self._append(self._rows(z0, pancakes, isolations))
+        self.pancakes += list(pancakes)
+        self.dp_isolations += list(isolations)
+
+    def append(self, dp: "dblpancake") -> None:
+        self.add([dp.z0], [dp.pancake], [dp.isolation])
+
+    def update(self, i: int, pancake: pancake, isolation: isolation) -> None:
+        """
+        change the pancake and isolation of row i
+        """
+        rows = self._rows([self.columns["z0"][i]], [pancake], [isolation])
+        self._set(i, {name: values[0] for name, values in rows.items()})
+        self.pancakes[i] = pancake
+        self.dp_isolations[i] = isolation
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [dblpancake.view(self, k) for k in range(len(self))[i]]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("dblpancake_stack index out of range")
+        return dblpancake.view(self, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield dblpancake.view(self, i)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
 class dblpancake:
     """
     Double Pancake structure
@@ -310,6 +566,9 @@ class dblpancake:
     z0: position of the double pancake (centered on isolation)
     pancake: pancake structure (assume that both pancakes have the same structure)
     isolation: isolation between pancakes
+
+    a dblpancake is a view on a row of a stack (eg. HTSinsert.dblpancakes),
+    a dblpancake created on its own has a stack of its own
     """
 
     def __init__(
@@ -318,9 +577,43 @@ class dblpancake:
         pancake: pancake = pancake(),
         isolation: isolation = isolation(),
     ):
-        self.z0 = z0
-        self.pancake = pancake
-        self.isolation = isolation
+        self._stack = dblpancake_stack()
+        self._stack.add([z0], [pancake], [isolation])
+        self._i = 0
+
+    @classmethod
+    def view(cls, stack: dblpancake_stack, i: int) -> Self:
+        """
+        return a view on row i of stack
+        """
+        dp = cls.__new__(cls)
+        dp._stack = stack
+        dp._i = i
+        return dp
+
+    @property
+    def z0(self) -> float:
+        return self._stack.columns["z0"][self._i].item()
+
+    @z0.setter
+    def z0(self, z0: float) -> None:
+        self._stack._write("z0", self._i, z0)
+
+    @property
+    def pancake(self) -> pancake:
+        return self._stack.pancakes[self._i]
+
+    @pancake.setter
+    def pancake(self, pancake: pancake) -> None:
+        self._stack.update(self._i, pancake, self.isolation)
+
+    @property
+    def isolation(self) -> isolation:
+        return self._stack.dp_isolations[self._i]
+
+    @isolation.setter
+    def isolation(self, isolation: isolation) -> None:
+        self._stack.update(self._i, self.pancake, isolation)
 
     def __repr__(self) -> str:
         """
@@ -342,28 +635,22 @@ class dblpancake:
         if detail == "dblpancake":
             return name
         else:
-            p_ids = []
-
-            p_ = self.pancake
-            _id = p_.get_names(f"{name}_p0", detail)
-            p_ids.append(_id)
-
-            dp_i = self.isolation
             if verbose:
-                print(f"dblepancake.salome: isolation={dp_i}")
-            _isolation_id = dp_i.get_names(f"{name}_i", detail)
+                print(f"dblepancake.salome: isolation={self.isolation}")
+                print("dblpancake: pancakes (2), isolations (1)")
+            return list(self.iter_names(name, detail))
 
-            _id = p_.get_names(f"{name}_p1", detail)
-            p_ids.append(_id)
-
-            if verbose:
-                print(
-                    f"dblpancake: pancakes ({len(p_ids)}, {type(p_ids[0])}), isolations (1)"
-                )
-            if isinstance(p_ids[0], list):
-                return flatten([flatten(p_ids), [_isolation_id]])
-            else:
-                return flatten([p_ids, [_isolation_id]])
+    def iter_names(self, name: str, detail: str) -> Iterator[str]:
+        """
+        yield the names of the double pancake (see get_names):
+        pancakes p0 and p1 then isolation
+        """
+        if detail == "dblpancake":
+            yield name
+            return
+        yield from self.pancake.iter_names(f"{name}_p0", detail)
+        yield from self.pancake.iter_names(f"{name}_p1", detail)
+        yield self.isolation.get_names(f"{name}_i", detail)
 
     def getPancake(self):
         """
@@ -412,12 +699,20 @@ class dblpancake:
         return (self.pancake.getR1() - self.pancake.getR0()) * self.getH()
 
 
-class HTSinsert:
+class HTSinsert(Fingerprint):
     """
     HTS insert
 
-    dblpancakes: stack of double pancakes
-    isolation: stack of isolations between double pancakes
+    dblpancakes: stack of double pancakes (see dblpancake_stack)
+    isolations: stack of isolations between double pancakes (see isolation_stack)
+
+    per double pancake accessors (eg. getNtapes, getR0_Isolation) return
+    read-only arrays (views on the columns of the stacks) instead of lists:
+    a + b adds them elementwise and a == b compares them elementwise,
+    use tolist() where a list is expected
+
+    a frozen HTSinsert (see freeze) is read-only, use copy to get
+    a modifiable one
 
     TODO: add possibility to use 2 different pancake
     """
@@ -441,9 +736,45 @@ class HTSinsert:
         self.r1 = r1
         self.z1 = z1
         self.n = n
+        if not isinstance(dblpancakes, dblpancake_stack):
+            dblpancakes = dblpancake_stack(dblpancakes)
+        if not isinstance(isolations, isolation_stack):
+            isolations = isolation_stack(isolations)
         self.dblpancakes = dblpancakes
         self.isolations = isolations
 
+    def __setattr__(self, name, value):
+        if self.__dict__.get("_frozen"):
+            raise RuntimeError(
+                f"HTSinsert({self.name}): read-only (shared), modify a copy"
+            )
+        super().__setattr__(name, value)
+
+    def __getstate__(self):
+        """
+        return object state, copies being modifiable
+        """
+        state = super().__getstate__()
+        state.pop("_frozen", None)
+        return state
+
+    def freeze(self) -> Self:
+        """
+        make object read-only (eg. when shared, see Supra.get_magnet_struct)
+        """
+        self.dblpancakes.freeze()
+        self.isolations.freeze()
+        self.__dict__["_frozen"] = True
+        return self
+
+    def copy(self) -> Self:
+        """
+        return a modifiable copy
+        """
+        import copy
+
+        return copy.deepcopy(self)
+
     @classmethod
     def fromcfg(
         cls,
@@ -451,7 +782,12 @@ class HTSinsert:
         directory: Optional[str] = None,
         debug: Optional[bool] = False,
     ):
-        """create from a file"""
+        """
+        create from a file
+
+        double pancakes are stacked from the bottom, each one followed by
+        its isolation (the insert is centered on z0)
+        """
         import json
 
         filename = inputcfg
@@ -461,138 +797,100 @@ class HTSinsert:
 
         with open(filename) as f:
             data = json.load(f)
+        if debug:
+            print("HTSinsert data:", data)
+
+        mypancake = pancake()
+        if "pancake" in data:
+            mypancake = pancake.from_data(data["pancake"])
             if debug:
-                print("HTSinsert data:", data)
+                print(f"mypancake={mypancake}")
 
-            """
-            print("List main keys:")
-            for key in data:
-                print("key:", key)
-            """
+        myisolation = isolation()
+        if "isolation" in data:
+            myisolation = isolation.from_data(data["isolation"])
+            if debug:
+                print(f"myisolation={myisolation}")
 
-            mytape = None
-            if "tape" in data:
-                mytape = tape.from_data(data["tape"])
+        z0 = 0
+        n = 0
+        pancakes = []
+        isolations = []
+        if "dblpancakes" in data:
+            if debug:
+                print("DblPancake data:", data["dblpancakes"])
 
-            mypancake = pancake()
-            if "pancake" in data:
-                mypancake = pancake.from_data(data["pancake"])
+            # if n defined use the same pancakes and isolations
+            # else load pancake and isolation structure definitions
+            if "n" in data["dblpancakes"]:
+                n = data["dblpancakes"]["n"]
                 if debug:
-                    print(f"mypancake={mypancake}")
-
-            myisolation = isolation()
-            if "isolation" in data:
-                myisolation = isolation.from_data(data["isolation"])
+                    print(f"Loading {n} similar dblpancakes")
+                dpisolation = myisolation
+                if "isolation" in data["dblpancakes"]:
+                    dpisolation = isolation.from_data(data["dblpancakes"]["isolation"])
                 if debug:
-                    print(f"myisolation={myisolation}")
-
-            z = 0
-            r0 = r1 = z0 = z1 = h = 0
-            n = 0
-            dblpancakes = []
-            isolations = []
-            if "dblpancakes" in data:
+                    print(f"dpisolation={dpisolation}")
+
+                pancakes = [mypancake] * n
+                isolations = [dpisolation] * n
+            else:
                 if debug:
-                    print("DblPancake data:", data["dblpancakes"])
-
-                # if n defined use the same pancakes and isolations
-                # else loop to load pancake and isolation structure definitions
-                if "n" in data["dblpancakes"]:
-                    n = data["dblpancakes"]["n"]
-                    if debug:
-                        print(f"Loading {n} similar dblpancakes, z={z}")
-                    if "isolation" in data["dblpancakes"]:
-                        dpisolation = isolation.from_data(
-                            data["dblpancakes"]["isolation"]
+                    print("Loading different dblpancakes")
+
+                # identical definitions (same json text) are only loaded once
+                definitions = {}
+
+                def _load(cls, data: dict):
+                    key = (cls.__name__, repr(data))
+                    if key not in definitions:
+                        definitions[key] = cls.from_data(data)
+                    return definitions[key]
+
+                for dp in data["dblpancakes"]:
+                    pancakes.append(_load(pancake, data["dblpancakes"][dp]["pancake"]))
+                    if "isolation" in data["isolations"][dp]:
+                        isolations.append(
+                            _load(isolation, data["isolations"][dp]["isolation"])
                         )
                     else:
-                        dpisolation = myisolation
-                    if debug:
-                        print(f"dpisolation={dpisolation}")
-
-                    for i in range(n):
-                        dp = dblpancake(z, mypancake, myisolation)
-                        if debug:
-                            print(f"dp={dp}")
-
-                        dblpancakes.append(dp)
-                        isolations.append(dpisolation)
-
-                        if debug:
-                            print(f"dblpancake[{i}]:")
-
-                        z += dp.getH()
-                        # print(f'z={z} dp_H={dp.getH()}')
-                        if i != n - 1:
-                            z += dpisolation.getH()  # isolation between D
-                        # print(f'z={z} dp_i={dpisolation.getH()}')
-
-                    h = z
-                    # print(f"h= {self.h} [mm] = {z}")
-
-                    r0 = dblpancakes[0].getR0()
-                    r1 = dblpancakes[0].getR0() + dblpancakes[0].getW()
-                else:
-                    if debug:
-                        print(f"Loading different dblpancakes, z={z}")
-                    n = 0
-                    for dp in data["dblpancakes"]:
-                        n += 1
-                        if debug:
-                            print("dp:", dp, data["dblpancakes"][dp]["pancake"])
-                        mypancake = pancake.from_data(
-                            data["dblpancakes"][dp]["pancake"]
-                        )
-
-                        if "isolation" in data["isolations"][dp]:
-                            dpisolation = isolation.from_data(
-                                data["isolations"][dp]["isolation"]
-                            )
-                        else:
-                            dpisolation = myisolation
-                        isolations.append(dpisolation)
-
-                        dp_ = dblpancake(z, mypancake, myisolation)
-                        r0 = min(r0, dp_.getR0())
-                        r1 = max(r1, dp_.pancake.getR1())
-                        dblpancakes.append(dp_)
-                        if debug:
-                            print(f"mypancake: {mypancake}")
-                            print(f"dpisolant: {dpisolation}")
-                            print(f"dp: {dp_}")
-
-                        z += dp_.getH()
-                        z += myisolation.getH()  # isolation between DP
-
-                    h = z - myisolation.getH()
-                    # print(f"h= {self.h} [mm] = {z}-{myisolation.getH()} ({self.n} dblpancakes)")
-
-            # shift insert by z0-z/2.
-            z1 = z0 - h / 2.0
-            z = z1
-            # print(f'shift insert by {z} = {self.z0}-{self.h}/2.')
-            for i in range(len(dblpancakes)):
-                _h = dblpancakes[i].getH()
-                dblpancakes[i].setZ0(z + _h / 2.0)
-                # print(f'dp[{i}]: z0={z+_h/2.}, z1={z}, z2={z+_h}')
-                z += _h + myisolation.getH()
-
-            if debug:
-                print("=== Load cfg:")
-                print(f"r0= {r0} [mm]")
-                print(f"r1= {r1} [mm]")
-                print(f"z1= {z0-h/2.} [mm]")
-                print(f"z2= {z0+h/2.} [mm]")
-                print(f"z0= {z0} [mm]")
-                print(f"h= {h} [mm]")
-                print(f"n= {len(dblpancakes)}")
-
-                for i, dp in enumerate(dblpancakes):
-                    print(f"dblpancakes[{i}]: {dp}")
-                print("===")
-
-            name = inputcfg.replace(".json", "")
-            return cls(name, z0, h, r0, r1, z1, n, dblpancakes, isolations)
+                        isolations.append(myisolation)
+                n = len(pancakes)
+
+        dblpancakes = dblpancake_stack()
+        dblpancakes.add(np.zeros(n), pancakes, [myisolation] * n)
+        isolations = isolation_stack(isolations)
+
+        # top of each double pancake from the bottom of the insert
+        heights = dblpancakes.columns["h"]
+        gaps = isolations.columns["h"]
+        tops = np.cumsum(heights + gaps) - gaps
+        r0 = r1 = h = 0.0
+        if n:
+            h = tops[-1].item()
+            r0 = dblpancakes.columns["r0"].min().item()
+            r1 = dblpancakes.columns["r1"].max().item()
+
+        # shift insert by z0-h/2.
+        z1 = z0 - h / 2.0
+        dblpancakes._write("z0", slice(None), z1 + tops - heights / 2.0)
+
+        if debug:
+            print("=== Load cfg:")
+            print(f"r0= {r0} [mm]")
+            print(f"r1= {r1} [mm]")
+            print(f"z1= {z0-h/2.} [mm]")
+            print(f"z2= {z0+h/2.} [mm]")
+            print(f"z0= {z0} [mm]")
+            print(f"h= {h} [mm]")
+            print(f"n= {len(dblpancakes)}")
+
+            for i, dp in enumerate(dblpancakes):
+                print(f"dblpancakes[{i}]: {dp}")
+            print("===")
+
+        name = inputcfg.replace(".json", "")
+        return cls(name, z0, h, r0, r1, z1, n, dblpancakes, isolations)
 
     def __repr__(self) -> str:
         """
@@ -613,33 +911,123 @@ class HTSinsert:
         )
 
     def get_names(self, mname: str, detail: str, verbose: bool = False) -> list[str]:
-        dp_ids = []
-        i_ids = []
+        """
+        return names for Markers (see iter_names)
+        """
+        return list(self.iter_names(mname, detail, verbose))
 
+    def iter_names(
+        self, mname: str, detail: str, verbose: bool = False
+    ) -> Iterator[str]:
+        """
+        yield the names for Markers one by one:
+        names of each double pancake (see dblpancake.iter_names)
+        then names of isolations between double pancakes
+        """
         prefix = ""
         if mname:
             prefix = f"{mname}_"
 
-        n_dp = len(self.dblpancakes)
         for i, dp in enumerate(self.dblpancakes):
             if verbose:
                 print(f"HTSInsert.names: dblpancakes[{i}]: dp={dp}")
+            yield from dp.iter_names(f"{prefix}dp{i}", detail)
 
-            dp_name = f"{prefix}dp{i}"
-            dp_id = dp.get_names(dp_name, detail, verbose)
-            dp_ids.append(dp_id)
+        for i in range(len(self.dblpancakes) - 1):
+            yield self.isolations[i].get_names(f"{prefix}i{i}", detail, verbose)
 
-            if i != n_dp - 1:
-                dp_i = self.isolations[i]
+    def _name_counts(self, detail: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        return the number of names of each pancake and double pancake
+        """
+        ntapes = self.dblpancakes.column("ntapes")
+        if detail == "dblpancake":
+            return np.zeros_like(ntapes), np.ones_like(ntapes)
+        if detail == "pancake":
+            return np.ones_like(ntapes), np.full_like(ntapes, 3)
+        # mandrin, SC and Duromag per tape
+        pancakes = 1 + 2 * ntapes
+        return pancakes, 2 * pancakes + 1
+
+    def count_names(self, detail: str) -> int:
+        """
+        return the number of names given by iter_names (without generating them)
+        """
+        (_, dps) = self._name_counts(detail)
+        return int(dps.sum()) + max(len(self.dblpancakes) - 1, 0)
+
+    def name_at(self, i: int, mname: str = "", detail: str = "tape") -> str:
+        """
+        return the i-th name given by iter_names (without generating the others)
+        """
+        count = self.count_names(detail)
+        if i < 0:
+            i += count
+        if not 0 <= i < count:
+            raise IndexError(f"HTSinsert.name_at: {i} out of range ({count} names)")
 
-                _name = f"{prefix}i{i}"
-                _id = dp_i.get_names(_name, detail, verbose)
-                i_ids.append(_id)
+        prefix = ""
+        if mname:
+            prefix = f"{mname}_"
 
+        (pancakes, dps) = self._name_counts(detail)
+        ends = np.cumsum(dps)
+        if not ends.size or i >= ends[-1]:
+            return f"{prefix}i{i - (ends[-1] if ends.size else 0)}"
+
+        k = int(np.searchsorted(ends, i, side="right"))
+        j = i - (ends[k] - dps[k])
+        name = f"{prefix}dp{k}"
         if detail == "dblpancake":
-            return flatten([dp_ids, i_ids])
-        else:
-            return flatten([flatten(dp_ids), i_ids])
+            return name
+        if j == dps[k] - 1:
+            return f"{name}_i"
+        (p, j) = divmod(int(j), int(pancakes[k]))
+        name = f"{name}_p{p}"
+        if detail == "pancake":
+            return name
+        if j == 0:
+            return f"{name}_Mandrin"
+        (t, kind) = divmod(j - 1, 2)
+        return f"{name}_t{t}_{('SC', 'Duromag')[kind]}"
+
+    def index_of(self, name: str, mname: str = "", detail: str = "tape") -> int:
+        """
+        return the index of name in iter_names (without generating them)
+        """
+        prefix = ""
+        if mname:
+            prefix = f"{mname}_"
+
+        (pancakes, dps) = self._name_counts(detail)
+        ends = np.cumsum(dps)
+        n = len(dps)
+        index = None
+        pattern = r"(?:i(\d+)|dp(\d+)(?:_i|_p([01])(?:_Mandrin|_t(\d+)_(SC|Duromag))?)?)"
+        match = re.fullmatch(re.escape(prefix) + pattern, name)
+        if match:
+            (i, k, p, t, kind) = match.groups()
+            if i is not None:
+                if int(i) < n - 1:
+                    index = int(ends[-1]) + int(i)
+            elif int(k) < n:
+                k = int(k)
+                index = int(ends[k] - dps[k])
+                if name.endswith("_i"):
+                    index += int(dps[k]) - 1
+                elif p is not None:
+                    index += int(p) * int(pancakes[k])
+                    if t is not None:
+                        index += 1 + 2 * int(t) + (kind == "Duromag")
+
+        # names not given by iter_names for this detail (eg. a tape with detail pancake)
+        if (
+            index is None
+            or index >= self.count_names(detail)
+            or self.name_at(index, mname, detail) != name
+        ):
+            raise ValueError(f"HTSinsert.index_of: {name} is not a name of {self.name}")
+        return index
 
     def setDblpancake(self, dblpancake):
         self.dblpancakes.append(dblpancake)
@@ -687,156 +1075,160 @@ class HTSinsert:
         """
         return self.n
 
-    def getNtapes(self) -> list:
+    def getNtapes(self) -> np.ndarray:
+        """
+        returns the number of tapes as an array
+        """
+        return self.dblpancakes.column("ntapes")
+
+    def getHtapes(self) -> np.ndarray:
+        """
+        returns the height of SC tapes as an array
+        """
+        return self.dblpancakes.column("tape_h")
+
+    def getWtapes_SC(self) -> np.ndarray:
         """
-        returns the number of tapes as a list
+        returns the width of SC tapes as an array
         """
-        n_ = []
-        for dp in self.dblpancakes:
-            n_.append(dp.getPancake().getN())
-        return n_
+        return self.dblpancakes.column("tape_w")
 
-    def getHtapes(self) -> list:
+    def getWtapes_Isolation(self) -> np.ndarray:
         """
-        returns the width of SC tapes
-        either as an float or a list
+        returns the width of isolation between tapes as an array
         """
-        w_tapes = []
-        for dp in self.dblpancakes:
-            w_tapes.append(dp.pancake.getTape().getH())
-        return w_tapes
+        return self.dblpancakes.column("tape_e")
 
-    def getWtapes_SC(self) -> list:
+    def getMandrinPancake(self) -> np.ndarray:
         """
-        returns the width of SC tapes as a list
+        returns the width of Mandrin as an array
         """
-        w_ = []
-        for dp in self.dblpancakes:
-            w_.append(dp.pancake.getTape().getW_Sc())
-        return w_
+        return self.dblpancakes.column("mandrin")
 
-    def getWtapes_Isolation(self) -> list:
+    def getWPancake(self) -> np.ndarray:
         """
-        returns the width of isolation between tapes as a list
+        returns the width of pancake as an array
         """
-        w_ = []
-        for dp in self.dblpancakes:
-            w_.append(dp.pancake.getTape().getW_Isolation())
-        return w_
+        return self.dblpancakes.column("r1") - self.dblpancakes.column("r0")
 
-    def getMandrinPancake(self) -> list:
+    def getWPancake_Isolation(self) -> np.ndarray:
         """
-        returns the width of Mandrin as a list
+        returns the width of isolation between pancake as an array
         """
-        w_ = []
-        for dp in self.dblpancakes:
-            w_.append(dp.getPancake().getMandrin())
-        return w_
+        return self.dblpancakes.column("i_w")
 
-    def getWPancake(self) -> list:
+    def getR0Pancake_Isolation(self) -> np.ndarray:
         """
-        returns the width of pancake as a list
+        returns the inner radius of isolation between pancake as an array
         """
-        w_ = []
-        for dp in self.dblpancakes:
-            w_.append(dp.getPancake().getW())
-        return w_
+        return self.dblpancakes.column("i_r0")
 
-    def getWPancake_Isolation(self) -> list:
+    def getR1Pancake_Isolation(self) -> np.ndarray:
         """
-        returns the width of isolation between pancake as a list
+        returns the external radius of isolation between pancake as an array
         """
-        w_ = []
-        for dp in self.dblpancakes:
-            w_.append(dp.isolation.getW())
-        return w_
+        return self.dblpancakes.column("i_r0") + self.dblpancakes.column("i_w")
 
-    def getR0Pancake_Isolation(self) -> list:
+    def getHPancake_Isolation(self) -> np.ndarray:
         """
-        returns the inner radius of isolation between pancake as a list
+        returns the height of isolation between pancake as an array
         """
-        w_ = []
-        for dp in self.dblpancakes:
-            w_.append(dp.getIsolation().getR0())
-        return w_
+        return self.dblpancakes.column("i_h")
 
-    def getR1Pancake_Isolation(self) -> list:
+    def getWDblPancake(self) -> np.ndarray:
         """
-        returns the external radius of isolation between pancake as a list
+        returns the width of dblpancake as an array
         """
-        w_ = []
-        for dp in self.dblpancakes:
-            w_.append(dp.getIsolation().getR0() + dp.getIsolation().getW())
-        return w_
+        return self.dblpancakes.column("r1") - self.dblpancakes.column("r0")
 
-    def getHPancake_Isolation(self) -> list:
+    def getHDblPancake(self) -> np.ndarray:
         """
-        returns the height of isolation between pancake as a list
+        returns the height of dblpancake as an array
         """
-        w_ = []
-        for dp in self.dblpancakes:
-            w_.append(dp.getIsolation().getH())
-        return w_
+        return self.dblpancakes.column("h")
 
-    def getWDblPancake(self) -> list:
+    def getR0_Isolation(self) -> np.ndarray:
         """
-        returns the width of dblpancake as a list
+        returns the inner radius of isolation between dbl pancake as an array
         """
-        w_ = []
-        for dp in self.dblpancakes:
-            w_.append(dp.getW())
-        return w_
+        return self.isolations.column("r0")
 
-    def getHDblPancake(self) -> list:
+    def getR1_Isolation(self) -> np.ndarray:
         """
-        returns the height of dblpancake as a list
+        returns the external radius of isolation between dbl pancake as an array
         """
-        w_ = []
-        for dp in self.dblpancakes:
-            w_.append(dp.getH())
-        return w_
+        return self.isolations.column("r0") + self.isolations.column("h")
 
-    def getR0_Isolation(self) -> list:
+    def getW_Isolation(self) -> np.ndarray:
         """
-        returns the inner radius of isolation between dbl pancake as a list
+        returns the width of isolation between dbl pancakes as an array
         """
-        w_ = []
-        for isolant in self.isolations:
-            w_.append(isolant.getR0())
-        return w_
+        return self.isolations.column("w")
 
-    def getR1_Isolation(self) -> list:
+    def getH_Isolation(self) -> np.ndarray:
+        """
+        returns the height of isolation between dbl pancakes as an array
         """
-        returns the external radius of isolation between dbl pancake as a list
+        return self.isolations.column("h")
+
+    def _tapes(
+        self, ends: np.ndarray, start: int, stop: int, cowound: bool = False
+    ) -> np.ndarray:
         """
-        w_ = []
-        for isolant in self.isolations:
-            w_.append(isolant.getR0() + isolant.getH())
-        return w_
+        return the rectangles (r0, r1, z0, z1) of tapes start to stop-1
+        (see getTapes), ends being the cumulated number of tapes per double pancake
+        """
+        dps = self.dblpancakes.columns
+        ntapes = dps["ntapes"]
+
+        index = np.arange(start, stop)
+        k = np.searchsorted(ends, index, side="right")
+        # pancake p0 (below dblpancake isolation) or p1, tape t in pancake
+        (p, t) = np.divmod(index - (ends - 2 * ntapes)[k], ntapes[k])
 
-    def getW_Isolation(self) -> list:
+        (w, e, h) = (dps["tape_w"][k], dps["tape_e"][k], dps["tape_h"][k])
+        r0 = dps["r0"][k] + t * (w + e)
+        i_h = dps["i_h"][k]
+        z0 = dps["z0"][k] + np.where(p == 0, -i_h / 2.0 - h, i_h / 2.0)
+        if cowound:
+            (r0, w) = (r0 + w, e)
+        return np.stack((r0, r0 + w, z0, z0 + h), axis=1)
+
+    def iter_tapes(
+        self, chunksize: Optional[int] = None, cowound: bool = False
+    ) -> Iterator[np.ndarray]:
         """
-        returns the width of isolation between dbl pancakes
+        yield the rectangles of tapes (see getTapes) by blocks:
+        one block per double pancake or blocks of chunksize tapes
         """
-        w_ = []
-        for isolant in self.isolations:
-            w_.append(isolant.getW())
-        return w_
+        ends = np.cumsum(2 * self.dblpancakes.columns["ntapes"])
+        total = int(ends[-1]) if ends.size else 0
+        if chunksize is None:
+            bounds = [0] + ends.tolist()
+        else:
+            bounds = list(range(0, total, chunksize)) + [total]
+        for start, stop in zip(bounds, bounds[1:]):
+            if stop > start:
+                yield self._tapes(ends, start, stop, cowound)
 
-    def getH_Isolation(self) -> list:
+    def getTapes(self, cowound: bool = False) -> np.ndarray:
         """
-        returns the height of isolation between dbl pancakes
+        returns the rectangles (r0, r1, z0, z1) of the SC tapes
+        (or of their co-wound isolation if cowound) as a (N_tapes, 4) array
+
+        tapes are ordered as their names (see iter_names):
+        by double pancake, pancake p0 then p1, from inner to outer radius
         """
-        w_ = []
-        for isolant in self.isolations:
-            w_.append(isolant.getH())
-        return w_
+        ends = np.cumsum(2 * self.dblpancakes.columns["ntapes"])
+        total = int(ends[-1]) if ends.size else 0
+        return self._tapes(ends, 0, total, cowound)
 
     def getFillingFactor(self) -> float:
-        S_tapes = 0
-        for dp in self.dblpancakes:
-            S_tapes += dp.pancake.n * 2 * dp.pancake.tape.w * dp.pancake.tape.h
-        return S_tapes / self.getArea()
+        dps = self.dblpancakes
+        S_tapes = np.sum(
+            dps.column("ntapes") * 2 * dps.column("tape_w") * dps.column("tape_h")
+        )
+        return S_tapes.item() / self.getArea()
 
     def getArea(self) -> float:
         return (self.getR1() - self.getR0()) * self.getH()
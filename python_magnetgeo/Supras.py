@@ -2,12 +2,17 @@
 # encoding: UTF-8
 
 """defines Supra Insert structure"""
+from typing import Optional
 
 import json
 import yaml
 
+from . import loaders
+from .fingerprint import Fingerprint
+from . import registry
 
-class Supras(yaml.YAMLObject):
+
+class Supras(registry.Assembly, yaml.YAMLObject, Fingerprint):
     """
     name :
     magnets :
@@ -49,31 +54,32 @@ class Supras(yaml.YAMLObject):
         return {}
 
     def get_names(
-        self, mname: str, is2D: bool = False, verbose: bool = False
+        self,
+        mname: str,
+        is2D: bool = False,
+        verbose: bool = False,
+        max_workers: Optional[int] = None,
     ) -> list[str]:
         """
         return names for Markers
+
+        max_workers: number of threads used to load magnets
         """
         solid_names = []
+        registry.prefetch(self, max_workers=max_workers)
         if isinstance(self.magnets, str):
-            YAMLFile = f"{self.magnets}.yaml"
-            with open(YAMLFile, "r") as f:
-                Object = yaml.load(f, Loader=yaml.FullLoader)
+            Object = registry.get_part(self, self.magnets)
 
             solid_names += Object.get_names(self.name, is2D, verbose)
         elif isinstance(self.magnets, list):
             for magnet in self.magnets:
-                YAMLFile = f"{magnet}.yaml"
-                with open(YAMLFile, "r") as f:
-                    Object = yaml.load(f, Loader=yaml.FullLoader)
+                Object = registry.get_part(self, magnet)
 
                 solid_names += Object.get_names(magnet, is2D, verbose)
         elif isinstance(self.magnets, dict):
             for key in self.magnets:
                 magnet = self.magnets[key]
-                YAMLFile = f"{magnet}.yaml"
-                with open(YAMLFile, "r") as f:
-                    Object = yaml.load(f, Loader=yaml.FullLoader)
+                Object = registry.get_part(self, magnet)
 
                 solid_names += Object.get_names(self.name, is2D, verbose)
         else:
@@ -85,6 +91,12 @@ class Supras(yaml.YAMLObject):
             print(f"Supras_Gmsh: solid_names {len(solid_names)}")
         return solid_names
 
+    def resolve(self, directory: Optional[str] = None):
+        """
+        return a copy of Supras with magnets loaded once for all
+        """
+        return registry.resolve(self, directory)
+
     def dump(self):
         """dump to a yaml file name.yaml"""
         try:
@@ -98,7 +110,7 @@ class Supras(yaml.YAMLObject):
         data = None
         try:
             with open(f"{self.name}.yaml", "r") as istream:
-                data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+                data = yaml.load(stream=istream, Loader=loaders.get_loader())
         except:
             raise Exception(f"Failed to load Insert data {self.name}.yaml")
 
@@ -140,24 +152,24 @@ class Supras(yaml.YAMLObject):
     #
     ###################################################################
 
-    def boundingBox(self) -> tuple:
+    def boundingBox(self, max_workers: Optional[int] = None) -> tuple:
         """
         return Bounding as r[], z[]
 
         so far exclude Leads
+        max_workers: number of threads used to load magnets
         """
+        registry.prefetch(self, max_workers=max_workers)
 
         rb = [0, 0]
         zb = [0, 0]
 
         for i, mname in enumerate(self.magnets):
-            Supra = None
-            with open(f"{mname}.yaml", "r") as f:
-                Supra = yaml.load(f, Loader=yaml.FullLoader)
+            Supra = registry.get_part(self, mname)
 
             if i == 0:
-                rb = Supra.r
-                zb = Supra.z
+                rb = list(Supra.r)
+                zb = list(Supra.z)
 
             rb[0] = min(rb[0], Supra.r[0])
             zb[0] = min(zb[0], Supra.z[0])
@@ -206,4 +218,5 @@ def Supras_constructor(loader, node):
     return Supras(name, magnets, innerbore, outerbore)
 
 
-yaml.add_constructor("!Supras", Supras_constructor)
+loaders.add_constructor("!Supras", Supras_constructor)
+loaders.add_yaml_object(Supras)
@@ -4,3 +4,49 @@ __author__ = """Christophe Trophime"""
 __email__ = "christophe.trophime@lncmi.cnrs.fr"
 __version__ = "0.3.1"
 
+# submodules are only imported on first access (eg. python_magnetgeo.Helix)
+_submodules = {
+    "Bitter",
+    "Bitters",
+    "CurrentLead",
+    "Helix",
+    "InnerCurrentLead",
+    "Insert",
+    "MSite",
+    "Model3D",
+    "ModelAxi",
+    "OuterCurrentLead",
+    "Ring",
+    "Screen",
+    "Shape",
+    "Shape2D",
+    "Supra",
+    "SupraStructure",
+    "Supras",
+    "cache",
+    "coolingslit",
+    "cut_utils",
+    "deserialize",
+    "field",
+    "fingerprint",
+    "geo_axi",
+    "gmsh_axi",
+    "hydraulics",
+    "inductance",
+    "loaders",
+    "memo",
+    "registry",
+    "tierod",
+}
+
+
+def __getattr__(name: str):
+    if name in _submodules:
+        import importlib
+
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | _submodules)
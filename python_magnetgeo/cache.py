@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+Provides an on-disk cache of geometry object trees
+
+* a tree (see registry.load_tree) is pickled into {cachedir}/{key}.bin,
+  key being the sha256 of the top-level file and of all the files it references,
+* {cachedir}/{top}.deps lists the files referenced by the top-level file,
+* the size of cachedir is bounded (least recently used entries are removed first)
+
+cachedir defaults to $MAGNETGEO_CACHE_DIR or ~/.cache/magnetgeo,
+setting MAGNETGEO_NO_CACHE disables the cache.
+
+Entries are unpickled: only use a cachedir you trust.
+"""
+
+from typing import Optional
+
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+
+from . import __version__
+from . import registry
+
+# to be changed whenever the layout of cached trees changes
+CACHE_VERSION = 1
+
+
+def default_cachedir() -> str:
+    """
+    return the default cache directory
+    """
+    if "MAGNETGEO_CACHE_DIR" in os.environ:
+        return os.environ["MAGNETGEO_CACHE_DIR"]
+    xdg = os.environ.get(
+        "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    return os.path.join(xdg, "magnetgeo")
+
+
+def file_hash(filename: str) -> str:
+    """
+    return sha256 of filename content
+    """
+    h = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def dependencies(tree, directory: Optional[str] = None) -> list[str]:
+    """
+    return the files referenced by a resolved tree
+    """
+    files = []
+    for name, part in getattr(tree, "_parts", {}).items():
+        files.append(os.path.realpath(registry.get_filename(name, directory)))
+        files += dependencies(part, directory)
+    return list(dict.fromkeys(files))
+
+
+class DiskCache:
+    """
+    cachedir :
+    maxsize : maximum size of cachedir in bytes
+    enabled :
+    """
+
+    def __init__(
+        self,
+        cachedir: Optional[str] = None,
+        maxsize: int = 512 * 2**20,
+        enabled: Optional[bool] = None,
+    ) -> None:
+        """
+        initialize object
+        """
+        if cachedir is None:
+            cachedir = default_cachedir()
+        if enabled is None:
+            enabled = not os.environ.get("MAGNETGEO_NO_CACHE")
+
+        self.cachedir = cachedir
+        self.maxsize = maxsize
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        """
+        representation of object
+        """
+        return "%s(cachedir=%r, maxsize=%r, enabled=%r)" % (
+            self.__class__.__name__,
+            self.cachedir,
+            self.maxsize,
+            self.enabled,
+        )
+
+    def _top(self, filename: str, directory: Optional[str]) -> str:
+        # parts are looked up relative to directory (or cwd)
+        h = hashlib.sha256(file_hash(filename).encode())
+        h.update(os.path.realpath(directory or os.getcwd()).encode())
+        return h.hexdigest()
+
+    def _key(self, top: str, deps: list[str]) -> str:
+        h = hashlib.sha256(f"{CACHE_VERSION}:{__version__}:{top}".encode())
+        for dep in deps:
+            h.update(file_hash(dep).encode())
+        return h.hexdigest()
+
+    def _write(self, name: str, data: bytes) -> None:
+        os.makedirs(self.cachedir, exist_ok=True)
+        fd, tmpname = tempfile.mkstemp(dir=self.cachedir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmpname, os.path.join(self.cachedir, name))
+        except BaseException:
+            os.unlink(tmpname)
+            raise
+
+    def get(self, filename: str, directory: Optional[str] = None):
+        """
+        return the cached tree for filename, None if there is none
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            top = self._top(filename, directory)
+            with open(os.path.join(self.cachedir, f"{top}.deps"), "r") as f:
+                deps = json.load(f)
+            path = os.path.join(self.cachedir, f"{self._key(top, deps)}.bin")
+            with open(path, "rb") as f:
+                tree = pickle.load(f)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return None
+
+        # keep track of last use for eviction
+        os.utime(path)
+        self.hits += 1
+        return tree
+
+    def put(self, filename: str, tree, directory: Optional[str] = None) -> None:
+        """
+        store tree built from filename
+        """
+        if not self.enabled:
+            return
+
+        top = self._top(filename, directory)
+        deps = dependencies(tree, directory)
+        self._write(f"{top}.deps", json.dumps(deps).encode())
+        self._write(
+            f"{self._key(top, deps)}.bin",
+            pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+        self.evict()
+
+    def load(self, filename: str, directory: Optional[str] = None):
+        """
+        return the resolved tree for filename
+
+        the tree is only built if it is not cached or if any source changed
+        """
+        tree = self.get(filename, directory)
+        if tree is None:
+            tree = registry.load_tree(filename, directory)
+            self.put(filename, tree, directory)
+        return tree
+
+    def entries(self) -> list[os.DirEntry]:
+        """
+        return cache entries from least to most recently used
+        """
+        if not os.path.isdir(self.cachedir):
+            return []
+        with os.scandir(self.cachedir) as it:
+            entries = [
+                entry for entry in it if entry.name.endswith((".bin", ".deps"))
+            ]
+        return sorted(entries, key=lambda entry: entry.stat().st_mtime_ns)
+
+    def size(self) -> int:
+        """
+        return the size of cache in bytes
+        """
+        return sum(entry.stat().st_size for entry in self.entries())
+
+    def evict(self) -> None:
+        """
+        remove least recently used entries until cache fits in maxsize
+        """
+        entries = self.entries()
+        size = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if size <= self.maxsize:
+                break
+            size -= entry.stat().st_size
+            os.unlink(entry.path)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """
+        remove all entries
+        """
+        for entry in self.entries():
+            os.unlink(entry.path)
+
+    def stats(self) -> dict:
+        """
+        returns cache statistics as a dict
+        """
+        entries = self.entries()
+        return {
+            "entries": len([e for e in entries if e.name.endswith(".bin")]),
+            "size": sum(entry.stat().st_size for entry in entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# process-wide cache
+cache = DiskCache()
+
+
+def load(filename: str, directory: Optional[str] = None, use_cache: bool = True):
+    """
+    return the resolved tree for filename, use_cache=False bypasses the cache
+    """
+    if not use_cache:
+        return registry.load_tree(filename, directory)
+    return cache.load(filename, directory)
+
+
+#
+# To operate from command line
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", help="geometry files to load", nargs="*")
+    parser.add_argument("--wd", help="directory holding parts", type=str)
+    parser.add_argument("--cachedir", help="cache directory", type=str)
+    parser.add_argument("--maxsize", help="cache size in MB", type=int, default=512)
+    parser.add_argument("--no-cache", help="do not use cache", action="store_true")
+    parser.add_argument("--clear", help="clear cache", action="store_true")
+    args = parser.parse_args()
+
+    enabled = False if args.no_cache else None
+    cache = DiskCache(args.cachedir, args.maxsize * 2**20, enabled)
+    if args.clear:
+        cache.clear()
+
+    for file in args.files:
+        tree = cache.load(file, args.wd)
+        print(f"{file}: {tree.__class__.__name__}({tree.name})")
+    print(cache.stats())
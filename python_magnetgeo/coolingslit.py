@@ -7,10 +7,13 @@ Provides definiton for CoolingSlits:
 
 import yaml
 import json
+
+from . import loaders
+from .fingerprint import Fingerprint
 from .Shape2D import Shape2D
 
 
-class CoolingSlit(yaml.YAMLObject):
+class CoolingSlit(yaml.YAMLObject, Fingerprint):
     """
     r: radius
     angle: anglar shift from tierod
@@ -60,7 +63,7 @@ class CoolingSlit(yaml.YAMLObject):
         data = None
         try:
             with open(f"{name}.yaml", "r") as istream:
-                data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+                data = yaml.load(stream=istream, Loader=loaders.get_loader())
         except:
             raise Exception(f"Failed to load Bitter data {name}.yaml")
 
@@ -111,4 +114,5 @@ def CoolingSlit_constructor(loader, node):
     return CoolingSlit(r, angle, n, dh, sh, shape)
 
 
-yaml.add_constructor("!Slit", CoolingSlit_constructor)
+loaders.add_constructor("!Slit", CoolingSlit_constructor)
+loaders.add_yaml_object(CoolingSlit)
@@ -3,12 +3,63 @@
 Utils for generating cut
 """
 
-def lncmi_cut(object, filename: str, append: bool = False, z0: float = 0):
+from typing import Optional
+
+import io
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def compacted(modelaxi, tol: Optional[float] = None):
     """
-    for lncmi CAM
+    return modelaxi with consecutive sections of same pitch merged
+    (see ModelAxi.compact_sections), tol=None (default) keeps all sections
+    """
+    if tol is None:
+        return modelaxi
+
+    from .ModelAxi import ModelAxi
+
+    (turns, pitch, index, error) = modelaxi.compact_sections(tol)
+    return ModelAxi(modelaxi.name, modelaxi.h, turns, pitch)
+
+
+def write_content(content: str, filename=None, append: bool = False):
+    """
+    write content with a single call
+
+    filename: path, file-like object (text or binary)
+    or None to get content back as bytes
+    """
+    if filename is None:
+        return content.encode()
+
+    if hasattr(filename, "write"):
+        if isinstance(filename, io.TextIOBase):
+            filename.write(content)
+        else:
+            filename.write(content.encode())
+        return None
+
+    # 'w' create or overwrite file, 'a' append to file
+    flag = "w"
+    if append:
+        flag = "a"
+    with open(filename, flag) as f:
+        f.write(content)
+    return None
+
+
+def lncmi_content(
+    object, name: str, z0: float = 0, tol: Optional[float] = None
+) -> str:
+    """
+    return lncmi cut as a string
     see: MagnetTools/MagnetField/Stack.cc write_lncmi_paramfile L136
     """
-    print(f'lncmi_cut: filename={filename}')
     from math import pi
 
     sign = 1
@@ -19,87 +70,147 @@ def lncmi_cut(object, filename: str, append: bool = False, z0: float = 0):
     units = 1.e+3
     angle_units = 180 / pi
 
-    z = z0
-    theta = 0
-    shape_id = 0
-    tab = "\t"
+    sens = "droite"
+    if sign > 0:
+        sens = "gauche"
+    header = (
+        f"%decoupe double helice {name} {sens}\n"
+        f"%Origin X {-z0 * units:12.4f}\tW {-sign * 0 * angle_units:12.3f}\n"
+        "O****(*****)\n"
+        "G0G90X0.0Y0.0\n"
+        "G0A-0.\n"
+        "G92\n"
+        "G40G50\n"
+        "M61\nM60\n"
+        "G0X-0.000\n"
+        "G0A0.\n"
+    )
 
-    # 'x' create file, 'a' append to file, Append and Read (‘a+’)
-    flag = "x"
-    if append:
-        flag = "a"
-    with open(filename, flag) as f:
-        sens = "droite"
-        if sign > 0:
-            sens = "gauche"
-        f.write(f"%decoupe double helice {filename} {sens}\n")
-        f.write("%Origin ")
-        f.write(f"X {-z * units:12.4f}\t")
-        f.write(f"W {-sign * theta * angle_units:12.3f}\n")
-
-        f.write("O****(*****)\n")
-        f.write("G0G90X0.0Y0.0\n")
-        f.write("G0A-0.\n")
-        f.write("G92\n")
-        f.write("G40G50\n")
-        f.write("M61\nM60\n")
-        f.write("G0X-0.000\n")
-        f.write("G0A0.\n")
-
-        # TODO use compact to reduce size of cuts
-        for i, (turn, pitch) in enumerate(zip(object.modelaxi.turns, object.modelaxi.pitch)):
-            theta += turn * (2 * pi) * sign
-            z -= turn * pitch
-            f.write(f"N{i+1}")
-            if i == len(object.modelaxi.turns)-1:
-                f.write("G01")
-
-            f.write("\t");
-            f.write(f"X {-z * units:12.4f}\t")
-            f.write(f"W {-sign * theta * angle_units:12.3f}\n")
-
-        f.write("M50\nM29\nM30")
-        f.write("%")
-    
-def salome_cut(object, filename: str, append: bool = False, z0: float = 0):
+    modelaxi = compacted(object.modelaxi, tol)
+    zs = np.cumsum(np.concatenate(([z0], -modelaxi.section_lengths())))[1:]
+    thetas = sign * modelaxi.theta_boundaries()[1:]
+    x = (-zs * units).tolist()
+    w = (-sign * thetas * angle_units).tolist()
+
+    nsection = len(x)
+    rows = [v for row in zip(range(1, nsection + 1), x, w) for v in row]
+    body = ("N%d\tX %12.4f\tW %12.3f\n" * (nsection - 1)) % tuple(rows[:-3])
+    if nsection:
+        body += "N%dG01\tX %12.4f\tW %12.3f\n" % tuple(rows[-3:])
+
+    return header + body + "M50\nM29\nM30%"
+
+
+def lncmi_cut(
+    object,
+    filename=None,
+    append: bool = False,
+    z0: float = 0,
+    tol: Optional[float] = None,
+    debug: bool = False,
+    with_shapes: bool = False,
+):
     """
-    for salome
-    see: MagnetTools/MagnetField/Stack.cc write_salome_paramfile L1011
+    for lncmi CAM
 
+    filename: path, file-like object or None to get the cut as bytes
     """
-    print(f'salome_cut: filename={filename}')
-    from math import pi
+    if debug:
+        print(f"lncmi_cut: filename={filename}")
+    if with_shapes:
+        raise RuntimeError("lncmi_cut: shapes are not supported, use salome format")
+    name = filename if isinstance(filename, str) else getattr(filename, "name", "")
+    return write_content(lncmi_content(object, name, z0, tol), filename, append)
+
+
+def salome_content(
+    object, tol: Optional[float] = None, with_shapes: bool = False
+) -> str:
+    """
+    return salome cut as a string
+    see: MagnetTools/MagnetField/Stack.cc write_salome_paramfile L1011
 
+    with_shapes: add the shapes defined by object.shape (see Shape.get_placements),
+    Shape_id of a row being the shape running from this row to the next one
+
+    Shape_id encoding: the column comes from write_salome_paramfile, which
+    always writes 0 (no shape). Shaped cuts were written by the external
+    add_shape tool, whose output is not reproduced here: instead Shape_id is
+    the index (from 1) of the shape length in object.shape.length, its sign
+    giving the side of the cut (positive above, negative below).
+    Rows are added at the start and end angles of each shape, z being
+    interpolated along the cut.
+    """
     sign = 1
     if object.odd:
         sign = -1
 
-    z = object.modelaxi.h
-    theta = 0
-    shape_id = 0
-    tab = "\t"
+    modelaxi = compacted(object.modelaxi, tol)
+    thetas = modelaxi.theta_boundaries()
+    zs = modelaxi.z_boundaries(top=True)
+    shape_ids = np.zeros(thetas.size, dtype=int)
 
-    # 'x' create file, 'a' append to file, Append and Read (‘a+’)
-    flag = "x"
-    if append:
-        flag = "a"
-    print(f'flag={flag}')
-    with open(filename, flag) as f:
-        f.write(f"#theta[rad]{tab}Shape_id[]{tab}tZ[mm]\n")
-        f.write(f"{theta*(-sign):12.8f}{tab}{shape_id:8}{tab}{z:12.8f}\n")
+    if with_shapes:
+        (start, end, ids) = object.shape.get_placements(modelaxi.get_Nturns())
+        if ids.size:
+            rows = np.union1d(thetas, np.concatenate((start, end)))
+            # the helical cut is linear in each section
+            zs = np.interp(rows, thetas, zs)
+            k = np.searchsorted(start, rows, side="right") - 1
+            inside = (k >= 0) & (rows < end[np.maximum(k, 0)])
+            shape_ids = np.where(inside, ids[np.maximum(k, 0)], 0)
+            thetas = rows
+
+    header = (
+        "#theta[rad]\tShape_id[]\ttZ[mm]\n"
+        f"{0 * (-sign):12.8f}\t{shape_ids[0]:8}\t{object.modelaxi.h:12.8f}\n"
+    )
+
+    # the cut turns by sign * theta, written as theta * (-sign)
+    thetas = (-thetas[1:]).tolist()
+    rows = [
+        v for row in zip(thetas, shape_ids[1:].tolist(), zs[1:].tolist()) for v in row
+    ]
+    body = ("%12.8f\t%8d\t%12.8f\n" * len(thetas)) % tuple(rows)
+    return header + body
+
+
+def salome_cut(
+    object,
+    filename=None,
+    append: bool = False,
+    z0: float = 0,
+    tol: Optional[float] = None,
+    debug: bool = False,
+    with_shapes: bool = False,
+):
+    """
+    for salome
 
-        # TODO use compact to reduce size of cuts
-        for i, (turn, pitch) in enumerate(zip(object.modelaxi.turns, object.modelaxi.pitch)):
-            theta += turn * (2 * pi) * sign
-            z -= turn * pitch
-            f.write(f"{theta*(-sign):12.8f}{tab}{shape_id:8}{tab}{z:12.8f}\n")
+    filename: path, file-like object or None to get the cut as bytes
+    with_shapes: add shapes to the cut
+    """
+    if debug:
+        print(f"salome_cut: filename={filename}, append={append}")
+    content = salome_content(object, tol, with_shapes)
+    return write_content(content, filename, append)
 
 
 def create_cut(
-    object, format: str, name: str, append: bool = False, z0: float=0 
+    object,
+    format: str,
+    name: str,
+    append: bool = False,
+    z0: float = 0,
+    tol: Optional[float] = None,
+    debug: bool = False,
+    with_shapes: bool = False,
 ):
     """
     create cut file
+
+    tol: tolerance used to merge sections of same pitch (None, default: no merge)
+    with_shapes: add shapes to the cut (salome format only)
     """
 
     dformat = {
@@ -117,5 +228,79 @@ def create_cut(
     write_cut = format_cut["run"]
     ext = format_cut["extension"]
     filename = f"{name}{ext}"
-    write_cut(object, filename, append, z0)
+    write_cut(object, filename, append, z0, tol, debug, with_shapes)
+    return filename
+
+
+# parts that can be cut, with the method creating their cut files
+cutters = {"Helix": "generate_cut", "Bitter": "create_cut"}
+
+
+def cut_parts(object, directory: Optional[str] = None) -> list:
+    """
+    return the parts to be cut in object (eg. Helices of an Insert)
+    """
+    from . import registry
+
+    if type(object).__name__ in cutters:
+        return [object]
+
+    parts = []
+    for part in registry.get_parts(object, directory):
+        parts += cut_parts(part, directory)
+    return parts
+
+
+def _generate_cut(task) -> list[str]:
+    """
+    create cut files for a part, returns their names
+    """
+    (part, format, directory) = task
+    files = getattr(part, cutters[type(part).__name__])(format, directory)
+    if isinstance(files, str):
+        files = [files]
+    return files
+
+
+def generate_cuts(
+    object,
+    format: str = "SALOME",
+    workers: Optional[int] = None,
+    directory: Optional[str] = None,
+    workingDir: Optional[str] = None,
+) -> dict:
+    """
+    create cut files for all the parts of object
+
+    workers: number of processes used (None or 1: sequential)
+    directory: where cut files are written (default: current directory)
+    workingDir: where parts are loaded from
+
+    the manifest {object.name}_cuts.json lists the cut files with their sha256,
+    it is also returned as a dict
+    """
+    from .cache import file_hash
+
+    parts = list({part.name: part for part in cut_parts(object, workingDir)}.values())
+    tasks = [(part, format, directory) for part in parts]
+
+    if workers is None or workers <= 1:
+        files = [_generate_cut(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            files = list(executor.map(_generate_cut, tasks))
+
+    manifest = {"name": object.name, "format": format, "files": []}
+    for part, pfiles in zip(parts, files):
+        for filename in pfiles:
+            manifest["files"].append(
+                {"part": part.name, "file": filename, "sha256": file_hash(filename)}
+            )
+
+    mfilename = f"{object.name}_cuts.json"
+    if directory is not None:
+        mfilename = os.path.join(directory, mfilename)
+    with open(mfilename, "w") as ostream:
+        json.dump(manifest, ostream, indent=4)
+    return manifest
 
@@ -5,47 +5,29 @@
 Provides tools to un/serialize data from json
 """
 
-from .Shape import Shape
-from .ModelAxi import ModelAxi
-from .Model3D import Model3D
-from .Helix import Helix
-from .Ring import Ring
-from .InnerCurrentLead import InnerCurrentLead
-from .OuterCurrentLead import OuterCurrentLead
-from .Insert import Insert
-from .Bitter import Bitter
-from .Supra import Supra
-from .Screen import Screen
-from .MSite import MSite
-from .Bitters import Bitters
-from .Supras import Supras
-from .Shape2D import Shape2D
-from .tierod import Tierod
-from .coolingslit import CoolingSlit
+import importlib
 
+# registers the yaml tags of the known classes
+from . import loaders
 
 # From : http://chimera.labs.oreilly.com/books/1230000000393/ch06.html#_discussion_95
-# Dictionary mapping names to known classes
+# Dictionary mapping names to modules defining known classes
+# (classes are imported on first use, see get_class)
+modules = loaders.modules
 
-classes = {
-    "Shape": Shape,
-    "ModelAxi": ModelAxi,
-    "Model3D": Model3D,
-    "Helix": Helix,
-    "Ring": Ring,
-    "InnerCurrentLead": InnerCurrentLead,
-    "OuterCurrentLead": OuterCurrentLead,
-    "Insert": Insert,
-    "Bitter": Bitter,
-    "Supra": Supra,
-    "Screen": Screen,
-    "Bitters": Bitters,
-    "Supras": Supras,
-    "MSite": MSite,
-    "Shape2D": Shape2D,
-    "Tierod": Tierod,
-    "CoolingSlit": CoolingSlit,
-}
+# Dictionary mapping names to known classes already imported
+classes = {}
+
+
+def get_class(clsname: str):
+    """
+    return the class named clsname, importing its module if needed
+    """
+    cls = classes.get(clsname)
+    if cls is None:
+        module = importlib.import_module(f".{modules[clsname]}", __package__)
+        cls = classes[clsname] = getattr(module, clsname)
+    return cls
 
 
 def serialize_instance(obj):
@@ -53,10 +35,22 @@ def serialize_instance(obj):
     serialize_instance of an obj
     """
     d = {"__classname__": type(obj).__name__}
-    d.update(vars(obj))
+    d.update(
+        (key, value) for key, value in vars(obj).items() if not key.startswith("_")
+    )
     return d
 
 
+def represent_instance(dumper, tag: str, obj):
+    """
+    represent_instance of an obj in yaml (private attributes are skipped)
+    """
+    state = {
+        key: value for key, value in vars(obj).items() if not key.startswith("_")
+    }
+    return dumper.represent_mapping(tag, state)
+
+
 def unserialize_object(d, debug: bool = False):
     """
     unserialize_instance of an obj
@@ -69,7 +63,7 @@ def unserialize_object(d, debug: bool = False):
     if debug:
         print(f'clsname: {clsname}', flush=True)
     if clsname:
-        cls = classes[clsname]
+        cls = get_class(clsname)
         obj = cls.__new__(cls)  # Make instance without calling __init__
         for key, value in d.items():
             if debug:
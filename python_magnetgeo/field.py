@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+Provides an axisymmetric magnetic field engine
+
+* discretize: split coils into sections of uniform current density
+  (Helix and Bitter: ModelAxi sections, Supra: double pancakes),
+* every section is a thick solenoid, integrated over its radius
+  as a set of current sheets whose field is given by complete
+  elliptic integrals (see cel),
+* field: Br, Bz on arrays of (r, z) points, evaluated by chunks
+  to stay within a memory budget
+* axis_field: closed-form Bz on axis, for batches of current sets
+* homogeneity: zonal expansion of Bz at the magnetic center
+
+lengths are in mm, currents in A, fields in T
+"""
+
+from typing import Optional
+
+import numpy as np
+
+mu0 = 4.0e-7 * np.pi
+
+# coils with their own current, containers are walked through registry.get_parts
+coils = ["Helix", "Bitter", "Supra"]
+
+# section markers (see get_names) and index of the first section
+markers = {"Helix": ("Cu", 1), "Bitter": ("B", 1), "Supra": ("dp", 0)}
+
+
+def cel(kc, p, c, s, tol: float = 1.0e-12) -> np.ndarray:
+    """
+    Bulirsch generalized complete elliptic integral (vectorized)
+
+    cel(kc, p, c, s) = int_0^pi/2 (c cos^2 + s sin^2) / ((cos^2 + p sin^2) sqrt(cos^2 + kc^2 sin^2))
+
+    see: Derby and Olbert, Am. J. Phys. 78, 229 (2010)
+    """
+    (kc, p, c, s) = (
+        np.asarray(x, dtype=float) for x in np.broadcast_arrays(kc, p, c, s)
+    )
+    k = np.abs(kc)
+    em = np.ones_like(k)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        positive = p > 0
+        f = k * k
+        g = 1.0 - p
+        q = (1.0 - f) * (s - c * p)
+        pn = np.sqrt((f - p) / g)
+        cn = (c - s) / g
+        pp = np.where(positive, np.sqrt(np.abs(p)), pn)
+        cc = np.where(positive, c, cn)
+        ss = np.where(positive, s / pp, -q / (g * g * pn) + cn * pn)
+
+        f = cc
+        cc = cc + ss / pp
+        g = k / pp
+        ss = 2 * (ss + f * g)
+        pp = g + pp
+        g = em
+        em = k + em
+        kk = k
+        # quadratic convergence
+        for _ in range(64):
+            if np.all(np.abs(g - k) <= g * tol):
+                break
+            k = 2 * np.sqrt(kk)
+            kk = k * em
+            f = cc
+            cc = cc + ss / pp
+            g = kk / pp
+            ss = 2 * (ss + f * g)
+            pp = g + pp
+            g = em
+            em = k + em
+
+    return (np.pi / 2) * (ss + cc * em) / (em * (em + pp))
+
+
+def _sections(obj, directory: Optional[str] = None) -> list[tuple]:
+    """
+    return (r1, r2, z1, z2, turns) for the sections of a coil
+    """
+    cls = type(obj).__name__
+    if cls in ("Helix", "Bitter"):
+        (r1, r2) = obj.r
+        zb = obj.modelaxi.z_boundaries()
+        return [
+            (r1, r2, z1, z2, n)
+            for z1, z2, n in zip(zb[:-1], zb[1:], obj.modelaxi.get_turns())
+        ]
+
+    if cls == "Supra":
+        if not obj.struct:
+            return [(obj.r[0], obj.r[1], obj.z[0], obj.z[1], obj.n)]
+        dps = obj.get_magnet_struct(directory).dblpancakes
+        (z0, h) = (dps.column("z0"), dps.column("h"))
+        return list(
+            zip(
+                dps.column("r0"),
+                dps.column("r1"),
+                z0 - h / 2.0,
+                z0 + h / 2.0,
+                2 * dps.column("ntapes"),
+            )
+        )
+
+    raise RuntimeError(f"field: unsupported coil type {cls}")
+
+
+def discretize(obj, directory: Optional[str] = None) -> dict:
+    """
+    split the coils of obj (Helix, Bitter, Supra or any container) into sections
+
+    returns a dict of arrays, one value per section:
+    r1, r2, z1, z2 (mm), turns, coil (index in names)
+    and names: the list of coil names, labels: the list of section names
+    """
+    from . import registry
+
+    def _coils(obj) -> list:
+        if type(obj).__name__ in coils:
+            return [obj]
+        parts = []
+        for part in registry.get_parts(obj, directory):
+            if type(part).__name__ in coils + list(registry.references):
+                parts += _coils(part)
+        return parts
+
+    names = []
+    labels = []
+    rows = []
+    index = []
+    for i, coil in enumerate(_coils(obj)):
+        sections = _sections(coil, directory)
+        (marker, first) = markers[type(coil).__name__]
+        names.append(coil.name)
+        labels += [f"{coil.name}_{marker}{j + first}" for j in range(len(sections))]
+        rows += sections
+        index += [i] * len(sections)
+
+    values = np.array(rows, dtype=float).reshape(-1, 5)
+    return {
+        "r1": values[:, 0],
+        "r2": values[:, 1],
+        "z1": values[:, 2],
+        "z2": values[:, 3],
+        "turns": values[:, 4],
+        "coil": np.array(index, dtype=int),
+        "names": names,
+        "labels": labels,
+    }
+
+
+def _coil_sum(values: np.ndarray, coil: np.ndarray, ncoils: int) -> np.ndarray:
+    """
+    sum the rows of values per coil (rows are sorted by coil)
+    """
+    result = np.zeros((ncoils,) + values.shape[1:], dtype=values.dtype)
+    if coil.size == 0:
+        return result
+    starts = np.searchsorted(coil, np.arange(ncoils))
+    # skip coils without section
+    filled = np.diff(np.append(starts, coil.size)) > 0
+    result[filled] = np.add.reduceat(values, starts[filled], axis=0)
+    return result
+
+
+def sheet_field(a, b, zc, n, r, z) -> tuple:
+    """
+    return (Br, Bz) of current sheets (SI units, broadcast together)
+
+    a: radius, b: half height, zc: center, n: current per unit height (A/m)
+    r, z: points
+    """
+    z = z - zc
+    zp = z + b
+    zm = z - b
+    ar = a + r
+    gamma = (a - r) / ar
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dp = np.sqrt(zp * zp + ar * ar)
+        dm = np.sqrt(zm * zm + ar * ar)
+        kp = np.sqrt(zp * zp + (a - r) ** 2) / dp
+        km = np.sqrt(zm * zm + (a - r) ** 2) / dm
+
+    B0 = mu0 * n / np.pi
+    Br = B0 * (a / dp * cel(kp, 1, 1, -1) - a / dm * cel(km, 1, 1, -1))
+    g2 = gamma * gamma
+    Bz = (
+        B0
+        * a
+        / ar
+        * (zp / dp * cel(kp, g2, 1, gamma) - zm / dm * cel(km, g2, 1, gamma))
+    )
+    return Br, Bz
+
+
+def coil_fields(
+    sections: dict,
+    r,
+    z,
+    nr: int = 8,
+    max_memory: int = 256 * 2**20,
+) -> tuple:
+    """
+    return (Br, Bz) per coil for a unit current: arrays (ncoils, npoints)
+
+    each section is integrated over its radius with nr Gauss-Legendre points,
+    points are processed by chunks so that temporaries stay below max_memory bytes
+    """
+    r = np.ravel(np.asarray(r, dtype=float)) * 1.0e-3
+    z = np.ravel(np.asarray(z, dtype=float)) * 1.0e-3
+
+    # current sheets (mm -> m)
+    (x, w) = np.polynomial.legendre.leggauss(nr)
+    r1 = sections["r1"][:, None] * 1.0e-3
+    r2 = sections["r2"][:, None] * 1.0e-3
+    z1 = sections["z1"] * 1.0e-3
+    z2 = sections["z2"] * 1.0e-3
+    a = (r1 + r2) / 2 + (r2 - r1) / 2 * x
+    density = sections["turns"] / ((z2 - z1) * (r2[:, 0] - r1[:, 0]))
+    n = (density[:, None] * (r2 - r1) / 2 * w).ravel()
+    a = a.ravel()
+    b = np.repeat((z2 - z1) / 2, nr)
+    zc = np.repeat((z1 + z2) / 2, nr)
+
+    coil = np.repeat(sections["coil"], nr)
+    ncoils = len(sections["names"])
+
+    # about 32 temporaries of nsheets doubles per point
+    chunk = max(1, int(max_memory // (32 * 8 * max(a.size, 1))))
+
+    Br = np.zeros((ncoils, r.size))
+    Bz = np.zeros((ncoils, r.size))
+    for i in range(0, r.size, chunk):
+        points = slice(i, i + chunk)
+        (br, bz) = sheet_field(
+            a[:, None], b[:, None], zc[:, None], n[:, None], r[points], z[points]
+        )
+        Br[:, points] = _coil_sum(br, coil, ncoils)
+        Bz[:, points] = _coil_sum(bz, coil, ncoils)
+    return Br, Bz
+
+
+def _currents(current, ncoils: int) -> np.ndarray:
+    """
+    return current as an array (ncoils,) or (nsets, ncoils)
+    """
+    current = np.asarray(current, dtype=float)
+    if current.ndim == 0:
+        current = np.full(ncoils, current)
+    return current
+
+
+def field(
+    obj,
+    r,
+    z,
+    current,
+    directory: Optional[str] = None,
+    nr: int = 8,
+    max_memory: int = 256 * 2**20,
+) -> tuple:
+    """
+    return (Br, Bz) in T created by obj at points (r, z) in mm
+
+    current: a scalar (same current in all coils), an array (one per coil,
+    see discretize names) or an array of current sets (nsets, ncoils)
+    result has the shape of r (with a leading nsets axis for current sets)
+    """
+    sections = discretize(obj, directory)
+    shape = np.shape(r)
+    (Br, Bz) = coil_fields(sections, r, z, nr, max_memory)
+
+    current = _currents(current, len(sections["names"]))
+    Br = current @ Br
+    Bz = current @ Bz
+    return Br.reshape(current.shape[:-1] + shape), Bz.reshape(current.shape[:-1] + shape)
+
+
+def axis_fields(sections: dict, z, derivative: bool = False) -> np.ndarray:
+    """
+    return Bz on axis per coil for a unit current: array (ncoils, npoints)
+
+    each section is a thick solenoid:
+    Bz = mu0 J / 2 (F(z - z1) - F(z - z2))
+    with F(x) = x ln((r2 + sqrt(r2^2 + x^2)) / (r1 + sqrt(r1^2 + x^2)))
+
+    derivative: return dBz/dz in T/m instead
+    z may be complex (see homogeneity)
+    """
+    z = np.ravel(np.asarray(z)) * 1.0e-3
+    r1 = sections["r1"][:, None] * 1.0e-3
+    r2 = sections["r2"][:, None] * 1.0e-3
+    z1 = sections["z1"][:, None] * 1.0e-3
+    z2 = sections["z2"][:, None] * 1.0e-3
+
+    def F(x):
+        h1 = np.sqrt(r1 * r1 + x * x)
+        h2 = np.sqrt(r2 * r2 + x * x)
+        value = np.log((r2 + h2) / (r1 + h1))
+        if derivative:
+            return value + x * x * (1 / (h2 * (r2 + h2)) - 1 / (h1 * (r1 + h1)))
+        return x * value
+
+    density = sections["turns"][:, None] / ((z2 - z1) * (r2 - r1))
+    bz = mu0 * density / 2 * (F(z - z1) - F(z - z2))
+    return _coil_sum(bz, sections["coil"], len(sections["names"]))
+
+
+def axis_field(obj, z, current, directory: Optional[str] = None) -> np.ndarray:
+    """
+    return Bz in T created by obj on axis at z in mm
+
+    current: see field
+    result has the shape of z (with a leading nsets axis for current sets)
+    """
+    sections = discretize(obj, directory)
+    current = _currents(current, len(sections["names"]))
+    Bz = current @ axis_fields(sections, z)
+    return Bz.reshape(current.shape[:-1] + np.shape(z))
+
+
+def _center(sections: dict, current: np.ndarray, npoints: int = 257) -> np.ndarray:
+    """
+    return the magnetic center (extremum of Bz on axis) per current set
+    """
+    zmin = sections["z1"].min()
+    zmax = sections["z2"].max()
+    z = np.linspace(zmin, zmax, npoints)
+    Bz = current @ axis_fields(sections, z)
+    i = np.argmax(np.abs(Bz), axis=1)
+    sign = np.sign(Bz[np.arange(i.size), i])
+
+    # bisection on dBz/dz around the sampled extremum
+    left = z[np.maximum(i - 1, 0)]
+    right = z[np.minimum(i + 1, npoints - 1)]
+    for _ in range(64):
+        middle = (left + right) / 2
+        gradient = np.sum(current * axis_fields(sections, middle, True).T, axis=1)
+        rising = sign * gradient > 0
+        left = np.where(rising, middle, left)
+        right = np.where(rising, right, middle)
+    return (left + right) / 2
+
+
+def homogeneity(
+    obj,
+    current,
+    radius: float = 10.0,
+    order: int = 8,
+    center=None,
+    directory: Optional[str] = None,
+    npoints: int = 64,
+) -> dict:
+    """
+    return the zonal expansion of Bz at the magnetic center of obj
+
+    on axis Bz(z) = sum_n B_n ((z - center) / radius)^n,
+    B_n being the zonal (Legendre) coefficients for the reference radius in mm.
+    center: z in mm (per current set), defaults to the extremum of Bz on axis
+
+    B_n are given by the Cauchy integral of Bz on the circle of the complex plane
+    |z - center| = radius (npoints trapezoidal rule), the series converging
+    as long as radius is smaller than the bore radius
+
+    returns a dict with (one value per current set)
+    center : mm
+    B0 : field at center in T
+    coefficients : B_n in T for n = 0..order
+    relative : B_n / B0
+    homogeneity : (max - min) / |B0| of Bz on axis within center -+ radius
+    """
+    sections = discretize(obj, directory)
+    if radius >= sections["r1"].min():
+        raise RuntimeError(
+            f"homogeneity: radius ({radius}) must be smaller than bore radius ({sections['r1'].min()})"
+        )
+    if order >= npoints:
+        raise RuntimeError(f"homogeneity: order ({order}) must be smaller than npoints ({npoints})")
+
+    current = _currents(current, len(sections["names"]))
+    sets = np.atleast_2d(current)
+    nsets = sets.shape[0]
+
+    if center is None:
+        center = _center(sections, sets)
+    center = np.broadcast_to(np.asarray(center, dtype=float), (nsets,))
+
+    circle = radius * np.exp(2j * np.pi * np.arange(npoints) / npoints)
+    unit = axis_fields(sections, center[:, None] + circle)
+    Bz = np.einsum("sc,csk->sk", sets, unit.reshape(-1, nsets, npoints))
+    coefficients = (np.fft.fft(Bz, axis=1) / npoints)[:, : order + 1].real
+
+    z = center[:, None] + radius * np.linspace(-1, 1, 201)
+    unit = axis_fields(sections, z).reshape(-1, nsets, z.shape[1])
+    samples = np.einsum("sc,csk->sk", sets, unit)
+
+    B0 = coefficients[:, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = {
+            "center": center,
+            "B0": B0,
+            "coefficients": coefficients,
+            "relative": coefficients / B0[:, None],
+            "homogeneity": np.ptp(samples, axis=1) / np.abs(B0),
+        }
+    if current.ndim == 1:
+        result = {key: value[0] for key, value in result.items()}
+    return result
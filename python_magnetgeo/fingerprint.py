@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+Provides content fingerprints of geometry objects
+
+* public attributes are hashed (sha256) in a canonical form:
+  numbers as floats (1 and 1.0 hash alike), dict keys sorted,
+* embedded objects and referenced parts (see registry.get_references)
+  contribute their own fingerprint, referenced files (eg. Supra.struct)
+  their content,
+* fingerprints are memoized on the instance: a memoized fingerprint is
+  dropped when an attribute is set (see Fingerprint) and is only reused
+  while the attributes compare equal to a snapshot taken when it was
+  computed (see snapshot), so in place changes (eg. obj.r[0] = 1) are seen
+  without hashing again,
+* referenced parts missing on disk contribute their name only
+"""
+
+from typing import Optional
+
+import os
+import json
+import hashlib
+import threading
+import contextvars
+
+import numpy as np
+
+from . import registry
+
+
+def _number(value) -> str:
+    value = float(value)
+    # -0.0 and 0.0 are the same geometry
+    return repr(value + 0.0)
+
+
+def canonical(
+    value, children: Optional[list] = None, directory: Optional[str] = None
+) -> str:
+    """
+    return value as a canonical string
+
+    children: if given, collects (object, fingerprint) of the embedded objects
+    """
+    if value is None:
+        return "null"
+    if isinstance(value, (bool, np.bool_)):
+        return "true" if value else "false"
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return _number(value)
+    if isinstance(value, str):
+        return json.dumps(value)
+    if isinstance(value, (list, tuple, np.ndarray)):
+        items = [canonical(item, children, directory) for item in value]
+        return "[" + ",".join(items) + "]"
+    if isinstance(value, dict):
+        items = [
+            f"{json.dumps(key)}:{canonical(item, children, directory)}"
+            for key, item in sorted((str(key), item) for key, item in value.items())
+        ]
+        return "{" + ",".join(items) + "}"
+    if isinstance(value, Fingerprint):
+        digest = value.fingerprint(directory)
+        if children is not None:
+            children.append((value, digest))
+        return f"<{digest}>"
+    if hasattr(value, "__dict__"):
+        return type(value).__name__ + canonical(_state(value), children, directory)
+    raise RuntimeError(f"fingerprint: unsupported type {type(value).__name__}")
+
+
+# items of lists copied as is in snapshots
+_plain = {str, int, float, bool, type(None)}
+
+
+def snapshot(value):
+    """
+    return a copy of value to be compared (==) with a later snapshot of value
+
+    embedded Fingerprint objects are kept as is (compared by identity):
+    their content is checked by their own memoized fingerprint
+    """
+    if isinstance(value, Fingerprint):
+        return value
+    if isinstance(value, (list, tuple)):
+        if _plain.issuperset(map(type, value)):
+            return (type(value), tuple(value))
+        return (type(value), tuple(snapshot(item) for item in value))
+    if isinstance(value, dict):
+        return {key: snapshot(item) for key, item in value.items()}
+    if isinstance(value, np.ndarray):
+        return (np.ndarray, value.dtype.str, value.shape, value.tobytes())
+    if hasattr(value, "__dict__"):
+        return (type(value), snapshot(_state(value)))
+    return value
+
+
+def _state(obj) -> dict:
+    return {
+        key: value for key, value in vars(obj).items() if not key.startswith("_")
+    }
+
+
+# referenced files: path -> (stamp, sha256)
+_files = {}
+_lock = threading.Lock()
+
+
+def file_digest(filename: str) -> str:
+    """
+    return sha256 of filename content, only read again when the file has changed
+    """
+    from .cache import file_hash
+
+    path = os.path.realpath(filename)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _lock:
+        entry = _files.get(path)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+
+    digest = file_hash(path)
+    with _lock:
+        _files[path] = (stamp, digest)
+    return digest
+
+
+def _dependencies(obj, directory: Optional[str]) -> tuple:
+    """
+    return the fingerprints of the parts and files referenced by obj
+
+    a part missing on disk contributes its name only
+    """
+    digests = []
+    for name in registry.get_references(obj):
+        try:
+            part = registry.get_part(obj, name, directory)
+        except FileNotFoundError:
+            digests.append(f"missing:{name}")
+            continue
+        digests.append(part.fingerprint(directory))
+    struct = getattr(obj, "struct", None)
+    if type(obj).__name__ == "Supra" and struct:
+        filename = struct if directory is None else os.path.join(directory, struct)
+        digests.append(file_digest(filename))
+    return tuple(digests)
+
+
+# set while fingerprints are revalidated (memoized ones are not used)
+_revalidate = contextvars.ContextVar("revalidate", default=False)
+
+
+def fingerprint(
+    obj, directory: Optional[str] = None, revalidate: bool = False
+) -> str:
+    """
+    return the sha256 of obj content, including the parts it references
+    (looked up in directory)
+
+    revalidate: compute again the fingerprints of obj, of its embedded objects
+    and of its parts, memoized ones being ignored
+    """
+    if revalidate and not _revalidate.get():
+        token = _revalidate.set(True)
+        try:
+            return fingerprint(obj, directory)
+        finally:
+            _revalidate.reset(token)
+
+    dependencies = _dependencies(obj, directory)
+    state = _state(obj)
+    content = snapshot(state)
+    memo = obj.__dict__.setdefault("_fingerprint", {})
+    entry = memo.get(directory)
+    if (
+        entry is not None
+        and not _revalidate.get()
+        and entry[0] == dependencies
+        and entry[1] == content
+    ):
+        if all(child.fingerprint(directory) == digest for child, digest in entry[2]):
+            return entry[3]
+
+    children = []
+    h = hashlib.sha256(type(obj).__name__.encode())
+    h.update(canonical(state, children, directory).encode())
+    for digest in dependencies:
+        h.update(digest.encode())
+    digest = h.hexdigest()
+    memo[directory] = (dependencies, content, children, digest)
+    return digest
+
+
+class Fingerprint:
+    """
+    mixin providing fingerprint() to geometry classes
+
+    the memoized fingerprint is dropped whenever an attribute is set
+    and is never dumped nor pickled
+    """
+
+    def __setattr__(self, name, value):
+        self.__dict__.pop("_fingerprint", None)
+        super().__setattr__(name, value)
+
+    def __getstate__(self):
+        """
+        return object state without memoized fingerprint
+        """
+        return {k: v for k, v in self.__dict__.items() if k != "_fingerprint"}
+
+    def fingerprint(
+        self, directory: Optional[str] = None, revalidate: bool = False
+    ) -> str:
+        """
+        return the sha256 of the object content (see fingerprint module)
+        """
+        return fingerprint(self, directory, revalidate)
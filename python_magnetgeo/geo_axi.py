@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+Provides the .geo text of the axisymmetric model of an Insert (see Insert.Create_AxiGeo)
+
+* the text is assembled from one fragment per helix and per ring
+  and written at once,
+* fragments number their entities from 0: they are rendered with the
+  offsets of the entities written before them (see Fragment),
+* fragments are memoized per part content in fragments (see memo):
+  changing a helix only regenerates its own fragment
+"""
+
+from typing import Optional
+
+import datetime
+import functools
+
+import numpy as np
+
+from . import memo
+from . import registry
+
+# entity kinds
+POINT, LINE, LOOP, SURFACE = range(4)
+
+# memoized fragments of helices and rings
+fragments = memo.Memo()
+
+# Define Parameters
+onelab_r0 = 'DefineConstant[ r0_H%d = {%g, Name "Geom/H%d/Rint"} ];\n'  # should add a min and a max
+onelab_r1 = 'DefineConstant[ r1_H%d = {%g, Name "Geom/H%d/Rext"} ];\n'
+onelab_z0 = 'DefineConstant[ z0_H%d = {%g, Name "Geom/H%d/Zinf"} ];\n'  #  should add a min and a max
+onelab_z1 = 'DefineConstant[ z1_H%d = {%g, Name "Geom/H%d/Zsup"} ];\n'
+onelab_lc = 'DefineConstant[ lc_H%d = {%g, Name "Geom/H%d/lc"} ];\n'
+onelab_z_R = 'DefineConstant[ dz_R%d = {%g, Name "Geom/R%d/dz"} ];\n'
+onelab_lc_R = 'DefineConstant[ lc_R%d = {%g, Name "Geom/R%d/lc"} ];\n'
+onelab_r_air = 'DefineConstant[ r_Air = {%g, Name "Geom/Air/factor_R"} ];\n'
+onelab_z_air = 'DefineConstant[ z_Air = {%g, Name "Geom/Air/factor_Z"} ];\n'  #  should add a min and a max
+onelab_lc_air = 'DefineConstant[ lc_Air = {%g, Name "Geom/Air/lc"} ];\n'
+onelab_rint_infty = 'DefineConstant[ Val_Rint = {%g, Name "Geom/Infty/Val_Rint"} ];\n'
+onelab_rext_infty = 'DefineConstant[ Val_Rext = {%g, Name "Geom/Infty/Val_Rext"} ];\n'
+onelab_lc_infty = 'DefineConstant[ lc_infty = {%g, Name "Geom/Infty/lc_inft"} ];\n'
+
+
+class Fragment:
+    """
+    .geo text whose entity ids are relative to the fragment
+
+    counts: number of entities of each kind (POINT, LINE, LOOP, SURFACE)
+    refs: named lists of (kind, id) (eg. surfaces of a helix)
+
+    the text is kept as a single template, ids being given at once by render
+    """
+
+    def __init__(self) -> None:
+        """
+        initialize object
+        """
+        self.counts = [0, 0, 0, 0]
+        self.refs = {}
+        self._parts = []
+        self._kinds = []
+        self._ids = []
+
+    def new(self, kind: int, n: int = 1) -> int:
+        """
+        reserve n entities of kind, return the first one
+        """
+        first = self.counts[kind]
+        self.counts[kind] += n
+        return first
+
+    def ref(self, name: str, kind: int, id: int) -> None:
+        self.refs.setdefault(name, []).append((kind, id))
+
+    def text(self, text: str) -> None:
+        """
+        append text without entity ids
+        """
+        self._parts.append(text.replace("%", "%%"))
+
+    def add(self, template: str, *ids: tuple) -> None:
+        """
+        append template, its %d being replaced by ids (kind, id)
+        """
+        self._parts.append(template)
+        for kind, id in ids:
+            self._kinds.append(kind)
+            self._ids.append(id)
+
+    def point(self, p: int, r: str, z: str, lc: str) -> None:
+        self.add("Point(%%d)= {%s,%s, 0.0, %s};\n" % (r, z, lc), (POINT, p))
+
+    def line(self, l: int, p0: int, p1: int) -> None:
+        self.add("Line(%d)= {%d, %d};\n", (LINE, l), (POINT, p0), (POINT, p1))
+
+    def circle(self, l: int, p0: int, center: int, p1: int) -> None:
+        self.add(
+            "Circle(%d)= {%d, %d, %d};\n",
+            (LINE, l),
+            (POINT, p0),
+            (POINT, center),
+            (POINT, p1),
+        )
+
+    def loop(self, ll: int, lines: list[int]) -> None:
+        self.add(
+            "Line Loop(%d)= {" + ", ".join(["%d"] * len(lines)) + "};\n",
+            (LOOP, ll),
+            *[(LINE, l) for l in lines],
+        )
+
+    def surface(self, s: int, ll: int) -> None:
+        self.add("Plane Surface(%d)= {%d};\n", (SURFACE, s), (LOOP, ll))
+        self.add("Physical Surface(%d) = {%d};\n", (SURFACE, s), (SURFACE, s))
+
+    def freeze(self) -> "Fragment":
+        """
+        compile the template, no more text can be added
+        """
+        self.template = "".join(self._parts)
+        self.kinds = np.array(self._kinds, dtype=int)
+        self.ids = np.array(self._ids, dtype=int)
+        del self._parts, self._kinds, self._ids
+        return self
+
+    def render(self, offsets: np.ndarray) -> str:
+        """
+        return the text, ids of each kind being shifted by offsets
+        """
+        return self.template % tuple((self.ids + offsets[self.kinds]).tolist())
+
+    def get(self, name: str, offsets: np.ndarray) -> list[int]:
+        """
+        return the ids of refs[name] shifted by offsets
+        """
+        return [int(offsets[kind] + id) for (kind, id) in self.refs.get(name, [])]
+
+
+def _rectangle(frag: Fragment, h: int, r0: str, r1: str, z0: str, z1: str) -> tuple:
+    """
+    add rectangle [r0, r1] x [z0, z1] of helix h, return its first line and surface
+    """
+    point = frag.new(POINT, 4)
+    line = frag.new(LINE, 4)
+    lineloop = frag.new(LOOP)
+    planesurf = frag.new(SURFACE)
+
+    frag.point(point, r0, z0, f"lc_H{h}")
+    frag.point(point + 1, r1, z0, f"lc_H{h}")
+    frag.point(point + 2, r1, z1, f"lc_H{h}")
+    frag.point(point + 3, r0, z1, f"lc_H{h}")
+    for k in range(4):
+        frag.line(line + k, point + k, point + (k + 1) % 4)
+    frag.loop(lineloop, [line + k for k in range(4)])
+    frag.surface(planesurf, lineloop)
+
+    frag.ref("H", SURFACE, planesurf)
+    frag.ref("dH", LOOP, lineloop)
+    frag.ref("Rint", LINE, line + 3)
+    frag.ref("Rext", LINE, line + 1)
+    return (line, planesurf)
+
+
+def helix_fragment(helix, i: int) -> Fragment:
+    """
+    return the fragment of helix, the i-th helix of the Insert
+
+    refs: H (surfaces), dH (line loops), Rint, Rext (channel lines),
+    BP and HP (bottom and top lines)
+    """
+    h = i + 1
+    frag = Fragment()
+    frag.text(f"// H{h} : {helix.name}\n")
+    frag.text(onelab_r0 % (h, helix.r[0], h))
+    frag.text(onelab_r1 % (h, helix.r[1], h))
+    frag.text(onelab_z0 % (h, helix.z[0], h))
+    frag.text(onelab_z1 % (h, helix.z[1], h))
+    frag.text(onelab_lc % (h, (helix.r[1] - helix.r[0]) / 5.0, h))
+
+    axi = helix.modelaxi  # h, turns, pitch
+    (r0, r1) = (f"r0_H{h}", f"r1_H{h}")
+
+    (line, _) = _rectangle(frag, h, r0, r1, f"z0_H{h}", "%g" % -axi.h)
+    frag.ref("BP", LINE, line)
+
+    dz = 2 * axi.h / float(axi.get_Nsections())
+    z = -axi.h
+    for n in range(axi.get_Nsections()):
+        _rectangle(frag, h, r0, r1, "%g" % z, "%g" % (z + dz))
+        z += dz
+
+    (line, _) = _rectangle(frag, h, r0, r1, "%g" % axi.h, f"z1_H{h}")
+    frag.ref("HP", LINE, line + 2)
+    frag.text("\n")
+    return frag.freeze()
+
+
+def ring_fragment(ring, i: int) -> Fragment:
+    """
+    return the fragment of ring, the i-th ring of the Insert (between helices i and i+1)
+
+    refs: R (surface), dR (line loop), Rint (line of helix i channel 0),
+    Rext (line of helix i+1 channel 1), HP or BP (free side lines)
+    """
+    (H0, H1) = (i + 1, i + 2)
+    frag = Fragment()
+    frag.text("// R%d [%d, H%d] : %s\n" % (i + 1, H0, H1, ring.name))
+    frag.text(onelab_z_R % (i + 1, (ring.z[1] - ring.z[0]), i + 1))
+    frag.text(onelab_lc_R % (i + 1, (ring.r[3] - ring.r[0]) / 5.0, i + 1))
+
+    if ring.BPside:
+        (lo0, lo1) = (f"z1_H{H0}", f"z1_H{H1}")
+        (hi0, hi1) = (f"z1_H{H0}+dz_R{i+1}", f"z1_H{H1}+dz_R{i+1}")
+    else:
+        (lo0, lo1) = (f"z0_H{H0}-dz_R{i+1}", f"z0_H{H1}-dz_R{i+1}")
+        (hi0, hi1) = (f"z0_H{H0}", f"z0_H{H1}")
+
+    point = frag.new(POINT, 8)
+    line = frag.new(LINE, 8)
+    lineloop = frag.new(LOOP)
+    planesurf = frag.new(SURFACE)
+
+    lc = f"lc_H{i+1}"
+    frag.point(point, f"r0_H{H0}", lo0, lc)
+    frag.point(point + 1, f"r1_H{H0}", lo0, lc)
+    frag.point(point + 2, f"r0_H{H1}", lo1, lc)
+    frag.point(point + 3, f"r1_H{H1}", lo1, lc)
+    frag.point(point + 4, f"r1_H{H1}", hi1, lc)
+    frag.point(point + 5, f"r0_H{H1}", hi1, lc)
+    frag.point(point + 6, f"r1_H{H0}", hi0, lc)
+    frag.point(point + 7, f"r0_H{H0}", hi0, lc)
+    for k in range(8):
+        frag.line(line + k, point + k, point + (k + 1) % 8)
+
+    side = "HP" if ring.BPside else "BP"
+    for k in (4, 5, 6):
+        frag.ref(side, LINE, line + k)
+
+    frag.loop(lineloop, [line + k for k in range(8)])
+    frag.surface(planesurf, lineloop)
+
+    frag.ref("R", SURFACE, planesurf)
+    frag.ref("dR", LOOP, lineloop)
+    frag.ref("Rint", LINE, line + 7)
+    frag.ref("Rext", LINE, line + 3)
+    return frag.freeze()
+
+
+def _physical_line(name: str, ids: list[int], sep: str = " ") -> str:
+    return f'Physical Line("{name}") ={sep}{{' + ",".join(map(str, ids)) + "};\n"
+
+
+def _air(Hn: int, holes: list[int]) -> Fragment:
+    """
+    return the fragment of Air and Infty around Hn helices,
+    holes: line loops of helices and rings
+
+    refs: Air (surfaces), Axis and Infty (lines)
+    """
+    frag = Fragment()
+    frag.text("// Define Air\n")
+    frag.text(onelab_r_air % (1.2))
+    frag.text(onelab_z_air % (1.2))
+    frag.text(onelab_lc_air % (2))
+
+    point = frag.new(POINT, 4)
+    line = frag.new(LINE, 4)
+    lineloop = frag.new(LOOP)
+    planesurf = frag.new(SURFACE)
+
+    frag.point(point, "0", "z_Air * z0_H1", "lc_H1")
+    frag.point(point + 1, f"r_Air * r1_H{Hn}", "z_Air * z0_H1", "lc_H1")
+    frag.point(point + 2, f"r_Air * r1_H{Hn}", f"z_Air * z1_H{Hn}", f"lc_H{Hn}")
+    frag.point(point + 3, "0", f"z_Air * z1_H{Hn}", f"lc_H{Hn}")
+    for k in range(4):
+        frag.line(line + k, point + k, point + (k + 1) % 4)
+    frag.ref("Axis", LINE, line + 3)
+
+    frag.loop(lineloop, [line + k for k in range(4)])
+    frag.add(
+        "Plane Surface(%%d)= {%%d, %s};\n" % ", ".join(f"{-id}" for id in holes),
+        (SURFACE, planesurf),
+        (LOOP, lineloop),
+    )
+    frag.add("Physical Surface(%d) = {%d};\n", (SURFACE, planesurf), (SURFACE, planesurf))
+    frag.ref("Air", SURFACE, planesurf)
+
+    # Define Infty
+    frag.text("// Define Infty\n")
+    frag.text(onelab_rint_infty % (4))
+    frag.text(onelab_rext_infty % (5))
+    frag.text(onelab_lc_infty % (100))
+
+    center = frag.new(POINT)
+    frag.point(center, "0", "0", "lc_Air")
+
+    (axis_HP, axis_BP, Air_line, Air_lines) = (point, point + 3, line, 3)
+    for radius in ("Val_Rint", "Val_Rext"):
+        point = frag.new(POINT, 3)
+        line = frag.new(LINE, 4)
+        lineloop = frag.new(LOOP)
+        planesurf = frag.new(SURFACE)
+
+        frag.point(point, "0", f"-{radius} * r1_H{Hn}", "lc_infty")
+        frag.point(point + 1, f"{radius} * r1_H{Hn}", "0", "lc_infty")
+        frag.point(point + 2, "0", f"{radius} * r1_H{Hn}", "lc_infty")
+
+        frag.circle(line, point, center, point + 1)
+        frag.circle(line + 1, point + 1, center, point + 2)
+        frag.line(line + 2, point + 2, axis_BP)
+        frag.line(line + 3, axis_HP, point)
+        frag.ref("Axis", LINE, line + 2)
+        frag.ref("Axis", LINE, line + 3)
+
+        # outer boundary of the previous domain, reversed
+        previous = [(LINE, Air_line + k) for k in reversed(range(Air_lines))]
+        frag.add(
+            "Line Loop(%d) = {%d, %d, %d, " + "-%d, " * Air_lines + "%d};\n",
+            (LOOP, lineloop),
+            (LINE, line),
+            (LINE, line + 1),
+            (LINE, line + 2),
+            *previous,
+            (LINE, line + 3),
+        )
+        frag.add("Plane Surface(%d)= {%d};\n", (SURFACE, planesurf), (LOOP, lineloop))
+        frag.add("Physical Surface(%d) = {%d};\n", (SURFACE, planesurf), (SURFACE, planesurf))
+        frag.ref("Air", SURFACE, planesurf)
+
+        (axis_HP, axis_BP, Air_line, Air_lines) = (point, point + 2, line, 2)
+
+    for k in (0, 1):
+        frag.ref("Infty", LINE, Air_line + k)
+    return frag.freeze()
+
+
+def create_geo(insert, AirData, directory: Optional[str] = None) -> tuple:
+    """
+    write the .geo file of insert (insert.name + "_axi.geo")
+
+    return
+    H_ids, R_ids, BC_ids, Air_ids, BC_Air_ids (see Insert.Create_AxiGeo)
+    """
+    import getpass
+
+    UserName = getpass.getuser()
+
+    helices = [registry.get_part(insert, name, directory) for name in insert.Helices]
+    rings = [registry.get_part(insert, name, directory) for name in insert.Rings]
+
+    # Preambule
+    parts = [
+        f"//{insert.name}\n",
+        "// AxiSymetrical Geometry Model\n",
+        f"//{UserName}\n",
+        f"//{datetime.datetime.now().strftime('%y-%m-%d %Hh%M')}\n",
+        "\n",
+        # Mesh Preambule
+        "// Mesh Preambule\n",
+        "Mesh.Algorithm=3;\n",
+        "Mesh.RecombinationAlgorithm=0; // Deactivate Blossom support\n",
+        "Mesh.RemeshAlgorithm=1; //(0=no split, 1=automatic, 2=automatic only with metis)\n",
+        "Mesh.RemeshParametrization=0; //\n\n",
+        # Define Parameters
+        "//Geometric Parameters\n",
+    ]
+
+    offsets = np.ones(4, dtype=int)
+
+    def _render(frag: Fragment) -> np.ndarray:
+        # return offsets of frag entities, update offsets
+        nonlocal offsets
+        parts.append(frag.render(offsets))
+        (start, offsets) = (offsets, offsets + frag.counts)
+        return start
+
+    H_ids = []  # gsmh ids for Helix
+    Rint_ids = []
+    Rext_ids = []
+    BP_ids = []
+    HP_ids = []
+    holes = []
+    for i, helix in enumerate(helices):
+        frag = fragments.memoize(
+            helix,
+            functools.partial(helix_fragment, helix, i),
+            directory,
+            key=(i,),
+        )
+        start = _render(frag)
+        H_ids.append(frag.get("H", start))
+        Rint_ids.append(frag.get("Rint", start))
+        Rext_ids.append(frag.get("Rext", start))
+        BP_ids += frag.get("BP", start)
+        HP_ids += frag.get("HP", start)
+        holes += frag.get("dH", start)
+
+    # Add Rings
+    Ring_ids = []
+    HP_Ring_ids = []
+    BP_Ring_ids = []
+    for i, ring in enumerate(rings):
+        frag = fragments.memoize(
+            ring,
+            functools.partial(ring_fragment, ring, i),
+            directory,
+            key=(i,),
+        )
+        start = _render(frag)
+        Ring_ids += frag.get("R", start)
+        Rint_ids[i] += frag.get("Rint", start)
+        Rext_ids[i + 1] += frag.get("Rext", start)
+        if ring.BPside:
+            HP_Ring_ids.append(frag.get("HP", start))
+        else:
+            BP_Ring_ids.append(frag.get("BP", start))
+        holes += frag.get("dR", start)
+
+    # create physical lines
+    BC_ids = {}
+    for i, r_ids in enumerate(Rint_ids):
+        BC_ids[f"H{i+1}Channel0"] = r_ids
+    for i, r_ids in enumerate(Rext_ids):
+        BC_ids[f"H{i+1}Channel1"] = r_ids
+    BC_ids["HP_H0"] = [HP_ids[0]]
+    if len(helices) % 2 == 0:
+        BC_ids[f"HP_H{len(helices)}"] = [HP_ids[-1]]
+    else:
+        BC_ids[f"BP_H{len(helices)}"] = [BP_ids[-1]]
+    parts += [_physical_line(name, ids) for name, ids in BC_ids.items()]
+
+    for i, _ids in enumerate(HP_Ring_ids):
+        BC_ids[f"HP_R{i+1}"] = _ids
+        parts.append(_physical_line(f"HP_R{i+1}", _ids, "  "))
+    for i, _ids in enumerate(BP_Ring_ids):
+        BC_ids[f"BP_R{i+1}"] = _ids
+        parts.append(_physical_line(f"BP_R{i+1}", _ids, "  "))
+
+    # Air
+    Air_ids = []
+    BC_Air_ids = {}
+    if AirData:
+        frag = _air(len(helices), holes)
+        start = _render(frag)
+        Air_ids = frag.get("Air", start)
+        BC_Air_ids = {name: frag.get(name, start) for name in ("Axis", "Infty")}
+        parts += [_physical_line(name, ids, "  ") for name, ids in BC_Air_ids.items()]
+
+    # coherence
+    parts.append("\nCoherence;\n")
+
+    with open(f"{insert.name}_axi.geo", "w") as geofile:
+        geofile.write("".join(parts))
+
+    return (H_ids, Ring_ids, BC_ids, Air_ids, BC_Air_ids)
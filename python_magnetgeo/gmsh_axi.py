@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+Provides the axisymmetric model of an Insert built with the gmsh python API
+
+* same model as Insert.Create_AxiGeo without the .geo text round-trip:
+  helices split into ModelAxi sections, rings, optionally Air and Infty,
+* surfaces are made conformal by the OpenCASCADE kernel (fragment),
+* physical surfaces are named after get_names markers,
+  physical lines after Create_AxiGeo ones
+
+gmsh is an optional dependency, only imported when a model is built
+"""
+
+from typing import Optional
+
+from . import registry
+
+# Air box (factors of the Insert dimensions) and Infty half disks
+# (factors of the outer radius or of the height if larger, so that
+# they enclose the Air box), see Create_AxiGeo
+air = {"r": 1.2, "z": 1.2, "lc": 2.0}
+infty = {"rint": 4.0, "rext": 5.0, "lc": 100.0}
+
+# tolerance on coordinates to look for curves (mm)
+eps = 1.0e-6
+
+
+def _polygon(occ, points: list[tuple]) -> int:
+    """
+    add a plane surface bounded by points (r, z)
+    """
+    tags = [occ.addPoint(r, z, 0) for (r, z) in points]
+    lines = [occ.addLine(a, b) for a, b in zip(tags, tags[1:] + tags[:1])]
+    return occ.addPlaneSurface([occ.addCurveLoop(lines)])
+
+
+def _half_disk(occ, radius: float) -> int:
+    """
+    add the half disk r >= 0 of radius
+    """
+    disk = occ.addDisk(0, 0, 0, radius, radius)
+    box = occ.addRectangle(0, -radius, 0, radius, 2 * radius)
+    (out, _) = occ.intersect([(2, disk)], [(2, box)])
+    return out[0][1]
+
+
+def _curves(model, rmin: float, zmin: float, rmax: float, zmax: float) -> list[int]:
+    """
+    return the curves lying in the box [rmin, rmax] x [zmin, zmax]
+    """
+    entities = model.getEntitiesInBoundingBox(
+        rmin - eps, zmin - eps, -eps, rmax + eps, zmax + eps, eps, 1
+    )
+    return sorted(tag for (_, tag) in entities)
+
+
+def _boundary(model, surfaces: list[int]) -> set:
+    return {
+        abs(tag)
+        for (_, tag) in model.getBoundary(
+            [(2, s) for s in surfaces], combined=False, oriented=False
+        )
+    }
+
+
+def create_model(insert, AirData=None, directory: Optional[str] = None) -> tuple:
+    """
+    add the axisymmetric model of insert to gmsh (gmsh must be initialized)
+
+    return
+    H_ids, R_ids, BC_ids, Air_ids, BC_Air_ids
+    as in Insert.Create_AxiGeo, with gmsh tags of surfaces and curves
+    """
+    import gmsh
+
+    model = gmsh.model
+    occ = model.occ
+    model.add(f"{insert.name}_axi")
+
+    helices = [registry.get_part(insert, name, directory) for name in insert.Helices]
+    rings = [registry.get_part(insert, name, directory) for name in insert.Rings]
+
+    # helices: HP, ModelAxi sections and BP
+    surfaces = []
+    for helix in helices:
+        (r0, r1) = helix.r
+        axi = helix.modelaxi
+        dz = 2 * axi.h / float(axi.get_Nsections())
+        zb = (
+            [helix.z[0]]
+            + [-axi.h + n * dz for n in range(axi.get_Nsections())]
+            + [axi.h, helix.z[1]]
+        )
+        surfaces.append(
+            [occ.addRectangle(r0, z0, 0, r1 - r0, z1 - z0) for z0, z1 in zip(zb, zb[1:])]
+        )
+
+    # rings between helices H0 and H1, on BP or HP side
+    ring_surfaces = []
+    ring_sides = []
+    for i, ring in enumerate(rings):
+        (H0, H1) = (helices[i], helices[i + 1])
+        dz = ring.z[1] - ring.z[0]
+        if ring.BPside:
+            (z0, z1) = (H0.z[1], H1.z[1])
+            sides = ((z0, z1), (z0 + dz, z1 + dz))
+        else:
+            (z0, z1) = (H0.z[0], H1.z[0])
+            sides = ((z0 - dz, z1 - dz), (z0, z1))
+        ((lo0, lo1), (hi0, hi1)) = sides
+        ring_surfaces.append(
+            _polygon(
+                occ,
+                [
+                    (H0.r[0], lo0),
+                    (H0.r[1], lo0),
+                    (H1.r[0], lo1),
+                    (H1.r[1], lo1),
+                    (H1.r[1], hi1),
+                    (H1.r[0], hi1),
+                    (H0.r[1], hi0),
+                    (H0.r[0], hi0),
+                ],
+            )
+        )
+        # free side of the ring
+        ring_sides.append(sides[1] if ring.BPside else sides[0])
+
+    conductors = [(2, s) for tags in surfaces for s in tags] + [
+        (2, s) for s in ring_surfaces
+    ]
+
+    # air box and infty half disks overlap: keep what each adds to the previous one
+    boxes = []
+    if AirData:
+        zair = (air["z"] * helices[0].z[0], air["z"] * helices[-1].z[1])
+        rair = air["r"] * helices[-1].r[1]
+        scale = max(helices[-1].r[1], abs(helices[0].z[0]), abs(helices[-1].z[1]))
+        boxes = [
+            occ.addRectangle(0, zair[0], 0, rair, zair[1] - zair[0]),
+            _half_disk(occ, infty["rint"] * scale),
+            _half_disk(occ, infty["rext"] * scale),
+        ]
+
+    # conformal surfaces
+    (_, pieces) = occ.fragment(conductors, [(2, s) for s in boxes])
+    occ.synchronize()
+    pieces = [[tag for (_, tag) in piece] for piece in pieces]
+
+    # conductors do not overlap: one piece each
+    n = 0
+    H_ids = []
+    for tags in surfaces:
+        H_ids.append([pieces[n + k][0] for k in range(len(tags))])
+        n += len(tags)
+    R_ids = [pieces[n + k][0] for k in range(len(rings))]
+    n += len(rings)
+
+    # Air, Infty1 and Infty2 pieces
+    domains = {}
+    if AirData:
+        (box, inner, outer) = (set(pieces[n]), set(pieces[n + 1]), set(pieces[n + 2]))
+        solids = {s for tags in H_ids for s in tags} | set(R_ids)
+        domains = {
+            "Air": sorted(box - solids),
+            "Infty1": sorted(inner - box),
+            "Infty2": sorted(outer - inner),
+        }
+    Air_ids = [tag for tags in domains.values() for tag in tags]
+
+    # physical surfaces
+    for i, helix in enumerate(helices):
+        names = helix.get_names(f"H{i+1}", is2D=True)
+        for name, tag in zip(names, H_ids[i]):
+            model.addPhysicalGroup(2, [tag], name=name)
+    for i, tag in enumerate(R_ids):
+        model.addPhysicalGroup(2, [tag], name=f"R{i+1}")
+    for name, tags in domains.items():
+        model.addPhysicalGroup(2, tags, name=name)
+
+    # physical lines
+    BC_ids = {}
+    for i, helix in enumerate(helices):
+        # channels along helix and rings
+        (zmin, zmax) = helix.z
+        for ring in rings:
+            zmin = min(zmin, helix.z[0] - (ring.z[1] - ring.z[0]))
+            zmax = max(zmax, helix.z[1] + (ring.z[1] - ring.z[0]))
+        for j, r in enumerate(helix.r):
+            BC_ids[f"H{i+1}Channel{j}"] = _curves(model, r, zmin, r, zmax)
+
+    (r0, r1) = helices[0].r
+    BC_ids["HP_H0"] = _curves(model, r0, helices[0].z[1], r1, helices[0].z[1])
+    (r0, r1) = helices[-1].r
+    if len(helices) % 2 == 0:
+        BC_ids[f"HP_H{len(helices)}"] = _curves(
+            model, r0, helices[-1].z[1], r1, helices[-1].z[1]
+        )
+    else:
+        BC_ids[f"BP_H{len(helices)}"] = _curves(
+            model, r0, helices[-1].z[0], r1, helices[-1].z[0]
+        )
+
+    sides = {"HP": 0, "BP": 0}
+    for i, ring in enumerate(rings):
+        side = "HP" if ring.BPside else "BP"
+        sides[side] += 1
+        (z0, z1) = ring_sides[i]
+        BC_ids[f"{side}_R{sides[side]}"] = _curves(
+            model,
+            helices[i].r[0],
+            min(z0, z1),
+            helices[i + 1].r[1],
+            max(z0, z1),
+        )
+
+    BC_Air_ids = {}
+    if AirData:
+        rext = infty["rext"] * scale
+        axis = _curves(model, 0, -rext, 0, rext)
+        outer = _boundary(model, domains["Infty2"]) - _boundary(model, domains["Infty1"])
+        BC_Air_ids = {"Axis": axis, "Infty": sorted(outer - set(axis))}
+
+    for name, tags in list(BC_ids.items()) + list(BC_Air_ids.items()):
+        model.addPhysicalGroup(1, tags, name=name)
+
+    # mesh sizes: Infty, Air then conductors (later ones prevail)
+    def _size(surfaces: list[int], lc: float) -> None:
+        points = model.getBoundary(
+            [(2, s) for s in surfaces], combined=False, oriented=False, recursive=True
+        )
+        model.mesh.setSize(points, lc)
+
+    if AirData:
+        _size(domains["Infty1"] + domains["Infty2"], infty["lc"])
+        _size(domains["Air"], air["lc"])
+    for i, helix in enumerate(helices):
+        lc = (helix.r[1] - helix.r[0]) / 5.0
+        _size(H_ids[i], lc)
+        if i < len(R_ids):
+            _size([R_ids[i]], lc)
+
+    # Mesh.Remesh* options of Create_AxiGeo are gone from gmsh 4
+    gmsh.option.setNumber("Mesh.Algorithm", 3)
+    gmsh.option.setNumber("Mesh.RecombinationAlgorithm", 0)
+
+    return (H_ids, R_ids, BC_ids, Air_ids, BC_Air_ids)
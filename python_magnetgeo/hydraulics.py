@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+Provides hydraulic parameters of cooling channels
+
+* HydraulicParams: per channel arrays returned by Insert.get_params and Bitter.get_params
+* results are memoized per geometry in params: they are only computed
+  again when the content of the object or of one of its parts has changed
+  (see memo)
+* estimate_Tw: coolant temperature along the channels of an Insert
+  for a batch of operating points
+"""
+
+from typing import Optional
+
+import numpy as np
+
+from . import memo
+from . import registry
+
+
+def _readonly(values) -> np.ndarray:
+    array = np.array(values, dtype=float)
+    array.setflags(write=False)
+    return array
+
+
+class HydraulicParams:
+    """
+    Dh : hydraulic diameter per channel
+    Sh : cross section per channel
+    Zh : z discretization per channel (list of arrays)
+    filling_factor : per channel
+    params : geometry specific values (eg. NHelices, R1 for Insert, nslits for Bitter)
+
+    arrays are shared (see memo) hence read-only.
+    Unpacking, indexing and len behave as the former tuple of lists (see astuple).
+    """
+
+    def __init__(
+        self,
+        Dh: list[float],
+        Sh: list[float],
+        Zh: list[list[float]],
+        filling_factor: Optional[list[float]] = None,
+        legacy: tuple = (),
+        **params,
+    ) -> None:
+        """
+        initialize object
+
+        legacy: names of the values of the former tuple (see astuple)
+        """
+        self.Dh = _readonly(Dh)
+        self.Sh = _readonly(Sh)
+        self.Zh = [_readonly(z) for z in Zh]
+        if filling_factor is None:
+            filling_factor = [1] * len(Dh)
+        self.filling_factor = _readonly(filling_factor)
+        self.params = params
+        self.legacy = legacy
+
+    @property
+    def nchannels(self) -> int:
+        return len(self.Dh)
+
+    def __getattr__(self, name: str):
+        # geometry specific values
+        params = self.__dict__.get("params", {})
+        if name in params:
+            return params[name]
+        raise AttributeError(name)
+
+    def __repr__(self):
+        """
+        representation of object
+        """
+        return "%s(nchannels=%r, Dh=%r, Sh=%r, params=%r)" % (
+            self.__class__.__name__,
+            self.nchannels,
+            self.Dh,
+            self.Sh,
+            self.params,
+        )
+
+    def astuple(self) -> tuple:
+        """
+        return the former tuple of lists
+
+        "Zc" stands for the list of Zh per channel,
+        "Zh" for Zh of the first channel (shared by all channels of a Bitter)
+        """
+        values = []
+        for name in self.legacy:
+            if name == "Zc":
+                values.append([z.tolist() for z in self.Zh])
+            elif name == "Zh":
+                values.append(self.Zh[0].tolist())
+            elif name in ("Dh", "Sh", "filling_factor"):
+                values.append(getattr(self, name).tolist())
+            else:
+                value = self.params[name]
+                values.append(list(value) if isinstance(value, list) else value)
+        return tuple(values)
+
+    def __iter__(self):
+        return iter(self.astuple())
+
+    def __getitem__(self, index):
+        return self.astuple()[index]
+
+    def __len__(self) -> int:
+        return len(self.legacy)
+
+
+# memoized HydraulicParams (see Insert.get_params, Bitter.get_params)
+params = memo.Memo()
+
+
+#
+# Tw(z) estimate
+#
+
+# constant coolant properties (water around 20 C, SI units)
+water = {"rho": 1000.0, "cp": 4180.0, "k": 0.6, "mu": 1.0e-3}
+
+# default resistivity of helices (CuCrZr) in Ohm.m
+rho_helix = 2.1e-8
+
+
+def joule_power(helix, rho: float = rho_helix) -> tuple:
+    """
+    return (zb, power) for a unit current:
+    zb section boundaries in mm, power dissipated in each section in W/A^2
+
+    each turn of a section is a ring of height pitch - cutwidth
+    carrying an azimuthal current: R_turn = 2*pi*rho / ((pitch - cutwidth) * log(r2/r1))
+    """
+    modelaxi = helix.modelaxi
+    (r1, r2) = helix.r
+    height = (modelaxi.get_pitch() - helix.cutwidth) * 1.0e-3
+    resistance = modelaxi.get_turns() * 2 * np.pi * rho / (height * np.log(r2 / r1))
+    return modelaxi.z_boundaries(), resistance
+
+
+def _as_batch(value) -> np.ndarray:
+    return np.atleast_1d(np.asarray(value, dtype=float))
+
+
+def estimate_Tw(
+    insert,
+    current,
+    flow,
+    tin,
+    workingDir: str = ".",
+    rho: float = rho_helix,
+    coolant: dict = water,
+) -> list[dict]:
+    """
+    estimate coolant temperature along every cooling channel of an Insert
+
+    current: current in A (same in all helices)
+    flow: total flow rate in m^3/s, shared by channels at same mean velocity
+    tin: inlet temperature (coolant flows upward)
+    current, flow and tin may be arrays of operating points (broadcast together)
+
+    the power of each helix section is spread uniformly along the section
+    and shared between inner and outer channels in proportion of r1 and r2.
+    heat exchange coefficient is given by Dittus-Boelter (Nu = 0.023 Re^0.8 Pr^0.4)
+
+    returns for each channel a dict with
+    z : nodes (Zc) in mm
+    Tw : coolant temperature at nodes (npoints, nz)
+    power : power received per segment in W (npoints, nz-1)
+    flux : heat flux per segment in W/m^2 (npoints, nz-1)
+    h : heat exchange coefficient in W/m^2/K (npoints,)
+    Twall : wall temperature per segment (npoints, nz-1)
+    """
+    params = insert.get_params(workingDir)
+    (current, flow, tin) = np.broadcast_arrays(
+        _as_batch(current), _as_batch(flow), _as_batch(tin)
+    )
+
+    # power per unit current^2 received by each channel as a function of z
+    sources = [[] for _ in range(params.nchannels)]
+    for i, name in enumerate(insert.Helices):
+        helix = registry.get_part(insert, name, workingDir)
+        (zb, power) = joule_power(helix, rho)
+        cumulated = np.concatenate(([0.0], np.cumsum(power)))
+        (r1, r2) = helix.r
+        sources[i].append((zb, cumulated, r1 / (r1 + r2)))
+        sources[i + 1].append((zb, cumulated, r2 / (r1 + r2)))
+
+    # mm -> m
+    Dh = params.Dh * 1.0e-3
+    Sh = params.Sh * 1.0e-6
+    velocity = flow / Sh.sum()
+    Pr = coolant["mu"] * coolant["cp"] / coolant["k"]
+
+    profiles = []
+    for i, z in enumerate(params.Zh):
+        power = np.zeros(z.size - 1)
+        for zb, cumulated, fraction in sources[i]:
+            power += fraction * np.diff(np.interp(z, zb, cumulated))
+        power = np.outer(current**2, power)
+
+        mass_flow = coolant["rho"] * velocity * Sh[i]
+        Tw = tin[:, None] + np.concatenate(
+            (np.zeros((current.size, 1)), np.cumsum(power, axis=1)), axis=1
+        ) / (mass_flow * coolant["cp"])[:, None]
+
+        Re = coolant["rho"] * velocity * Dh[i] / coolant["mu"]
+        h = 0.023 * Re**0.8 * Pr**0.4 * coolant["k"] / Dh[i]
+        perimeter = 4 * Sh[i] / Dh[i]
+        flux = power / (perimeter * np.diff(z) * 1.0e-3)
+        profiles.append(
+            {
+                "z": z,
+                "Tw": Tw,
+                "power": power,
+                "flux": flux,
+                "h": h,
+                "Twall": (Tw[:, 1:] + Tw[:, :-1]) / 2 + flux / h[:, None],
+            }
+        )
+    return profiles
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+Provides the inductance matrix of the coils of a geometry
+
+* coils are split into sections (see field.discretize),
+* each section is a grid of nr x nz coaxial filaments,
+* filament pairs are given by Maxwell's formula (see filament_mutual),
+  the self term of a filament by the GMD of its cell,
+* only the upper triangle is computed, by chunks of filaments
+  possibly processed concurrently (see mutual_inductances)
+
+results are memoized per geometry (see memo)
+lengths are in mm, inductances in H
+"""
+
+from typing import Optional
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import field
+from . import memo
+
+
+def filament_mutual(a, b, dz) -> np.ndarray:
+    """
+    return the mutual inductance of coaxial circular filaments (SI units)
+
+    a, b : radii, dz: distance between filament planes
+    M = mu0 sqrt(a b) k cel(kc, 1, -1, 1), that is 2 mu0 sqrt(a b) / k ((1 - k^2/2) K - E)
+    """
+    s = (a + b) ** 2 + dz * dz
+    k = np.sqrt(4 * a * b / s)
+    kc = np.sqrt(((a - b) ** 2 + dz * dz) / s)
+    return field.mu0 * np.sqrt(a * b) * k * field.cel(kc, 1, -1, 1)
+
+
+def filaments(sections: dict, nr: int = 4, nz: int = 4) -> dict:
+    """
+    return the filaments of the sections (SI units)
+
+    each section is split into nr x nz cells of equal turns,
+    one filament at the center of every cell
+    """
+    u = (np.arange(nr) + 0.5) / nr
+    v = (np.arange(nz) + 0.5) / nz
+    r1 = sections["r1"][:, None, None] * 1.0e-3
+    r2 = sections["r2"][:, None, None] * 1.0e-3
+    z1 = sections["z1"][:, None, None] * 1.0e-3
+    z2 = sections["z2"][:, None, None] * 1.0e-3
+    shape = (sections["r1"].size, nr, nz)
+    dr = (r2 - r1) / nr
+    dz = (z2 - z1) / nz
+    return {
+        "r": np.broadcast_to(r1 + (r2 - r1) * u[:, None], shape).ravel(),
+        "z": np.broadcast_to(z1 + (z2 - z1) * v, shape).ravel(),
+        "turns": np.repeat(sections["turns"] / (nr * nz), nr * nz),
+        # geometric mean distance of a rectangular cell
+        "gmd": np.broadcast_to(0.2235 * (dr + dz), shape).ravel(),
+        "section": np.repeat(np.arange(sections["r1"].size), nr * nz),
+    }
+
+
+def _upper(wires: dict, rows: slice, nsections: int) -> np.ndarray:
+    """
+    return the section matrix of filament pairs (i, j) with i in rows and j > i
+    """
+    r = wires["r"]
+    columns = slice(rows.start, r.size)
+    upper = np.arange(r.size)[columns][None, :] > np.arange(r.size)[rows][:, None]
+    # pairs below the diagonal are dropped, keep them away from the
+    # singular self pairs (cel would not converge)
+    dz = np.where(upper, wires["z"][rows][:, None] - wires["z"][columns][None, :], 1.0)
+    M = filament_mutual(r[rows][:, None], r[columns][None, :], dz)
+    M *= np.where(upper, wires["turns"][rows][:, None] * wires["turns"][columns][None, :], 0)
+
+    section = wires["section"]
+    M = field._coil_sum(M, section[rows], nsections)
+    return field._coil_sum(M.T, section[columns], nsections).T
+
+
+def mutual_inductances(
+    sections: dict,
+    nr: int = 4,
+    nz: int = 4,
+    max_workers: Optional[int] = None,
+    max_memory: int = 256 * 2**20,
+) -> np.ndarray:
+    """
+    return the inductance matrix of sections: array (nsections, nsections)
+
+    filaments are processed by chunks of rows so that temporaries stay
+    below max_memory bytes, chunks being shared by max_workers threads
+    (None or 1: sequential)
+    """
+    wires = filaments(sections, nr, nz)
+    nsections = sections["r1"].size
+    nwires = wires["r"].size
+
+    # about 32 temporaries of nwires doubles per row
+    chunk = max(1, int(max_memory // (32 * 8 * max(nwires, 1))))
+    tasks = [slice(i, min(i + chunk, nwires)) for i in range(0, nwires, chunk)]
+
+    def _task(rows: slice) -> np.ndarray:
+        return _upper(wires, rows, nsections)
+
+    upper = np.zeros((nsections, nsections))
+    if max_workers and max_workers > 1 and len(tasks) > 1:
+        with ThreadPoolExecutor(max_workers) as executor:
+            for M in executor.map(_task, tasks):
+                upper += M
+    else:
+        for rows in tasks:
+            upper += _task(rows)
+
+    # self inductance of filaments: mu0 a (ln(8a/gmd) - 2)
+    r = wires["r"]
+    own = wires["turns"] ** 2 * field.mu0 * r * (np.log(8 * r / wires["gmd"]) - 2)
+    diagonal = np.bincount(wires["section"], weights=own, minlength=nsections)
+    return upper + upper.T + np.diag(diagonal)
+
+
+# memoized inductance matrices
+results = memo.Memo()
+
+
+def inductances(
+    obj,
+    directory: Optional[str] = None,
+    split: bool = True,
+    nr: int = 4,
+    nz: int = 4,
+    max_workers: Optional[int] = None,
+) -> tuple:
+    """
+    return (names, L) the inductance matrix of the coils of obj
+
+    split: one row per section (eg. ModelAxi sections of a Helix, see field.discretize labels)
+    otherwise one row per coil (see field.discretize names)
+
+    L is shared between calls on a same geometry hence read-only
+    """
+
+    def compute() -> tuple:
+        sections = field.discretize(obj, directory)
+        L = mutual_inductances(sections, nr, nz, max_workers)
+        if split:
+            names = sections["labels"]
+        else:
+            names = sections["names"]
+            L = field._coil_sum(L, sections["coil"], len(names))
+            L = field._coil_sum(L.T, sections["coil"], len(names)).T
+        L.setflags(write=False)
+        return tuple(names), L
+
+    return results.memoize(obj, compute, directory, key=(split, nr, nz))
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+Provides yaml loaders for magnet geometries
+
+* project tags (eg. !Helix or !<Helix>) are registered on every loader,
+* the module defining a tag is only imported when the tag is first met,
+* get_loader picks the libyaml (C) implementation when available
+"""
+
+import importlib
+
+import yaml
+
+with_libyaml = yaml.__with_libyaml__
+
+loaders = [yaml.Loader, yaml.FullLoader, yaml.UnsafeLoader, yaml.SafeLoader]
+if with_libyaml:
+    loaders += [yaml.CLoader, yaml.CFullLoader, yaml.CUnsafeLoader, yaml.CSafeLoader]
+
+
+def add_constructor(tag: str, constructor) -> None:
+    """
+    register constructor for tag on all loaders
+    """
+    for loader in loaders:
+        yaml.add_constructor(tag, constructor, Loader=loader)
+
+
+def add_yaml_object(cls) -> None:
+    """
+    register cls.yaml_tag on all loaders
+
+    unlike yaml.YAMLObject.from_yaml, this does not rely on
+    construct_yaml_object, so it also works with the safe loaders
+    """
+
+    def construct(loader, node):
+        data = cls.__new__(cls)
+        yield data
+        state = loader.construct_mapping(node, deep=True)
+        data.__dict__.update(state)
+
+    for loader in loaders:
+        yaml.add_constructor(cls.yaml_tag, construct, Loader=loader)
+
+
+def get_loader(safe: bool = False, libyaml: bool = True):
+    """
+    return the loader to be used
+
+    safe: use a SafeLoader (no python specific tags)
+    libyaml: use C implementation if available
+    """
+    if libyaml and with_libyaml:
+        return yaml.CSafeLoader if safe else yaml.CFullLoader
+    return yaml.SafeLoader if safe else yaml.FullLoader
+
+
+# class name -> module defining it (see also deserialize.get_class)
+modules = {
+    "Shape": "Shape",
+    "ModelAxi": "ModelAxi",
+    "Model3D": "Model3D",
+    "Helix": "Helix",
+    "Ring": "Ring",
+    "InnerCurrentLead": "InnerCurrentLead",
+    "OuterCurrentLead": "OuterCurrentLead",
+    "Insert": "Insert",
+    "Bitter": "Bitter",
+    "Supra": "Supra",
+    "Screen": "Screen",
+    "Bitters": "Bitters",
+    "Supras": "Supras",
+    "MSite": "MSite",
+    "Shape2D": "Shape2D",
+    "Tierod": "tierod",
+    "CoolingSlit": "coolingslit",
+}
+
+# yaml_tag of the classes not tagged with their name
+tags = {"CoolingSlit": "Slit"}
+
+
+def add_lazy_constructor(tag: str, module: str) -> None:
+    """
+    register a constructor for tag on all loaders that imports module
+    (which registers the actual constructor) and hands over to it
+    """
+
+    def construct(loader, node):
+        importlib.import_module(f".{module}", __package__)
+        constructor = loader.yaml_constructors.get(tag, construct)
+        if constructor is construct:
+            return loader.construct_undefined(node)
+        return constructor(loader, node)
+
+    add_constructor(tag, construct)
+
+
+for clsname, module in modules.items():
+    tag = tags.get(clsname, clsname)
+    add_lazy_constructor(tag, module)
+    add_lazy_constructor(f"!{tag}", module)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+Provides in-memory results memoized per geometry
+
+* results are keyed by the content of the object and of its parts
+  (see geometry_key), so they are only computed again when one of them
+  has changed,
+* each kind of result has its own bounded store (see Memo), eg.
+  hydraulics.params or inductance.results: clearing or filling one
+  leaves the others alone
+"""
+
+from typing import Optional
+
+import threading
+from collections import OrderedDict
+
+
+def geometry_key(obj, directory: Optional[str] = None) -> tuple:
+    """
+    return a key identifying obj content and the parts it references
+    (see fingerprint): the memoized fingerprint is used as long as obj,
+    its embedded objects and the files of its parts are unchanged
+    """
+    return (type(obj).__name__, obj.fingerprint(directory))
+
+
+class Memo:
+    """
+    maxsize : maximum number of results kept (least recently used are dropped)
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        """
+        initialize object
+        """
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        """
+        representation of object
+        """
+        return "%s(maxsize=%r, size=%r)" % (
+            self.__class__.__name__,
+            self.maxsize,
+            len(self),
+        )
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def memoize(self, obj, compute, directory: Optional[str] = None, key: tuple = ()):
+        """
+        return compute() for obj, computed only once per geometry (see geometry_key)
+
+        key: tells apart results of other computations on the same geometry
+        (eg. inductances with their parameters)
+        """
+        key = (geometry_key(obj, directory), directory) + tuple(key)
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+
+        result = compute()
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > max(self.maxsize, 0):
+                self._results.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """
+        remove all memoized results
+        """
+        with self._lock:
+            self._results.clear()
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding:utf-8 -*-
+
+"""
+Provides a process-wide registry of geometry objects loaded from file
+
+* objects are keyed by resolved path,
+* an entry is only reused while the file (mtime, size) is unchanged,
+* the number of entries is bounded (least recently used are evicted first)
+
+and tools to resolve the parts referenced by name in a geometry
+(eg. Insert.Helices or MSite.magnets) into a linked object tree,
+independent parts being possibly loaded concurrently (see prefetch)
+"""
+
+from typing import Optional
+
+import os
+import copy
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from . import loaders
+
+
+def _load(filename: str):
+    """
+    construct an object from a yaml or json file
+    """
+    from . import deserialize
+
+    with open(filename, "r") as istream:
+        if filename.endswith(".json"):
+            return json.loads(
+                istream.read(), object_hook=deserialize.unserialize_object
+            )
+        return yaml.load(istream, Loader=loaders.get_loader())
+
+
+class Registry:
+    """
+    maxsize : maximum number of objects kept in the registry
+
+    hits :
+    misses :
+    evictions :
+    invalidations :
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        """
+        initialize object
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._objects = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        """
+        representation of object
+        """
+        return "%s(maxsize=%r, size=%r, hits=%r, misses=%r)" % (
+            self.__class__.__name__,
+            self.maxsize,
+            len(self),
+            self.hits,
+            self.misses,
+        )
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def __contains__(self, filename: str) -> bool:
+        return os.path.realpath(filename) in self._objects
+
+    def get(self, filename: str, debug: bool = False, loader=None):
+        """
+        return the object defined in filename
+
+        the file is only parsed if it is not yet registered
+        or if it has changed since it was registered
+
+        loader: builds the object from the resolved path
+        (default: geometry object from a yaml or json file)
+        """
+        path = os.path.realpath(filename)
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            entry = self._objects.get(path)
+            if entry is not None and entry[0] == stamp:
+                self._objects.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+
+        if debug:
+            print(f"Registry: load {path}")
+        obj = (loader or _load)(path)
+
+        with self._lock:
+            self.misses += 1
+            self._objects[path] = (stamp, obj)
+            self._objects.move_to_end(path)
+            self._evict()
+        return obj
+
+    def invalidate(self, filename: Optional[str] = None) -> int:
+        """
+        remove filename from registry (all entries if filename is None)
+
+        returns the number of removed entries
+        """
+        with self._lock:
+            if filename is None:
+                n = len(self._objects)
+                self._objects.clear()
+            else:
+                n = int(
+                    self._objects.pop(os.path.realpath(filename), None) is not None
+                )
+            self.invalidations += n
+            return n
+
+    def resize(self, maxsize: int) -> None:
+        """
+        change the maximum number of objects kept in the registry
+        """
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def stats(self) -> dict:
+        """
+        returns registry statistics as a dict
+        """
+        with self._lock:
+            return {
+                "size": len(self._objects),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def reset_stats(self) -> None:
+        """
+        reset hit/miss counters
+        """
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.invalidations = 0
+
+    def _evict(self) -> None:
+        while len(self._objects) > max(self.maxsize, 0):
+            self._objects.popitem(last=False)
+            self.evictions += 1
+
+
+# process-wide registry
+registry = Registry()
+
+# process-wide registry of HTS structures (see Supra.get_magnet_struct)
+structs = Registry()
+
+
+def get_filename(name: str, directory: Optional[str] = None, ext: str = ".yaml"):
+    """
+    return the file name where part name is stored
+    """
+    filename = f"{name}{ext}"
+    if directory is not None:
+        filename = os.path.join(directory, filename)
+    return filename
+
+
+def load(name: str, directory: Optional[str] = None, ext: str = ".yaml"):
+    """
+    return the object stored in {directory}/{name}{ext} from the registry
+    """
+    return registry.get(get_filename(name, directory, ext))
+
+
+# attributes holding the names of the referenced parts
+references = {
+    "Insert": ["Helices", "Rings", "CurrentLeads"],
+    "Bitters": ["magnets"],
+    "Supras": ["magnets"],
+    "MSite": ["magnets"],
+}
+
+
+class Assembly:
+    """
+    mixin for objects referencing parts by name (see references)
+
+    parts attached by resolve are not dumped to yaml
+    """
+
+    @classmethod
+    def to_yaml(cls, dumper, data):
+        """
+        dump to yaml (resolved parts are skipped)
+        """
+        from . import deserialize
+
+        return deserialize.represent_instance(dumper, cls.yaml_tag, data)
+
+
+def _names(refs) -> list[str]:
+    """
+    return the list of names from a str, list or dict of references
+    """
+    if refs is None:
+        return []
+    if isinstance(refs, str):
+        return [refs]
+    if isinstance(refs, dict):
+        refs = list(refs.values())
+
+    names = []
+    for ref in refs:
+        names += _names(ref)
+    return names
+
+
+def get_references(obj) -> list[str]:
+    """
+    return the names of the parts referenced by obj
+    """
+    names = []
+    for attr in references.get(type(obj).__name__, []):
+        names += _names(getattr(obj, attr, None))
+    return list(dict.fromkeys(names))
+
+
+# default number of threads used to load parts (None or 1: sequential)
+default_max_workers = None
+
+
+def set_max_workers(n: Optional[int]) -> None:
+    """
+    set the default number of threads used to load parts
+    """
+    global default_max_workers
+    default_max_workers = n
+
+
+def prefetch(
+    obj, directory: Optional[str] = None, max_workers: Optional[int] = None
+) -> None:
+    """
+    load all the parts referenced by obj (recursively) into the registry
+
+    files of a same level are loaded concurrently by max_workers threads
+    (see set_max_workers), so that the following sequential accesses
+    are registry hits. Loading errors are left to these accesses.
+    """
+    if max_workers is None:
+        max_workers = default_max_workers
+    if not max_workers or max_workers <= 1:
+        return
+
+    def _get(task):
+        (parent, name) = task
+        try:
+            return get_part(parent, name, directory)
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        level = [obj]
+        while level:
+            tasks = [
+                (parent, name) for parent in level for name in get_references(parent)
+            ]
+            level = [part for part in executor.map(_get, tasks) if part is not None]
+
+
+def resolve(
+    obj, directory: Optional[str] = None, max_workers: Optional[int] = None
+):
+    """
+    return a copy of obj with all its referenced parts attached
+
+    parts are loaded once and resolved in turn,
+    obj itself (possibly shared through the registry) is left unchanged
+    """
+    if type(obj).__name__ not in references:
+        return obj
+
+    prefetch(obj, directory, max_workers)
+
+    tree = copy.copy(obj)
+    tree._parts = {
+        name: resolve(load(name, directory), directory, 1)
+        for name in get_references(obj)
+    }
+    return tree
+
+
+def get_part(obj, name: str, directory: Optional[str] = None):
+    """
+    return the part name referenced by obj
+
+    use the resolved part if any, otherwise load it from the registry
+    """
+    parts = getattr(obj, "_parts", None)
+    if parts is not None and name in parts:
+        return parts[name]
+    return load(name, directory)
+
+
+def get_parts(obj, directory: Optional[str] = None) -> list:
+    """
+    return the parts referenced by obj (not recursively)
+    """
+    return [get_part(obj, name, directory) for name in get_references(obj)]
+
+
+def load_tree(
+    filename: str, directory: Optional[str] = None, max_workers: Optional[int] = None
+):
+    """
+    load filename and resolve all the parts it references
+    """
+    return resolve(registry.get(filename), directory, max_workers)
@@ -1,10 +1,12 @@
 import yaml
 import json
 
+from . import loaders
+from .fingerprint import Fingerprint
 from .Shape2D import Shape2D
 
 
-class Tierod(yaml.YAMLObject):
+class Tierod(yaml.YAMLObject, Fingerprint):
     yaml_tag = "Tierod"
 
     def __init__(
@@ -18,7 +20,7 @@ class Tierod(yaml.YAMLObject):
             self.shape = shape
         else:
             with open(f"{shape}.yaml", "r") as f:
-                self.shape = yaml.load(f, Loader=yaml.FullLoader)
+                self.shape = yaml.load(f, Loader=loaders.get_loader())
 
     def __repr__(self):
         return "%s(r=%r, n=%r, dh=%r, sh=%r, shape=%r)" % (
@@ -47,7 +49,7 @@ class Tierod(yaml.YAMLObject):
         data = None
         try:
             with open(f"{name}.yaml", "r") as istream:
-                data = yaml.load(stream=istream, Loader=yaml.FullLoader)
+                data = yaml.load(stream=istream, Loader=loaders.get_loader())
         except:
             raise Exception(f"Failed to load Bitter data {name}.yaml")
 
@@ -59,7 +61,7 @@ class Tierod(yaml.YAMLObject):
             self.shape = data.shape
         else:
             with open(f"{data.shape}.yaml", "r") as f:
-                self.shape = yaml.load(f, Loader=yaml.FullLoader)
+                self.shape = yaml.load(f, Loader=loaders.get_loader())
 
     def to_json(self):
         """
@@ -97,4 +99,5 @@ def Tierod_constructor(loader, node):
     return Tierod(r, n, dh, sh, shape)
 
 
-yaml.add_constructor("!<Tierod>", Tierod_constructor)
+loaders.add_constructor("!<Tierod>", Tierod_constructor)
+loaders.add_yaml_object(Tierod)
@@ -0,0 +1,84 @@
+from python_magnetgeo.Ring import Ring
+from python_magnetgeo.Shape import Shape
+from python_magnetgeo.ModelAxi import ModelAxi
+from python_magnetgeo.Model3D import Model3D
+from python_magnetgeo.Helix import Helix
+from python_magnetgeo.Insert import Insert
+
+import pytest
+
+
+def helix(odd: bool = True) -> Helix:
+    """
+    helix H1 (odd) or H0 of the cut goldens (see tests/data)
+    """
+    turns = [0.292, 0.75, 0.75, 1.5, 1.5, 2.0, 3.25, 2.0, 1.5, 1.5, 0.75, 0.292]
+    pitch = [18.03, 17.0, 17.0, 14.2, 14.2, 12.4, 11.2, 12.4, 14.2, 14.2, 17.0, 18.03]
+    h = sum(t * p for t, p in zip(turns, pitch)) / 2.0
+    axi = ModelAxi("axi", h, turns, pitch)
+    return Helix(
+        f"H{int(odd)}",
+        [19.3, 24.2],
+        [-h - 10, h + 10],
+        0.2,
+        odd,
+        True,
+        axi,
+        Model3D(cad="test"),
+        Shape("", ""),
+    )
+
+
+@pytest.fixture
+def create_helix():
+    """
+    factory of the helices of the cut goldens
+    """
+    return helix
+
+
+@pytest.fixture
+def create_insert():
+    """
+    factory of an Insert of 2 helices H1, H2 (see create_helix) and a ring R1,
+    parts are dumped in the current directory
+    """
+
+    def create_insert() -> Insert:
+        for i, odd in enumerate([True, False]):
+            part = helix(odd)
+            part.name = f"H{i+1}"
+            part.r = [19.3 + 6 * i, 24.2 + 6 * i]
+            part.dump()
+        Ring("R1", [19, 20, 29, 31], [0, 20]).dump()
+        return Insert("insert", ["H1", "H2"], ["R1"], [], [], [], 15, 35)
+
+    return create_insert
+
+
+@pytest.fixture
+def create_small_insert():
+    """
+    factory of an Insert of 2 one turn helices H0, H1,
+    parts are dumped in the current directory
+    """
+
+    def create_small_insert() -> Insert:
+        helices = []
+        for i, r in enumerate([[1, 2], [3, 4]]):
+            part = Helix(
+                f"H{i}",
+                r,
+                [-2, 2],
+                0.2,
+                True,
+                True,
+                ModelAxi("axi", 1, [1, 1], [1, 1]),
+                Model3D(cad="test"),
+                Shape("", ""),
+            )
+            part.dump()
+            helices.append(part.name)
+        return Insert("insert", helices, [], [], [], [], 0.5, 5)
+
+    return create_small_insert
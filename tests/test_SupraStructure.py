@@ -0,0 +1,299 @@
+import json
+import pickle
+
+from python_magnetgeo import field
+from python_magnetgeo import registry
+from python_magnetgeo.Supra import Supra
+from python_magnetgeo.SupraStructure import (
+    HTSinsert,
+    dblpancake,
+    isolation,
+    pancake,
+    tape,
+)
+
+import numpy as np
+import pytest
+
+
+def create_struct(n: int = 5, filename: str = "struct.json") -> str:
+    """
+    write the struct of n similar double pancakes
+    """
+    data = {
+        "pancake": {
+            "r0": 10,
+            "mandrin": 9,
+            "ntapes": 40,
+            "tape": {"w": 0.15, "h": 6, "e": 0.05},
+        },
+        "isolation": {"r0": 10, "w": [8.2, 8.0], "h": [0.1, 0.2]},
+        "dblpancakes": {"n": n, "isolation": {"r0": 9.5, "w": [9], "h": [0.5]}},
+    }
+    with open(filename, "w") as f:
+        json.dump(data, f)
+    return filename
+
+
+def test_columns(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    hts = HTSinsert.fromcfg(create_struct())
+
+    assert len(hts.dblpancakes) == 5 and len(hts.isolations) == 5
+    assert hts.getNtapes().tolist() == [40] * 5
+    assert np.allclose(hts.getWPancake(), 8.0)
+    assert np.allclose(hts.getHDblPancake(), 12.3)
+    assert np.allclose(hts.getR1Pancake_Isolation(), 18.2)
+    assert np.allclose(hts.getH_Isolation(), 0.5)
+
+    # accessors return read-only arrays (lists before)
+    for name in [
+        "getNtapes",
+        "getHtapes",
+        "getWtapes_SC",
+        "getWtapes_Isolation",
+        "getMandrinPancake",
+        "getWPancake",
+        "getWPancake_Isolation",
+        "getR0Pancake_Isolation",
+        "getR1Pancake_Isolation",
+        "getHPancake_Isolation",
+        "getWDblPancake",
+        "getHDblPancake",
+        "getR0_Isolation",
+        "getR1_Isolation",
+        "getW_Isolation",
+        "getH_Isolation",
+    ]:
+        values = getattr(hts, name)()
+        assert isinstance(values, np.ndarray) and values.shape == (5,)
+        assert isinstance(values.tolist(), list)
+    assert not hts.getNtapes().flags.writeable
+    assert hts.getFillingFactor() == pytest.approx(5 * 40 * 2 * 0.15 * 6 / (8 * 63.5))
+
+    # read-only views on the stack
+    ntapes = hts.getNtapes()
+    assert np.shares_memory(ntapes, hts.dblpancakes.columns["ntapes"])
+    with pytest.raises(ValueError):
+        ntapes[0] = 1
+
+    # double pancakes are views on the rows
+    dps = list(hts.dblpancakes)
+    assert [dp.getZ0() for dp in dps] == hts.dblpancakes.column("z0").tolist()
+    assert dps[0].getR1() == hts.getR1() and dps[-1].getH() == dps[0].getH()
+    dps[1].setZ0(1.5)
+    assert hts.dblpancakes[1].getZ0() == 1.5
+    dps[2].setPancake(pancake(11, tape(0.2, 4, 0.05), 20, 9))
+    assert hts.getNtapes().tolist() == [40, 40, 20, 40, 40]
+    assert hts.getHDblPancake()[2] == pytest.approx(8.3)
+    assert hts.dblpancakes[-1].getPancake() is hts.dblpancakes[0].getPancake()
+
+    hts.setDblpancake(dblpancake(50, pancake(10, tape(0.15, 6, 0.05), 10)))
+    hts.setIsolation(isolation(9.5, [9], [0.5]))
+    assert len(hts.getNtapes()) == 6 and hts.getNtapes()[-1] == 10
+    assert hts.getR0_Isolation().tolist() == [9.5] * 6
+
+
+def test_stacks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    hts = HTSinsert.fromcfg(create_struct())
+
+    # changing rows changes the fingerprint of the insert
+    digests = {hts.fingerprint()}
+    hts.dblpancakes[0].setZ0(100.0)
+    digests.add(hts.fingerprint())
+    hts.dblpancakes[1].setPancake(pancake(11, tape(0.2, 4, 0.05), 20, 9))
+    digests.add(hts.fingerprint())
+    hts.setDblpancake(dblpancake(50, pancake(10, tape(0.15, 6, 0.05), 10)))
+    digests.add(hts.fingerprint())
+    hts.setIsolation(isolation(9.5, [9], [0.4]))
+    digests.add(hts.fingerprint())
+    assert len(digests) == 5
+
+    # rows are appended in buffers grown geometrically
+    for i in range(1000):
+        hts.setIsolation(isolation(9.5, [9], [0.5]))
+    assert len(hts.isolations) == 1006
+    assert len(hts.isolations) <= hts.isolations._data["h"].size < 2 * 1006
+    assert np.shares_memory(hts.getH_Isolation(), hts.isolations._data["h"])
+
+    copy = pickle.loads(pickle.dumps(hts))
+    assert copy.fingerprint() == hts.fingerprint()
+    copy.setIsolation(isolation(9.5, [9], [0.1]))
+    assert copy.getH_Isolation()[-2:].tolist() == [0.5, 0.1]
+    assert len(hts.isolations) == 1006
+
+
+@pytest.mark.parametrize(
+    "similar,isolated", [(True, False), (False, False), (False, True)]
+)
+def test_fromcfg(tmp_path, monkeypatch, similar, isolated):
+    monkeypatch.chdir(tmp_path)
+    if similar:
+        filename = create_struct(4)
+        gaps = [0.5] * 3
+    else:
+        data = {
+            "isolation": {"r0": 9, "w": [12], "h": [0.4]},
+            "dblpancakes": {
+                f"dp{i}": {
+                    "pancake": {
+                        "r0": 12 - i % 2,
+                        "ntapes": 30 + i % 2,
+                        "tape": {"w": 0.15, "h": 6 - i % 2, "e": 0.05},
+                    }
+                }
+                for i in range(4)
+            },
+            "isolations": {f"dp{i}": {} for i in range(4)},
+        }
+        gaps = [0.4] * 3
+        if isolated:
+            for i in range(3):
+                data["isolations"][f"dp{i}"] = {
+                    "isolation": {"r0": 9, "w": [12], "h": [0.1 * (i + 1)]}
+                }
+            gaps = [0.1, 0.2, 0.3]
+        filename = "struct.json"
+        with open(filename, "w") as f:
+            json.dump(data, f)
+
+    hts = HTSinsert.fromcfg(filename)
+    assert hts.getN() == 4
+    # stacked from the bottom, centered on z0
+    z = hts.dblpancakes.column("z0")
+    h = hts.getHDblPancake()
+    assert (z - h / 2)[0] == pytest.approx(-hts.getH() / 2)
+    assert (z + h / 2)[-1] == pytest.approx(hts.getH() / 2)
+    assert np.allclose((z - h / 2)[1:] - (z + h / 2)[:-1], gaps)
+    assert hts.getH() == pytest.approx(h.sum() + sum(gaps))
+    assert hts.getR0() == min(dp.getR0() for dp in hts.dblpancakes)
+    assert hts.getR1() == max(dp.getR1() for dp in hts.dblpancakes)
+    if not similar:
+        # identical definitions are shared
+        assert len({id(dp.getPancake()) for dp in hts.dblpancakes}) == 2
+
+
+def test_supra(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    supra = Supra("supra", [0, 0], [0, 0], 0, create_struct())
+    (r, digest) = (supra.r, supra.fingerprint())
+    hts = supra.get_magnet_struct()
+    supra.check_dimensions(hts)
+    assert supra.n == 200 and type(supra.n) is int
+    # dimensions are replaced, not changed in place
+    assert r == [0, 0] and supra.r == [hts.getR0(), hts.getR1()]
+    assert supra.fingerprint() != digest
+
+    sections = field.discretize(supra)
+    assert sections["r1"].size == 5
+    assert np.allclose(sections["z2"] - sections["z1"], hts.getHDblPancake())
+    assert sections["turns"].tolist() == [80] * 5
+
+
+def test_cache(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry.structs.invalidate()
+    registry.structs.reset_stats()
+    filename = create_struct()
+
+    # twin coils share the same struct
+    supras = [Supra(f"supra{i}", [0, 0], [0, 0], 0, filename) for i in range(2)]
+    hts = supras[0].get_magnet_struct()
+    assert supras[1].get_magnet_struct() is hts
+    assert supras[0].get_magnet_struct(str(tmp_path)) is hts
+    supras[0].set_Detail("dblpancake")
+    assert supras[0].get_lc() == hts.get_lc()
+    assert registry.structs.stats()["misses"] == 1
+
+    # shared struct is read-only, its copies are not
+    digest = hts.fingerprint()
+    for change in [
+        lambda hts: hts.dblpancakes[0].setZ0(100.0),
+        lambda hts: hts.dblpancakes[0].setPancake(pancake()),
+        lambda hts: hts.setIsolation(isolation()),
+        lambda hts: hts.setZ0(1.0),
+    ]:
+        with pytest.raises(RuntimeError):
+            change(hts)
+        mine = hts.copy()
+        change(mine)
+        assert mine.fingerprint() != digest
+    with pytest.raises(ValueError):
+        hts.dblpancakes.columns["z0"][0] = 100.0
+    assert hts.fingerprint(revalidate=True) == digest
+
+    # dimensions are only checked once per HTSinsert
+    checks = []
+    monkeypatch.setattr(
+        Supra, "check_dimensions", lambda self, magnet: checks.append(self.name)
+    )
+    monkeypatch.setattr(HTSinsert, "get_names", lambda self, **kwargs: [])
+    for supra in supras + supras:
+        supra.set_Detail("dblpancake")
+        supra.get_names("")
+    assert checks == ["supra0", "supra1"]
+    supras[0].r = [10, 20]
+    supras[0].get_names("")
+    assert checks == ["supra0", "supra1", "supra0"]
+    assert "_checked" not in supras[0].to_json()
+
+    # struct changed
+    create_struct(12, filename)
+    assert len(supras[1].get_magnet_struct().dblpancakes) == 12
+    registry.structs.invalidate()
+
+
+@pytest.mark.parametrize("detail", ["dblpancake", "pancake", "tape"])
+def test_names(tmp_path, monkeypatch, detail):
+    monkeypatch.chdir(tmp_path)
+    hts = HTSinsert.fromcfg(create_struct(3))
+
+    names = hts.get_names("M", detail)
+    assert hts.count_names(detail) == len(names) == len(set(names))
+    assert names[0] == {"dblpancake": "M_dp0", "pancake": "M_dp0_p0"}.get(
+        detail, "M_dp0_p0_Mandrin"
+    )
+    assert names[-2:] == ["M_i0", "M_i1"]
+    if detail == "tape":
+        assert len(names) == 3 * (3 + 4 * 40) + 2
+        assert names[1:3] == ["M_dp0_p0_t0_SC", "M_dp0_p0_t0_Duromag"]
+
+    # random access without generating the names
+    for i, name in enumerate(names):
+        assert hts.name_at(i, "M", detail) == name
+        assert hts.index_of(name, "M", detail) == i
+    assert hts.name_at(-1, "M", detail) == "M_i1"
+    with pytest.raises(IndexError):
+        hts.name_at(len(names), "M", detail)
+    for name in ["M_i2", "M_dp3", "dp0", "M_dp0_p0_t40_SC"]:
+        with pytest.raises(ValueError):
+            hts.index_of(name, "M", detail)
+
+
+def test_tapes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    hts = HTSinsert.fromcfg(create_struct(3))
+    p = hts.dblpancakes[0].getPancake()
+    assert np.allclose(p.getR(), [10 + 0.2 * i for i in range(40)])
+
+    tapes = hts.getTapes()
+    cowound = hts.getTapes(cowound=True)
+    names = [name for name in hts.get_names("", "tape") if name.endswith("_SC")]
+    assert tapes.shape == cowound.shape == (len(names), 4) == (3 * 2 * 40, 4)
+
+    # dp1_p1_t2: above dblpancake isolation, 3rd tape from r0
+    (r0, r1, z0, z1) = tapes[names.index("dp1_p1_t2_SC")]
+    dp = hts.dblpancakes[1]
+    assert (r0, r1) == pytest.approx((10.4, 10.55))
+    assert (z0, z1) == pytest.approx((dp.getZ0() + 0.15, dp.getZ0() + 6.15))
+    assert np.allclose(cowound[:, 0], tapes[:, 1])
+    assert np.allclose(cowound[:, 1] - cowound[:, 0], 0.05)
+    assert tapes[:, 0].min() == hts.getR0()
+    assert cowound[:, 1].max() == pytest.approx(hts.getR1())
+    assert tapes[:, 2].min() == pytest.approx(-hts.getH() / 2)
+
+    # lazily by double pancake or by chunks
+    assert [len(block) for block in hts.iter_tapes()] == [80] * 3
+    assert [len(block) for block in hts.iter_tapes(100)] == [100, 100, 40]
+    assert np.array_equal(np.concatenate(list(hts.iter_tapes(7, True))), cowound)
@@ -0,0 +1,50 @@
+import os
+
+from python_magnetgeo.Shape import Shape
+from python_magnetgeo.ModelAxi import ModelAxi
+from python_magnetgeo.Model3D import Model3D
+from python_magnetgeo.Helix import Helix
+from python_magnetgeo.MSite import MSite
+from python_magnetgeo.cache import DiskCache
+
+import pytest
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch, create_small_insert):
+    monkeypatch.chdir(tmp_path)
+    create_small_insert().dump()
+    MSite("site", {"insert": "insert"}, None, None, None, None).dump()
+    return tmp_path
+
+
+def test_cache(workdir):
+    cache = DiskCache(os.path.join(workdir, "cache"))
+    site = cache.load("site.yaml")
+    assert cache.stats()["misses"] == 1 and cache.stats()["entries"] == 1
+
+    cached = cache.load("site.yaml")
+    assert cache.stats()["hits"] == 1
+    assert cached is not site
+    assert cached.get_names("", is2D=True) == site.get_names("", is2D=True)
+
+    # changing a referenced part invalidates the entry
+    Helix(
+        "H1", [3, 5], [-2, 2], 0.2, True, True,
+        ModelAxi("axi", 1, [1, 1], [1, 1]), Model3D(cad="test"), Shape("", ""),
+    ).dump()
+    assert cache.load("site.yaml").boundingBox() == ([1, 5], [-2, 2])
+    assert cache.stats()["misses"] == 2 and cache.stats()["entries"] == 2
+
+
+def test_evict(workdir):
+    cache = DiskCache(os.path.join(workdir, "cache"), maxsize=1)
+    cache.load("site.yaml")
+    assert cache.stats()["entries"] == 0 and cache.evictions > 0
+
+
+def test_no_cache(workdir):
+    cache = DiskCache(os.path.join(workdir, "cache"), enabled=False)
+    cache.load("site.yaml")
+    cache.load("site.yaml")
+    assert cache.stats()["hits"] == 0 and not os.path.exists(cache.cachedir)
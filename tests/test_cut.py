@@ -0,0 +1,133 @@
+import io
+import os
+import json
+import hashlib
+
+from python_magnetgeo import cut_utils
+from python_magnetgeo.Shape import Shape
+from python_magnetgeo.Insert import Insert
+
+import numpy as np
+import pytest
+
+datadir = os.path.join(os.path.dirname(__file__), "data")
+
+
+@pytest.mark.parametrize("odd", [True, False])
+def test_golden(tmp_path, monkeypatch, odd, create_helix):
+    monkeypatch.chdir(tmp_path)
+    helix = create_helix(odd)
+    # golden files were written by the former lncmi_cut and salome_cut
+    cut_utils.create_cut(helix, "lncmi", helix.name)
+    cut_utils.create_cut(helix, "salome", helix.name)
+    cut_utils.lncmi_cut(helix, f"{helix.name}_z0_lncmi.iso", z0=-0.5)
+
+    for ext in ["_lncmi.iso", "_cut_salome.dat", "_z0_lncmi.iso"]:
+        filename = f"{helix.name}{ext}"
+        with open(os.path.join(datadir, filename), "rb") as f:
+            assert (tmp_path / filename).read_bytes() == f.read()
+
+
+def test_stream(create_helix):
+    helix = create_helix()
+    with open(os.path.join(datadir, "H1_cut_salome.dat"), "rb") as f:
+        ref = f.read()
+
+    assert cut_utils.salome_cut(helix) == ref
+
+    ostream = io.StringIO()
+    cut_utils.salome_cut(helix, ostream)
+    assert ostream.getvalue().encode() == ref
+
+    ostream = io.BytesIO()
+    cut_utils.salome_cut(helix, ostream)
+    assert ostream.getvalue() == ref
+
+
+def test_compact(create_helix):
+    helix = create_helix()
+    lines = cut_utils.salome_cut(helix).decode().splitlines()
+    # opt-in: runs 17.0/17.0 and 14.2/14.2 (twice) are merged
+    compacted = cut_utils.salome_cut(helix, tol=1.e-6).decode().splitlines()
+    assert len(lines) == 14 and len(compacted) == 11
+    assert compacted[0] == lines[0] and compacted[-1] == lines[-1]
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_generate_cuts(tmp_path, monkeypatch, workers, create_helix):
+    monkeypatch.chdir(tmp_path)
+    for odd in [True, False]:
+        create_helix(odd).dump()
+    insert = Insert("insert", ["H1", "H0"], [], [], [], [], 0.5, 5)
+
+    outdir = tmp_path / "cuts"
+    outdir.mkdir()
+    manifest = insert.generate_cuts("salome", workers, str(outdir))
+
+    assert [item["part"] for item in manifest["files"]] == ["H1", "H0"]
+    for item in manifest["files"]:
+        with open(os.path.join(datadir, os.path.basename(item["file"])), "rb") as f:
+            assert hashlib.sha256(f.read()).hexdigest() == item["sha256"]
+    with open(outdir / "insert_cuts.json", "r") as f:
+        assert json.load(f) == manifest
+
+    # cut files are overwritten when generated again
+    assert insert.generate_cuts("salome", workers, str(outdir)) == manifest
+
+
+def test_shapes(create_helix):
+    shape = Shape("", "HR-54-116", 8, 30, 0, "ALTERNATE")
+    (start, end, ids) = shape.get_placements(2.5)
+    # 12 shapes per turn, 6 on the last half turn
+    assert start.size == 30
+    assert np.allclose(np.degrees(end - start), 8)
+    assert ids[:4].tolist() == [1, -1, 1, -1]
+
+    assert Shape("", "", 8, 30, [2], "ABOVE").get_placements(2.5)[0].size == 12
+    with pytest.raises(RuntimeError):
+        Shape("", "", 40, 30, 0, "ABOVE").get_placements(2.5)
+
+    helix = create_helix()
+    helix.shape = Shape("", "HR-54-116", 8, 30, 0, "BELLOW")
+    nturns = helix.get_Nturns()
+    (start, end, ids) = helix.shape.get_placements(nturns)
+
+    lines = cut_utils.salome_cut(helix, with_shapes=True).decode().splitlines()
+    rows = np.loadtxt(lines[1:])
+    assert rows.shape[0] == len(lines) - 1
+    assert np.all(np.diff(-rows[:, 0]) > 0) and np.all(np.diff(rows[:, 2]) < 0)
+    # each shape opens at its start angle (the first one at the top of the cut)
+    opened = (rows[:-1, 1] == 0) & (rows[1:, 1] != 0)
+    assert rows[0, 1] == -1 and np.count_nonzero(opened) + 1 == ids.size
+    assert set(rows[:, 1]) == {0, -1}
+
+    # no shape: plain cut
+    helix.shape = Shape("", "")
+    with open(os.path.join(datadir, "H1_cut_salome.dat"), "rb") as f:
+        assert cut_utils.salome_cut(helix, with_shapes=True) == f.read()
+
+    # golden (see salome_content for the Shape_id encoding)
+    helix.shape = Shape("", "HR-54-116", 8, 30, 0, "ALTERNATE")
+    with open(os.path.join(datadir, "H1_shapes_cut_salome.dat"), "rb") as f:
+        assert cut_utils.salome_cut(helix, with_shapes=True) == f.read()
+
+
+def test_lncmi_shapes(tmp_path, monkeypatch, create_helix):
+    monkeypatch.chdir(tmp_path)
+    for odd in [True, False]:
+        helix = create_helix(odd)
+        helix.model3d.with_shapes = True
+        helix.shape = Shape("", "HR-54-116", 8, 30, 0, "ALTERNATE")
+        helix.dump()
+    insert = Insert("insert", ["H1", "H0"], [], [], [], [], 0.5, 5)
+
+    # no shapes in lncmi format: plain cuts are written
+    with pytest.warns(UserWarning, match="no shapes in LNCMI format"):
+        manifest = insert.generate_cuts("LNCMI")
+    assert [item["file"] for item in manifest["files"]] == [
+        "H1_lncmi.iso",
+        "H0_lncmi.iso",
+    ]
+    for item in manifest["files"]:
+        with open(os.path.join(datadir, item["file"]), "rb") as f:
+            assert (tmp_path / item["file"]).read_bytes() == f.read()
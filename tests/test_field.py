@@ -0,0 +1,139 @@
+from python_magnetgeo import field
+from python_magnetgeo import registry
+from python_magnetgeo.Supra import Supra
+from python_magnetgeo.Insert import Insert
+
+import numpy as np
+import pytest
+
+
+def solenoid(r1, r2, z1, z2, turns) -> dict:
+    return {
+        "r1": np.array([r1]),
+        "r2": np.array([r2]),
+        "z1": np.array([z1]),
+        "z2": np.array([z2]),
+        "turns": np.array([turns]),
+        "coil": np.array([0]),
+        "names": ["solenoid"],
+    }
+
+
+def test_cel():
+    # complete elliptic integrals K and E for m = 0.5
+    kc = np.sqrt(0.5)
+    assert field.cel(kc, 1, 1, 1) == pytest.approx(1.8540746773013719, rel=1.0e-13)
+    assert field.cel(kc, 1, 1, 0.5) == pytest.approx(1.3506438810476755, rel=1.0e-13)
+
+
+def test_axis():
+    # thick solenoid on axis: closed form
+    (r1, r2, z1, z2) = (0.02, 0.03, -0.05, 0.05)
+    z = np.linspace(-0.1, 0.1, 11)
+    (Br, Bz) = field.coil_fields(solenoid(20, 30, -50, 50, 100), 0 * z, z * 1.0e3)
+
+    def F(x):
+        return x * np.log((r2 + np.hypot(r2, x)) / (r1 + np.hypot(r1, x)))
+
+    J = 100 / ((r2 - r1) * (z2 - z1))
+    assert np.allclose(Bz[0], field.mu0 * J / 2 * (F(z - z1) - F(z - z2)), rtol=1.0e-12)
+    assert np.allclose(Br, 0, atol=1.0e-15)
+
+
+def test_biot_savart():
+    # direct integration over the winding
+    (r, z) = (0.05, -0.03)
+    (x, w) = np.polynomial.legendre.leggauss(24)
+    phi = np.linspace(0, 2 * np.pi, 2000, endpoint=False)
+    a = 0.025 + 0.005 * x[:, None, None]
+    zc = 0.05 * x[None, :, None]
+    weight = (0.005 * w[:, None, None]) * (0.05 * w[None, :, None]) * 100 / (0.01 * 0.1)
+    R3 = ((r - a * np.cos(phi)) ** 2 + (a * np.sin(phi)) ** 2 + (z - zc) ** 2) ** 1.5
+    scale = field.mu0 / (4 * np.pi) * 2 * np.pi / phi.size
+    Br = scale * np.sum(weight * a * np.cos(phi) * (z - zc) / R3)
+    Bz = scale * np.sum(weight * a * (a - r * np.cos(phi)) / R3)
+
+    (br, bz) = field.coil_fields(solenoid(20, 30, -50, 50, 100), [r * 1.0e3], [z * 1.0e3])
+    assert br[0, 0] == pytest.approx(Br, rel=1.0e-6)
+    assert bz[0, 0] == pytest.approx(Bz, rel=1.0e-6)
+
+
+def test_insert(tmp_path, monkeypatch, create_helix):
+    monkeypatch.chdir(tmp_path)
+    for i, odd in enumerate([True, False]):
+        helix = create_helix(odd)
+        helix.name = f"H{i+1}"
+        helix.r = [19.3 + 6 * i, 24.2 + 6 * i]
+        helix.dump()
+    insert = Insert("insert", ["H1", "H2"], [], [], [], [], 15, 35)
+
+    sections = field.discretize(insert)
+    assert sections["names"] == ["H1", "H2"]
+    assert sections["turns"].sum() == 2 * create_helix().get_Nturns()
+
+    (r, z) = np.meshgrid(np.linspace(0, 50, 20), np.linspace(-150, 150, 30))
+    (Br, Bz) = field.field(insert, r, z, 10.0e3)
+    assert Bz.shape == r.shape
+
+    # chunks and current sets
+    (br, bz) = field.field(insert, r, z, [[10.0e3, 10.0e3], [0, 5.0e3]], max_memory=1)
+    assert bz.shape == (2,) + r.shape
+    assert np.allclose(bz[0], Bz) and np.allclose(br[0], Br)
+    (br, bz) = field.field(registry.load("H2"), r, z, 5.0e3)
+    assert np.allclose(bz, field.field(insert, r, z, [[0, 5.0e3]])[1][0])
+
+
+def test_supra():
+    supra = Supra("supra", [10, 20], [-30, 30], 500)
+    sections = field.discretize(supra)
+    assert sections["turns"].tolist() == [500]
+    (Br, Bz) = field.field(supra, [0], [0], 100)
+    (br, bz) = field.coil_fields(solenoid(10, 20, -30, 30, 500), [0], [0])
+    assert Bz[0] == pytest.approx(100 * bz[0, 0])
+
+
+def test_axis_field(tmp_path, monkeypatch, create_helix):
+    monkeypatch.chdir(tmp_path)
+    for i, odd in enumerate([True, False]):
+        helix = create_helix(odd)
+        helix.name = f"H{i+1}"
+        helix.r = [19.3 + 6 * i, 24.2 + 6 * i]
+        helix.dump()
+    insert = Insert("insert", ["H1", "H2"], [], [], [], [], 15, 35)
+
+    z = np.linspace(-150, 150, 31)
+    currents = [[10.0e3, 10.0e3], [0, 5.0e3], [2.0e3, 0]]
+    Bz = field.axis_field(insert, z, currents)
+    assert Bz.shape == (3, z.size)
+    assert np.allclose(Bz, field.field(insert, 0 * z, z, currents)[1], rtol=1.0e-10)
+
+    result = field.homogeneity(insert, currents, radius=5, order=4)
+    assert result["coefficients"].shape == (3, 5)
+    B0 = [field.axis_field(insert, z0, I) for z0, I in zip(result["center"], currents)]
+    assert np.allclose(result["B0"], B0)
+
+
+def test_homogeneity():
+    # current loop: Bz = B0 (1 + (z/a)^2)^-3/2
+    (a, z0, radius) = (50.005, 3, 20)
+    loop = Supra("loop", [50, 50.01], [z0 - 0.005, z0 + 0.005], 1)
+    result = field.homogeneity(loop, 1.0e3, radius=radius, order=10)
+    assert result["center"] == pytest.approx(z0, abs=1.0e-6)
+    assert result["B0"] == pytest.approx(field.mu0 * 1.0e3 / (2 * a * 1.0e-3), rel=1.0e-8)
+    expected = np.zeros(11)
+    for k in range(6):
+        expected[2 * k] = np.prod([(-1.5 - i) / (i + 1) for i in range(k)]) * (radius / a) ** (2 * k)
+    assert np.allclose(result["relative"], expected, atol=1.0e-8)
+
+    # symmetric solenoid, batch of current sets
+    solenoid = Supra("solenoid", [20, 30], [-50, 50], 100)
+    result = field.homogeneity(solenoid, [[1.0e3], [-2.0e3]])
+    assert np.allclose(result["center"], 0, atol=1.0e-9)
+    assert np.allclose(result["relative"][0], result["relative"][1])
+    assert np.allclose(result["relative"][:, 1::2], 0, atol=1.0e-12)
+    z = np.linspace(-10, 10, 201)
+    Bz = field.axis_field(solenoid, z, 1.0e3)
+    assert result["homogeneity"][0] == pytest.approx(np.ptp(Bz) / Bz[100])
+
+    with pytest.raises(RuntimeError):
+        field.homogeneity(solenoid, 1.0e3, radius=20)
@@ -0,0 +1,42 @@
+from python_magnetgeo.Insert import filter, filter_batch, unique_indices
+
+import numpy as np
+
+
+def reference(data, tol=1.0e-6):
+    result = []
+    for i in range(len(data)):
+        result += [
+            j for j in range(i, len(data)) if i != j and abs(data[i] - data[j]) <= tol
+        ]
+    return [data[i] for i in range(len(data)) if i not in result]
+
+
+def test_filter():
+    rng = np.random.default_rng(0)
+    for n in [0, 1, 10, 200]:
+        data = np.round(rng.uniform(-100, 100, n), 1).tolist()
+        data += [z + 1.0e-8 for z in data[: n // 2]]
+        assert filter(data) == reference(data)
+
+    # chains: values are compared with all earlier ones, kept or not
+    assert filter([0, 1.2, 0.6], tol=1) == [0, 1.2]
+    assert filter([0.6, 0, 1.2], tol=1) == [0.6]
+    for n in [10, 50]:
+        for tol in [0.1, 0.3, 1.0]:
+            data = np.round(rng.uniform(-3, 3, n), 1).tolist()
+            assert filter(data, tol) == reference(data, tol)
+
+    data = np.array([3.0, 1.0, 3.0, 2.0])
+    assert unique_indices(data).tolist() == [0, 1, 3]
+    assert filter(data).tolist() == [3.0, 1.0, 2.0]
+
+
+def test_batch():
+    datas = [[0.0, 1.0, 1.0 + 1.0e-8], [], [1.0, 1.0, 5.0], [5.0]]
+    assert filter_batch(datas) == [filter(data) for data in datas]
+    assert filter_batch(datas) == [[0.0, 1.0], [], [1.0, 5.0], [5.0]]
+
+    rng = np.random.default_rng(0)
+    datas = [np.round(rng.uniform(-3, 3, n), 1).tolist() for n in range(20)]
+    assert filter_batch(datas, 0.3) == [reference(data, 0.3) for data in datas]
@@ -0,0 +1,89 @@
+import pickle
+
+from python_magnetgeo import memo
+from python_magnetgeo.ModelAxi import ModelAxi
+from python_magnetgeo.Supra import Supra
+from python_magnetgeo.Insert import Insert
+from python_magnetgeo.MSite import MSite
+from python_magnetgeo.fingerprint import canonical
+from python_magnetgeo.registry import load_tree
+
+import yaml
+
+
+def test_canonical():
+    assert canonical([1, 2.0, -0.0]) == canonical([1.0, 2, 0])
+    assert canonical({"b": 1, "a": None}) == '{"a":null,"b":1.0}'
+    assert canonical(True) != canonical(1)
+
+
+def test_memo(create_helix):
+    axi = ModelAxi("axi", 10, [1, 2], [5, 2.5])
+    same = ModelAxi("axi", 10.0, [1.0, 2.0], [5.0, 2.5])
+    digest = axi.fingerprint()
+    assert same.fingerprint() == digest
+    assert "_fingerprint" in vars(axi)
+    assert "_fingerprint" not in yaml.dump(axi)
+    assert "_fingerprint" not in vars(pickle.loads(pickle.dumps(axi)))
+
+    axi.h = 11
+    assert "_fingerprint" not in vars(axi)
+    assert axi.fingerprint() != digest
+
+    # embedded objects
+    helix = create_helix()
+    digest = helix.fingerprint()
+    helix.modelaxi.h += 1
+    assert helix.fingerprint() != digest
+
+    # in place changes are seen, so are they by geometry keys
+    digest = helix.fingerprint()
+    key = memo.geometry_key(helix)
+    helix.modelaxi.pitch[0] = 20.0
+    assert helix.fingerprint() != digest
+    assert memo.geometry_key(helix) != key
+    assert helix.fingerprint() == helix.fingerprint(revalidate=True)
+    digest = helix.fingerprint()
+    helix.r[0] = 18
+    assert helix.fingerprint() != digest
+    helix.r[0] = 19.3
+    assert helix.fingerprint() == digest
+
+
+def test_missing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    insert = Insert("insert", [], [], ["Inner"], [], [], 15, 35)
+    digest = insert.fingerprint()
+    insert.CurrentLeads = ["Outer"]
+    assert insert.fingerprint() != digest
+
+
+def test_parts(tmp_path, monkeypatch, create_helix):
+    monkeypatch.chdir(tmp_path)
+    for i, odd in enumerate([True, False]):
+        helix = create_helix(odd)
+        helix.name = f"H{i+1}"
+        helix.dump()
+    (tmp_path / "struct.json").write_text("{}")
+    Insert("insert", ["H1", "H2"], [], [], [], [], 15, 35).dump()
+    Supra("supra", [100, 120], [-80, 80], 300, "struct.json").dump()
+    site = MSite("site", {"insert": "insert", "supra": "supra"}, None, None, None, None)
+
+    digest = site.fingerprint()
+    assert load_tree("insert.yaml").fingerprint() == Insert(
+        "insert", ["H1", "H2"], [], [], [], [], 15, 35
+    ).fingerprint()
+
+    # rewriting a part with the same content
+    helix = create_helix(False)
+    helix.name = "H2"
+    helix.dump()
+    assert site.fingerprint() == digest
+
+    helix.r = [20, 25]
+    helix.dump()
+    assert site.fingerprint() != digest
+
+    digest = site.fingerprint()
+    (tmp_path / "struct.json").write_text('{"name": "struct"}')
+    assert site.fingerprint() != digest
@@ -0,0 +1,78 @@
+from python_magnetgeo import geo_axi
+from python_magnetgeo import hydraulics
+from python_magnetgeo.ModelAxi import ModelAxi
+from python_magnetgeo.geo_axi import Fragment, POINT, LINE
+
+import numpy as np
+
+
+def read_geo(insert) -> list[str]:
+    with open(f"{insert.name}_axi.geo", "r") as f:
+        lines = f.readlines()
+    # drop date
+    del lines[3]
+    return lines
+
+
+def test_fragment():
+    frag = Fragment()
+    frag.text("// 100%\n")
+    p = frag.new(POINT, 2)
+    line = frag.new(LINE)
+    frag.point(p, "0", "1", "lc")
+    frag.point(p + 1, "1", "1", "lc")
+    frag.line(line, p, p + 1)
+    frag.ref("L", LINE, line)
+    frag.freeze()
+
+    assert frag.counts == [2, 1, 0, 0]
+    offsets = np.array([10, 20, 1, 1])
+    assert frag.render(offsets) == (
+        "// 100%\n"
+        "Point(10)= {0,1, 0.0, lc};\n"
+        "Point(11)= {1,1, 0.0, lc};\n"
+        "Line(20)= {10, 11};\n"
+    )
+    assert frag.get("L", offsets) == [20]
+
+
+def test_incremental(tmp_path, monkeypatch, create_helix, create_insert):
+    monkeypatch.chdir(tmp_path)
+    geo_axi.fragments.clear()
+    insert = create_insert()
+
+    calls = []
+
+    def helix_fragment(helix, i):
+        calls.append(helix.name)
+        return fragment(helix, i)
+
+    fragment = geo_axi.helix_fragment
+    monkeypatch.setattr(geo_axi, "helix_fragment", helix_fragment)
+
+    hydraulics.params.clear()
+    ids = insert.Create_AxiGeo(True)
+    assert calls == ["H1", "H2"]
+    # fragments of H1, H2 and R1 are kept apart from hydraulic parameters
+    assert len(geo_axi.fragments) == 3 and len(hydraulics.params) == 0
+    assert "Plane Surface(30)= {30, -1, -2," in "".join(read_geo(insert))
+
+    # same geometry: nothing regenerated
+    assert insert.Create_AxiGeo(True) == ids
+    assert calls == ["H1", "H2"]
+
+    # H1 has less sections: H2 fragment is renumbered, not regenerated
+    helix = create_helix(True)
+    helix.name = "H1"
+    helix.modelaxi = ModelAxi("axi", 10, [1.0, 1.0], [10.0, 10.0])
+    helix.dump()
+    ids = insert.Create_AxiGeo(True)
+    assert calls == ["H1", "H2", "H1"]
+    assert [len(H) for H in ids[0]] == [4, 14]
+    assert ids[0][1][0] == 5
+    lines = read_geo(insert)
+
+    geo_axi.fragments.clear()
+    assert insert.Create_AxiGeo(True) == ids
+    assert read_geo(insert) == lines
+    assert calls == ["H1", "H2", "H1", "H1", "H2"]
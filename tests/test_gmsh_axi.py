@@ -0,0 +1,51 @@
+import pytest
+
+
+def test_geo(tmp_path, monkeypatch, create_insert):
+    monkeypatch.chdir(tmp_path)
+    insert = create_insert()
+    (H_ids, R_ids, BC_ids, Air_ids, BC_Air_ids) = insert.Create_AxiGeo(True)
+    assert len(H_ids) == 2 and len(R_ids) == 1 and len(Air_ids) == 3
+    assert sorted(BC_ids) == sorted(
+        ["H1Channel0", "H1Channel1", "H2Channel0", "H2Channel1", "HP_H0", "HP_H2", "HP_R1"]
+    )
+    assert sorted(BC_Air_ids) == ["Axis", "Infty"]
+    with open("insert_axi.geo", "r") as f:
+        geo = f.read()
+    for name, ids in BC_ids.items():
+        assert f'Physical Line("{name}")' in geo
+
+
+@pytest.mark.parametrize("AirData", [False, True])
+def test_model(tmp_path, monkeypatch, AirData, create_insert):
+    gmsh = pytest.importorskip("gmsh")
+    monkeypatch.chdir(tmp_path)
+    insert = create_insert()
+    geo = insert.Create_AxiGeo(AirData)
+
+    gmsh.initialize()
+    try:
+        gmsh.option.setNumber("General.Terminal", 0)
+        (H_ids, R_ids, BC_ids, Air_ids, BC_Air_ids) = insert.Create_AxiModel(AirData)
+
+        # same entities as the .geo model
+        assert [len(ids) for ids in H_ids] == [len(ids) for ids in geo[0]]
+        assert len(R_ids) == len(geo[1]) and len(Air_ids) == len(geo[3])
+        assert {name: len(ids) for name, ids in BC_ids.items()} == {
+            name: len(ids) for name, ids in geo[2].items()
+        }
+        assert {name: len(ids) for name, ids in BC_Air_ids.items()} == {
+            name: len(ids) for name, ids in geo[4].items()
+        }
+
+        groups = {
+            gmsh.model.getPhysicalName(dim, tag): gmsh.model.getEntitiesForPhysicalGroup(dim, tag).tolist()
+            for (dim, tag) in gmsh.model.getPhysicalGroups()
+        }
+        assert groups["H1_Cu0"] == [H_ids[0][0]] and groups["R1"] == R_ids
+        assert sorted(groups["H2Channel1"]) == BC_ids["H2Channel1"]
+
+        gmsh.model.mesh.generate(2)
+        assert len(gmsh.model.mesh.getNodes()[0]) > 0
+    finally:
+        gmsh.finalize()
@@ -0,0 +1,106 @@
+from python_magnetgeo import hydraulics
+from python_magnetgeo import fingerprint
+from python_magnetgeo import registry
+from python_magnetgeo.Bitter import Bitter
+from python_magnetgeo.ModelAxi import ModelAxi
+from python_magnetgeo.hydraulics import HydraulicParams
+
+import numpy as np
+import pytest
+
+
+def test_insert(tmp_path, monkeypatch, create_helix, create_insert):
+    monkeypatch.chdir(tmp_path)
+    insert = create_insert()
+
+    params = insert.get_params()
+    assert isinstance(params, HydraulicParams)
+    assert params.nchannels == 3 and params.NHelices == 2
+    assert len(params.Zh) == 3 and params.Zh[0][0] == params.Zh[0].min()
+    with pytest.raises(ValueError):
+        params.Dh[0] = 0
+
+    # former tuple
+    (NHelices, NRings, NChannels, Nsections, R1, R2, Dh, Sh, Zc) = params
+    assert (NHelices, NRings, NChannels, Nsections) == (2, 1, 3, [12, 12])
+    assert R1 == [19.3, 25.3] and Dh == params.Dh.tolist()
+    assert Zc[2] == params.Zh[2].tolist()
+    assert len(params) == 9 and params[6] == Dh and params[-1] == Zc
+    assert params[:2] == (2, 1)
+
+    # memoized until a part changes
+    assert insert.get_params() is params
+    helix = create_helix(True)
+    helix.name = "H1"
+    helix.r = [18, 24.2]
+    helix.dump()
+    new = insert.get_params()
+    assert new is not params and new.R1[0] == 18
+
+
+def test_memo(tmp_path, monkeypatch, create_insert):
+    monkeypatch.chdir(tmp_path)
+    insert = create_insert()
+    # current leads are not used (nor read)
+    insert.CurrentLeads = ["Inner", "Outer"]
+    params = insert._compute_params()
+    assert insert.get_params().astuple() == params.astuple()
+
+    # a hit neither computes nor hashes again
+    calls = []
+    monkeypatch.setattr(
+        type(insert), "_compute_params", lambda self, wd: calls.append(wd)
+    )
+    monkeypatch.setattr(
+        fingerprint, "canonical", lambda *args: calls.append(args) or ""
+    )
+    for _ in range(3):
+        assert insert.get_params().astuple() == params.astuple()
+    assert calls == []
+
+
+def test_bitter():
+    hydraulics.params.clear()
+    bitter = Bitter(
+        "Bitter", [1, 2], [-1, 1], True, ModelAxi("axi", 0.9, [2], [0.9]), [], None, 0.99, 2.01
+    )
+
+    params = bitter.get_params()
+    (nslits, Dh, Sh, Zh, filling_factor) = params
+    assert nslits == 0 and len(Dh) == 2 and filling_factor == [1, 1]
+    assert Zh == [-1, -0.9, 0.9, 1]
+    assert len(params) == 5 and params[0] == 0 and params[3] == Zh
+    assert bitter.get_params() is params
+
+    bitter.z = [-2, 2]
+    assert bitter.get_params().Zh[0].tolist() == [-2, -0.9, 0.9, 2]
+
+
+def test_Tw(tmp_path, monkeypatch, create_insert):
+    monkeypatch.chdir(tmp_path)
+    insert = create_insert()
+    params = insert.get_params()
+
+    current = np.array([10.0e3, 20.0e3, 30.0e3])
+    flow = np.array([0.1, 0.1, 0.12])
+    profiles = hydraulics.estimate_Tw(insert, current, flow, 20)
+    assert len(profiles) == params.nchannels
+
+    # energy balance
+    total = sum(
+        hydraulics.joule_power(registry.load(name))[1].sum() for name in insert.Helices
+    ) * current**2
+    assert np.allclose(sum(p["power"].sum(axis=1) for p in profiles), total)
+    mass_flow = hydraulics.water["rho"] * flow[:, None] * params.Sh / params.Sh.sum()
+    dT = np.array([p["Tw"][:, -1] - p["Tw"][:, 0] for p in profiles]).T
+    assert np.allclose((mass_flow * dT).sum(axis=1) * hydraulics.water["cp"], total)
+
+    for i, profile in enumerate(profiles):
+        assert profile["Tw"].shape == (3, params.Zh[i].size)
+        assert np.all(np.diff(profile["Tw"], axis=1) >= 0)
+        assert np.all(profile["Twall"] >= profile["Tw"][:, :-1])
+
+    # batch matches single operating points
+    single = hydraulics.estimate_Tw(insert, current[1], flow[1], 20)
+    for p, s in zip(profiles, single):
+        assert np.allclose(p["Tw"][1], s["Tw"][0])
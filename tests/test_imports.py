@@ -0,0 +1,103 @@
+import os
+import sys
+import json
+import subprocess
+
+import python_magnetgeo
+from python_magnetgeo.SupraStructure import flatten
+
+import pytest
+
+# import time of python_magnetgeo modules (numpy and yaml excluded)
+budget = 0.25
+
+datadir = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+def run(code: str) -> dict:
+    """
+    run code in a fresh interpreter, return its json output
+    """
+    source = f"""
+import sys, json, time
+import numpy, yaml
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+modules = sorted(m for m in sys.modules if m.startswith("python_magnetgeo."))
+print(json.dumps({{"elapsed": elapsed, "modules": modules, "result": result}}))
+"""
+    root = os.path.dirname(os.path.dirname(python_magnetgeo.__file__))
+    out = subprocess.run(
+        [sys.executable, "-c", source],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=datadir,
+        env=dict(os.environ, PYTHONPATH=root),
+    )
+    return json.loads(out.stdout)
+
+
+def test_budget():
+    out = run("import python_magnetgeo.Helix\nresult = None")
+    assert out["elapsed"] < budget
+    assert out["modules"] == [
+        "python_magnetgeo.Helix",
+        "python_magnetgeo.Model3D",
+        "python_magnetgeo.ModelAxi",
+        "python_magnetgeo.Shape",
+        "python_magnetgeo.fingerprint",
+        "python_magnetgeo.loaders",
+        "python_magnetgeo.registry",
+    ]
+
+    out = run(
+        "import python_magnetgeo.Insert, python_magnetgeo.MSite\n"
+        "import python_magnetgeo.Supra, python_magnetgeo.Bitters\n"
+        "result = 'pandas' in sys.modules"
+    )
+    assert out["elapsed"] < budget and not out["result"]
+
+
+@pytest.mark.parametrize("module", ["Ring", "deserialize", "SupraStructure"])
+def test_standalone(module):
+    out = run(f"import python_magnetgeo.{module}\nresult = None")
+    assert f"python_magnetgeo.{module}" in out["modules"]
+    assert "python_magnetgeo.Insert" not in out["modules"]
+
+
+def test_lazy():
+    # yaml tags import the module defining them on first use
+    out = run(
+        "from python_magnetgeo import loaders\n"
+        "with open('Ring-H1H2.yaml') as f:\n"
+        "    result = type(yaml.load(f, Loader=loaders.get_loader())).__name__"
+    )
+    assert out["result"] == "Ring"
+    assert "python_magnetgeo.Ring" in out["modules"]
+    assert "python_magnetgeo.Helix" not in out["modules"]
+
+    # deserialize registers the yaml tags (classes not tagged with their name too)
+    out = run(
+        "from python_magnetgeo import deserialize\n"
+        "slit = yaml.load('!<Slit> {r: 1}', Loader=yaml.FullLoader)\n"
+        "result = [type(slit).__name__, deserialize.get_class('CoolingSlit').yaml_tag]"
+    )
+    assert out["result"] == ["CoolingSlit", "Slit"]
+
+    # attributes of the package import the module defining them too
+    out = run("import python_magnetgeo\nresult = python_magnetgeo.Shape.Shape.yaml_tag")
+    assert out["result"] == "Shape"
+    assert "python_magnetgeo.Shape" in out["modules"]
+    assert "Helix" in dir(python_magnetgeo)
+    with pytest.raises(AttributeError):
+        python_magnetgeo.Unknown
+
+
+def test_flatten():
+    assert flatten([1, [2, [3, ["ab", []]]], (4,)]) == [1, 2, 3, "ab", 4]
+    nested = [0]
+    for i in range(1, 5000):
+        nested = [nested, i]
+    assert flatten(nested) == list(range(5000))
@@ -0,0 +1,76 @@
+from python_magnetgeo import field
+from python_magnetgeo import hydraulics
+from python_magnetgeo import inductance
+from python_magnetgeo.Supra import Supra
+from python_magnetgeo.Insert import Insert
+from python_magnetgeo.MSite import MSite
+
+import numpy as np
+import pytest
+
+
+def test_filament():
+    # Maxwell formula with complete elliptic integrals K and E
+    (a, b, dz) = (0.05, 0.07, 0.02)
+    s = (a + b) ** 2 + dz * dz
+    k = np.sqrt(4 * a * b / s)
+    kc = np.sqrt(1 - k * k)
+    K = field.cel(kc, 1, 1, 1)
+    E = field.cel(kc, 1, 1, kc * kc)
+    M = 2 * field.mu0 * np.sqrt(a * b) / k * ((1 - k * k / 2) * K - E)
+    assert inductance.filament_mutual(a, b, dz) == pytest.approx(M, rel=1.0e-12)
+
+
+def test_brooks():
+    # Brooks coil: L = 1.6994e-6 a N^2 (a mean radius in m)
+    sections = field.discretize(Supra("brooks", [10, 20], [-5, 5], 100))
+    L = inductance.mutual_inductances(sections, 16, 16)
+    assert L[0, 0] == pytest.approx(1.6994e-6 * 0.015 * 100**2, rel=1.0e-3)
+
+
+def test_chunks():
+    rng = np.random.default_rng(0)
+    n = 12
+    (r1, z1) = (rng.uniform(10, 20, n), rng.uniform(-50, 50, n))
+    sections = {
+        "r1": r1,
+        "r2": r1 + 5,
+        "z1": z1,
+        "z2": z1 + 10,
+        "turns": rng.uniform(1, 10, n),
+        "coil": np.arange(n),
+        "names": [f"s{i}" for i in range(n)],
+    }
+    L = inductance.mutual_inductances(sections, 2, 2)
+    assert np.array_equal(L, L.T)
+    for max_memory in [1, 3 * 10**4]:
+        M = inductance.mutual_inductances(sections, 2, 2, 3, max_memory)
+        assert np.allclose(M, L, rtol=1.0e-13)
+
+
+def test_msite(tmp_path, monkeypatch, create_helix):
+    monkeypatch.chdir(tmp_path)
+    for i, odd in enumerate([True, False]):
+        helix = create_helix(odd)
+        helix.name = f"H{i+1}"
+        helix.r = [19.3 + 6 * i, 24.2 + 6 * i]
+        helix.dump()
+    Insert("insert", ["H1", "H2"], [], [], [], [], 15, 35).dump()
+    Supra("supra", [100, 120], [-80, 80], 300).dump()
+    site = MSite("site", {"insert": "insert", "supra": "supra"}, None, None, None, None)
+
+    (names, L) = inductance.inductances(site)
+    nsections = create_helix().modelaxi.get_Nsections()
+    assert len(names) == 2 * nsections + 1
+    assert names[0] == "H1_Cu1" and names[-1] == "supra_dp0"
+    assert not L.flags.writeable
+    assert np.all(np.linalg.eigvalsh(L) > 0)
+
+    # memoized, apart from hydraulic parameters
+    hydraulics.params.clear()
+    assert inductance.inductances(site)[1] is L
+
+    (coils, Lc) = inductance.inductances(site, split=False)
+    assert coils == ("H1", "H2", "supra")
+    assert Lc.sum() == pytest.approx(L.sum())
+    assert Lc[0, 1] == pytest.approx(L[:nsections, nsections:-1].sum())
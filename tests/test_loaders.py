@@ -0,0 +1,39 @@
+import os
+
+from python_magnetgeo.Helix import Helix
+from python_magnetgeo import loaders
+
+import yaml
+import pytest
+
+datadir = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+@pytest.mark.parametrize("safe", [False, True])
+def test_libyaml(safe):
+    with open(os.path.join(datadir, "HL-31_H2.yaml"), "r") as f:
+        source = f.read()
+
+    ref = yaml.load(source, Loader=loaders.get_loader(safe, libyaml=False))
+    helix = yaml.load(source, Loader=loaders.get_loader(safe))
+    assert isinstance(helix, Helix)
+    assert helix.r == ref.r
+    # data files still use the former "axi" key
+    assert vars(helix)["axi"].pitch == vars(ref)["axi"].pitch
+
+
+def test_constructor():
+    source = """
+!Helix
+name: H1
+r: [19.3, 24.2]
+z: [-226, 108]
+cutwidth: 0.22
+odd: true
+dble: true
+modelaxi: !ModelAxi {name: axi, h: 86.51, turns: [1, 1], pitch: [10, 10]}
+model3d: !Model3D {cad: test, with_shapes: false, with_channels: false}
+shape: !Shape {name: "", profile: "", length: [0], angle: [0], onturns: [1], position: ABOVE}
+"""
+    helix = yaml.load(source, Loader=loaders.get_loader(safe=True))
+    assert helix.modelaxi.get_Nturns() == 2
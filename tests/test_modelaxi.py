@@ -0,0 +1,105 @@
+import copy
+import json
+
+from python_magnetgeo import deserialize
+from python_magnetgeo.ModelAxi import ModelAxi
+
+import numpy as np
+import yaml
+import pytest
+
+
+def test_arrays():
+    turns = [0.5, 2.25, 3.0, 1.5]
+    pitch = [10.1, 12.3, 8.7, 10.1]
+    axi = ModelAxi("axi", 40.0, turns, pitch)
+
+    z = -axi.h
+    theta = 0
+    zb = [z]
+    thetab = [theta]
+    for n, p in zip(turns, pitch):
+        z += n * p
+        theta += n * (2 * np.pi)
+        zb.append(z)
+        thetab.append(theta)
+
+    assert axi.get_Nsections() == 4
+    assert axi.get_Nturns() == sum(turns)
+    assert axi.z_boundaries().tolist() == zb
+    assert axi.theta_boundaries().tolist() == thetab
+    assert axi.z_boundaries(top=True)[0] == axi.h
+    assert np.allclose(axi.section_lengths(), np.diff(zb))
+    assert axi.cumulative_turns()[-1] == axi.get_Nturns()
+
+    # cached arrays are shared and read-only
+    assert axi.z_boundaries() is axi.z_boundaries()
+    with pytest.raises(ValueError):
+        axi.get_turns()[0] = 1
+
+
+def test_invalidate():
+    axi = ModelAxi("axi", 10.0, [1, 1], [5, 5])
+    assert axi.get_Nturns() == 2
+    assert axi.z_boundaries()[-1] == 0
+
+    axi.turns = [1, 2]
+    assert axi.get_Nturns() == 3
+    axi.h = 15.0
+    assert axi.z_boundaries().tolist() == [-15, -10, 0]
+
+    # in place changes
+    axi.pitch[0] = 10
+    assert axi.z_boundaries().tolist() == [-15, -5, 5]
+    axi.turns.append(1)
+    axi.pitch.append(1)
+    assert axi.get_Nturns() == 4 and axi.z_boundaries()[-1] == 6
+    del axi.turns[-1], axi.pitch[-1]
+    axi.pitch[0] = 5
+
+    # a copy does not share its cache with the original
+    other = copy.copy(axi)
+    other.pitch = [1, 1]
+    assert axi.z_boundaries()[-1] == 0 and other.z_boundaries()[-1] == -12
+
+
+def test_serialize():
+    axi = ModelAxi("axi", 10.0, [1, 1], [5, 5])
+    axi.z_boundaries()
+
+    assert "_cache" not in yaml.dump(axi)
+    assert "_cache" not in axi.to_json()
+
+    data = yaml.load(yaml.dump(axi), Loader=yaml.FullLoader)
+    assert data.turns == [1, 1] and data.get_Nturns() == 2
+    data = json.loads(axi.to_json(), object_hook=deserialize.unserialize_object)
+    assert data.pitch == [5, 5] and data.z_boundaries()[-1] == 0
+
+
+def test_compact():
+    axi = ModelAxi("axi", 10.0, [1, 2, 1, 1, 3], [2, 2, 3, 3 * (1 + 1.0e-8), 2])
+
+    (turns, pitch, index, error) = axi.compact_sections(tol=1.0e-6)
+    assert turns == [3, 2, 3]
+    assert pitch[0] == 2 and pitch[2] == 2 and pitch[1] == pytest.approx(3)
+    assert index.tolist() == [0, 0, 1, 1, 2]
+    assert error["dpitch"] < 1.0e-8 and error["dz"] < 1.0e-7
+    # height is preserved
+    assert sum(t * p for t, p in zip(turns, pitch)) == pytest.approx(
+        axi.cumulative_lengths()[-1]
+    )
+    assert axi.compact() == (turns, pitch)
+    # axi itself is left unchanged
+    assert axi.turns == [1, 2, 1, 1, 3]
+
+    (turns, pitch, index, error) = axi.compact_sections(tol=1.0e-9)
+    assert turns == [3, 1, 1, 3] and error == {"dpitch": 0.0, "dz": 0.0}
+
+    assert ModelAxi().compact() == ([], [])
+
+    # null pitch
+    axi = ModelAxi("axi", 10.0, [1, 1, 2], [0, 0, 2])
+    with np.errstate(all="raise"):
+        (turns, pitch, index, error) = axi.compact_sections()
+    assert turns == [2, 2] and pitch == [0, 2]
+    assert error == {"dpitch": 0.0, "dz": 0.0}
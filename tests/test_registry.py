@@ -0,0 +1,94 @@
+import os
+
+from python_magnetgeo.Screen import Screen
+from python_magnetgeo.MSite import MSite
+from python_magnetgeo.registry import Registry, registry, load_tree
+
+import yaml
+import pytest
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_hit_miss(workdir):
+    Screen("screen", [1, 2], [-1, 1]).dump()
+
+    cache = Registry()
+    screen = cache.get("screen.yaml")
+    assert cache.get("screen.yaml") is screen
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    # file changed: reload
+    Screen("screen", [1, 20], [-1, 1]).dump()
+    assert cache.get("screen.yaml").r[1] == 20
+    assert cache.stats()["misses"] == 2
+
+    assert cache.invalidate("screen.yaml") == 1
+    assert "screen.yaml" not in cache
+
+
+def test_lru(workdir):
+    for i in range(3):
+        Screen(f"screen{i}", [1, 2], [-1, 1]).dump()
+
+    cache = Registry(maxsize=2)
+    cache.get("screen0.yaml")
+    cache.get("screen1.yaml")
+    cache.get("screen0.yaml")
+    cache.get("screen2.yaml")
+    assert "screen0.yaml" in cache and "screen1.yaml" not in cache
+    assert cache.stats()["evictions"] == 1
+
+
+def test_insert(workdir, create_small_insert):
+    insert = create_small_insert()
+
+    registry.invalidate()
+    registry.reset_stats()
+    insert.get_names("", is2D=True)
+    insert.get_names("", is2D=True)
+    assert registry.stats()["misses"] == 2 and registry.stats()["hits"] == 2
+
+    # boundingBox must not alter registered objects
+    (rb, zb) = insert.boundingBox()
+    assert rb == [1, 4] and zb == [-2, 2]
+    assert registry.get(os.path.join(workdir, "H0.yaml")).r == [1, 2]
+
+
+def test_tree(workdir, tmp_path_factory, create_small_insert):
+    create_small_insert().dump()
+    MSite("site", {"insert": "insert"}, None, None, None, None).dump()
+
+    site = load_tree("site.yaml")
+    names = site.get_names("", is2D=True)
+    bbox = site.boundingBox()
+    assert "_parts" not in site.to_json()
+    assert "_parts" not in yaml.dump(site)
+    insert = load_tree("insert.yaml")
+    assert yaml.dump(insert).startswith("!<Insert>") and "_parts" in vars(insert)
+    assert "_parts" not in yaml.dump(insert)
+
+    # once resolved no more file is needed
+    os.chdir(tmp_path_factory.mktemp("empty"))
+    assert site.get_names("", is2D=True) == names
+    assert site.boundingBox() == bbox == ([1, 4], [-2, 2])
+
+
+def test_prefetch(workdir):
+    screens = [f"screen{i}" for i in range(8)]
+    for i, name in enumerate(screens):
+        Screen(name, [i, i + 1], [-1, 1]).dump()
+    site = MSite("site", {"screens": screens}, None, None, None, None)
+
+    registry.invalidate()
+    ref = site.get_names("")
+
+    registry.invalidate()
+    registry.reset_stats()
+    assert site.get_names("", max_workers=4) == ref
+    assert registry.stats()["misses"] == 8 and registry.stats()["hits"] == 8
+    assert site.boundingBox(max_workers=4) == ([0, 8], [-1, 1])